@@ -0,0 +1,48 @@
+"""add connection updated_at indexes
+
+Revision ID: 2d8f6a1c9b47
+Revises: 9e4b1c7d2a36
+Create Date: 2025-06-19 09:12:37.514620
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "2d8f6a1c9b47"
+down_revision = "9e4b1c7d2a36"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently so the table stays writable, which can't happen
+    # inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_connection_source_user_id_updated_at",
+            "connection",
+            ["source_user_id", "updated_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_connection_target_user_id_updated_at",
+            "connection",
+            ["target_user_id", "updated_at", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_connection_target_user_id_updated_at",
+            table_name="connection",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_connection_source_user_id_updated_at",
+            table_name="connection",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,83 @@
+"""add connection indexes
+
+Revision ID: 9e4b1c7d2a36
+Revises: 6c2a9f4d8e15
+Create Date: 2025-06-18 10:41:52.207318
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9e4b1c7d2a36"
+down_revision = "6c2a9f4d8e15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep one connection per pair of users, preferring an accepted one, so
+    # the unique index can be built
+    op.execute(
+        """
+        DELETE FROM connection
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY
+                        LEAST(source_user_id, target_user_id),
+                        GREATEST(source_user_id, target_user_id)
+                    ORDER BY status = 'accepted' DESC, created_at, id
+                ) AS rank
+                FROM connection
+            ) ranked
+            WHERE rank > 1
+        )
+        """
+    )
+    # Built concurrently so the table stays writable, which can't happen
+    # inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_connection_source_user_id_status",
+            "connection",
+            ["source_user_id", "status"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_connection_target_user_id_status",
+            "connection",
+            ["target_user_id", "status"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "uq_connection_user_pair",
+            "connection",
+            [
+                sa.text("LEAST(source_user_id, target_user_id)"),
+                sa.text("GREATEST(source_user_id, target_user_id)"),
+            ],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "uq_connection_user_pair",
+            table_name="connection",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_connection_target_user_id_status",
+            table_name="connection",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_connection_source_user_id_status",
+            table_name="connection",
+            postgresql_concurrently=True,
+        )
@@ -56,12 +56,17 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
+    # asyncpg caches prepared statements per connection, psycopg only
+    # prepares statements after they ran a few times
+    DB_DRIVER: Literal["psycopg", "asyncpg"] = "psycopg"
+    # Prepared statements kept per connection with asyncpg
+    DB_STATEMENT_CACHE_SIZE: int = 100
 
     @computed_field  # type: ignore[prop-decorator]
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
         return MultiHostUrl.build(
-            scheme="postgresql+psycopg",
+            scheme=f"postgresql+{self.DB_DRIVER}",
             username=self.POSTGRES_USER,
             password=self.POSTGRES_PASSWORD,
             host=self.POSTGRES_SERVER,
@@ -96,6 +101,37 @@ class Settings(BaseSettings):
     FIRST_SUPERUSER_PASSWORD: str
     FIRST_SUPERUSER_NAME: str
 
+    # Chat message sends replayed under the same Idempotency-Key header
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 60 * 60 * 24
+    IDEMPOTENCY_WAIT_TIMEOUT_SECONDS: int = 120
+
+    # Default Letta deadlines, clients may shorten them with X-Request-Timeout
+    LETTA_REQUEST_TIMEOUT_SECONDS: float = 30
+    LETTA_MESSAGE_TIMEOUT_SECONDS: float = 120
+
+    # How long blocks attached by /yenta-chat/{id}/prepare wait for the send
+    YENTA_PREPARE_TTL_SECONDS: float = 30
+    # Prepared sends a user may have waiting at once on a worker
+    YENTA_PREPARE_MAX_PER_USER: int = 5
+
+    # Engine pool profile: "api" for the web workers, "worker" for background
+    # jobs and "migration" for one-off scripts, which get no pool at all
+    DB_POOL_PROFILE: Literal["api", "worker", "migration"] = "api"
+    # Override the sizes of the profile
+    DB_POOL_SIZE: int | None = None
+    DB_MAX_OVERFLOW: int | None = None
+    DB_POOL_TIMEOUT_SECONDS: float | None = None
+    DB_POOL_PRE_PING: bool = False
+    # Connections older than this are replaced on checkout, -1 keeps them
+    DB_POOL_RECYCLE_SECONDS: int = -1
+    # PgBouncer in transaction mode can't keep prepared statements or LISTEN
+    # across transactions
+    DB_PGBOUNCER_MODE: bool = False
+    # Postgres itself when POSTGRES_SERVER is PgBouncer, used for LISTEN
+    POSTGRES_LISTEN_SERVER: str | None = None
+    # Read replica taking the reads of sessions that haven't written yet
+    POSTGRES_REPLICA_SERVER: str | None = None
+
     def _check_default_secret(self, var_name: str, value: str | None) -> None:
         if value == "changethis":
             message = (
@@ -1,19 +1,197 @@
+import time
+import uuid
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from functools import wraps
 
+from sqlalchemy import URL, Select, event, exc, make_url
 from sqlalchemy.ext.asyncio import create_async_engine
-from sqlmodel import SQLModel, select
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+from sqlmodel import Session, SQLModel, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core import metrics
 from app.core.config import settings
 from app.features.users.users_models import User, UserCreate
 
-# Convert database URI to async format (replace postgresql:// with postgresql+asyncpg://)
 database_uri = str(settings.SQLALCHEMY_DATABASE_URI)
-if database_uri.startswith("postgresql://"):
-    database_uri = database_uri.replace("postgresql://", "postgresql+asyncpg://")
+
+POOL_PROFILES: dict[str, dict] = {
+    "api": {"pool_size": 10, "max_overflow": 10, "pool_timeout": 10},
+    "worker": {"pool_size": 2, "max_overflow": 2, "pool_timeout": 60},
+    "migration": {},
+}
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool recording how long checkouts wait for a free connection.
+    """
+
+    def _do_get(self):
+        started_at = time.monotonic()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.increment("db_pool_timeouts")
+            raise
+        finally:
+            metrics.observe("db_pool_wait_seconds", time.monotonic() - started_at)
+
+
+def get_database_url(driver: str = settings.DB_DRIVER) -> URL:
+    return make_url(database_uri).set(drivername=f"postgresql+{driver}")
+
+
+def _get_connect_args(driver: str) -> dict:
+    if driver == "asyncpg":
+        if settings.DB_PGBOUNCER_MODE:
+            # PgBouncer may hand the server connection, and with it the
+            # statements prepared on it, to another client between transactions
+            return {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        return {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    if settings.DB_PGBOUNCER_MODE:
+        # Same for the statements psycopg prepares once they ran a few times
+        return {"prepare_threshold": None}
+    return {}
+
+
+def get_engine_options(
+    profile: str = settings.DB_POOL_PROFILE, driver: str = settings.DB_DRIVER
+) -> dict:
+    options: dict = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if profile == "migration":
+        options["poolclass"] = NullPool
+    else:
+        pool_options = POOL_PROFILES[profile] | {
+            name: value
+            for name, value in (
+                ("pool_size", settings.DB_POOL_SIZE),
+                ("max_overflow", settings.DB_MAX_OVERFLOW),
+                ("pool_timeout", settings.DB_POOL_TIMEOUT_SECONDS),
+            )
+            if value is not None
+        }
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            **pool_options,
+        )
+    options["connect_args"] = _get_connect_args(driver)
+    return options
+
 
 # Create async engine
-engine = create_async_engine(database_uri)
+engine = create_async_engine(database_uri, **get_engine_options())
+replica_engine = (
+    create_async_engine(
+        get_database_url().set(host=settings.POSTGRES_REPLICA_SERVER),
+        **get_engine_options(),
+    )
+    if settings.POSTGRES_REPLICA_SERVER
+    else None
+)
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(_dbapi_connection, connection_record, _connection_proxy) -> None:
+    connection_record.info["checked_out_at"] = time.monotonic()
+    metrics.increment("db_pool_checkouts")
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(_dbapi_connection, connection_record) -> None:
+    checked_out_at = connection_record.info.pop("checked_out_at", None)
+    if checked_out_at is not None:
+        metrics.observe("db_pool_hold_seconds", time.monotonic() - checked_out_at)
+
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs to the replica until the session writes or locks rows,
+    everything after that stays on the primary so it reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if replica_engine is None or self.info.get("primary_only"):
+            return super().get_bind(mapper, clause=clause, **kw)
+        if (
+            self._flushing
+            or not isinstance(clause, Select)
+            or clause._for_update_arg is not None
+        ):
+            self.info["primary_only"] = True
+            return super().get_bind(mapper, clause=clause, **kw)
+        return replica_engine.sync_engine
+
+
+def create_session(primary_only: bool = False) -> AsyncSession:
+    # Writes return their rows, nothing needs reloading after a commit
+    return AsyncSession(
+        engine,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        info={"primary_only": primary_only},
+    )
+
+
+class LazySession:
+    """
+    Stands in for an AsyncSession that is only created on first use, so
+    requests that never query don't pay for one.
+    """
+
+    def __init__(self, primary_only: bool = False) -> None:
+        self._session: AsyncSession | None = None
+        self.primary_only = primary_only
+
+    @property
+    def used(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str):
+        if self._session is None:
+            self._session = create_session(self.primary_only)
+        return getattr(self._session, name)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
+def _get_pool_sizes(pool: Pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def get_pool_stats() -> dict:
+    stats: dict = {"profile": settings.DB_POOL_PROFILE}
+    stats |= _get_pool_sizes(engine.pool)
+    snapshot = metrics.snapshot()
+    stats["checkouts"] = snapshot["counters"].get("db_pool_checkouts", 0)
+    stats["timeouts"] = snapshot["counters"].get("db_pool_timeouts", 0)
+    stats["wait_seconds"] = snapshot["summaries"].get("db_pool_wait_seconds")
+    stats["hold_seconds"] = snapshot["summaries"].get("db_pool_hold_seconds")
+    if replica_engine is not None:
+        stats["replica"] = _get_pool_sizes(replica_engine.pool)
+    return stats
+
+
+# Session of the current request, shared by everything that runs for it
+_request_session: ContextVar[LazySession | None] = ContextVar(
+    "request_session", default=None
+)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -45,11 +223,64 @@ async def init_db(session: AsyncSession) -> None:
         await create_user(session=session, user_create=user_in)
 
 
+@asynccontextmanager
+async def request_session(
+    primary_only: bool = False,
+) -> AsyncGenerator[LazySession, None]:
+    """
+    Set up the request's session and make it the one the helpers below reuse.
+    """
+    session = LazySession(primary_only)
+    token = _request_session.set(session)
+    try:
+        yield session
+    finally:
+        _request_session.reset(token)
+        await session.close()
+
+
+@asynccontextmanager
+async def get_session() -> AsyncGenerator[AsyncSession | LazySession, None]:
+    """
+    The current request's session, or a fresh one outside of a request. The
+    request's session must not be used by several tasks at the same time.
+    """
+    session = _request_session.get()
+    if session is not None:
+        yield session
+        return
+    async with create_session() as session:
+        yield session
+
+
+def use_primary() -> None:
+    """
+    Keep the rest of the request's queries on the primary, for reads that
+    must see writes made by the client's previous requests.
+    """
+    session = _request_session.get()
+    if session is None:
+        return
+    session.primary_only = True
+    if session.used:
+        session.info["primary_only"] = True
+
+
+async def release_connection() -> None:
+    """
+    Hand the request session's connection back to the pool before a slow
+    outbound call, it checks out another one when it is used again. Loaded
+    objects are detached, so pending changes must be committed first.
+    """
+    session = _request_session.get()
+    if session is not None:
+        await session.close()
+
+
 async def save_to_db(model: SQLModel):
-    async with AsyncSession(engine) as session:
+    async with get_session() as session:
         session.add(model)
         await session.commit()
-        await session.refresh(model)
 
 
 def with_async_session(func):
@@ -57,7 +288,7 @@ def with_async_session(func):
     async def wrapper(*args, **kwargs):
         if "session" in kwargs:
             return await func(*args, **kwargs)
-        async with AsyncSession(engine) as session:
+        async with get_session() as session:
             return await func(*args, session=session, **kwargs)
 
     return wrapper
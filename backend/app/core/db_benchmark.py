@@ -0,0 +1,110 @@
+"""
+Compare the psycopg and asyncpg drivers on the queries the API runs most.
+
+    python -m app.core.db_benchmark [--email admin@example.com] [--iterations 1000] [--concurrency 10]
+
+Each driver gets its own engine, set up like the app's with DB_POOL_PROFILE
+and DB_PGBOUNCER_MODE. Every query runs in a fresh session, like it would in
+a request, spread over --concurrency concurrent tasks. A warm-up round runs
+first so both drivers start with their statement caches filled. The user
+looked up defaults to FIRST_SUPERUSER.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import get_database_url, get_engine_options
+from app.features.connections.connections_crud import get_user_connections
+from app.features.users.users_crud import get_user_by_email
+from app.features.users.users_models import User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DRIVERS = ("psycopg", "asyncpg")
+QUERIES: dict[str, Callable[[AsyncSession, User], Awaitable[object]]] = {
+    "get_user_by_email": lambda session, user: get_user_by_email(
+        session=session, email=user.email
+    ),
+    "session.get(User)": lambda session, user: session.get(User, user.id),
+    "get_user_connections": lambda session, user: get_user_connections(
+        session=session, user_id=str(user.id)
+    ),
+}
+
+
+async def time_query(
+    engine: AsyncEngine,
+    query: Callable[[AsyncSession, User], Awaitable[object]],
+    user: User,
+    iterations: int,
+    concurrency: int,
+) -> list[float]:
+    durations: list[float] = []
+
+    async def run(count: int) -> None:
+        for _ in range(count):
+            started_at = time.perf_counter()
+            async with AsyncSession(engine) as session:
+                await query(session, user)
+            durations.append(time.perf_counter() - started_at)
+
+    per_task, remainder = divmod(iterations, concurrency)
+    await asyncio.gather(*[run(per_task + (i < remainder)) for i in range(concurrency)])
+    return durations
+
+
+def format_durations(durations: list[float], elapsed: float) -> str:
+    p50, p95, p99 = (
+        statistics.quantiles(durations, n=100)[i] * 1000 for i in (49, 94, 98)
+    )
+    return (
+        f"{len(durations) / elapsed:8.0f}/s  p50 {p50:6.2f}ms  "
+        f"p95 {p95:6.2f}ms  p99 {p99:6.2f}ms"
+    )
+
+
+async def benchmark_driver(driver: str, args: argparse.Namespace) -> None:
+    engine = create_async_engine(
+        get_database_url(driver), **get_engine_options(driver=driver)
+    )
+    try:
+        async with AsyncSession(engine) as session:
+            user = await get_user_by_email(session=session, email=args.email)
+        if not user:
+            raise SystemExit(f"No user with email {args.email}")
+        for name, query in QUERIES.items():
+            await time_query(engine, query, user, args.warmup, args.concurrency)
+            started_at = time.perf_counter()
+            durations = await time_query(
+                engine, query, user, args.iterations, args.concurrency
+            )
+            elapsed = time.perf_counter() - started_at
+            logger.info(f"{driver:8} {name:21} {format_durations(durations, elapsed)}")
+    finally:
+        await engine.dispose()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--driver", choices=DRIVERS)
+    parser.add_argument("--email", default=settings.FIRST_SUPERUSER)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    for driver in [args.driver] if args.driver else DRIVERS:
+        await benchmark_driver(driver, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
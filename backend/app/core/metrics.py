@@ -0,0 +1,31 @@
+from collections import defaultdict
+from threading import Lock
+
+# Process-local counters and summaries, exposed through the utils router
+_lock = Lock()
+_counters: dict[str, float] = defaultdict(float)
+_summaries: dict[str, dict[str, float]] = {}
+
+
+def increment(name: str, value: float = 1) -> None:
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float) -> None:
+    with _lock:
+        summary = _summaries.get(name)
+        if summary is None:
+            _summaries[name] = {"count": 1, "sum": value, "max": value}
+            return
+        summary["count"] += 1
+        summary["sum"] += value
+        summary["max"] = max(summary["max"], value)
+
+
+def snapshot() -> dict[str, dict]:
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "summaries": {name: dict(s) for name, s in _summaries.items()},
+        }
@@ -0,0 +1,80 @@
+"""
+Postgres NOTIFY between the API workers.
+
+Features register a handler per channel at import time, every worker then
+listens on all of them over one dedicated connection.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+import asyncpg
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import engine
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD_BYTES = 7900
+LISTEN_RETRY_SECONDS = 5
+
+# channel -> handler called with the payload of each notification
+_handlers: dict[str, Callable[[str], None]] = {}
+
+
+def register(channel: str, handler: Callable[[str], None]) -> None:
+    _handlers[channel] = handler
+
+
+async def notify(channel: str, payload: str) -> None:
+    async with AsyncSession(engine) as session:
+        await session.exec(select(func.pg_notify(channel, payload)))
+        await session.commit()
+
+
+def _on_notification(_connection, _pid: int, channel: str, payload: str) -> None:
+    try:
+        _handlers[channel](payload)
+    except Exception as e:
+        logger.error(f"Handling a notification on {channel} failed: {e}")
+
+
+async def _listen_until_lost() -> None:
+    # A dedicated asyncpg connection rather than one from the engine's pool,
+    # which may use another driver and would lose a slot for good
+    connection = await asyncpg.connect(
+        host=settings.POSTGRES_LISTEN_SERVER or settings.POSTGRES_SERVER,
+        port=settings.POSTGRES_PORT,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        database=settings.POSTGRES_DB,
+    )
+    try:
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        for channel in _handlers:
+            await connection.add_listener(channel, _on_notification)
+        await lost.wait()
+    finally:
+        await connection.close()
+
+
+async def listen() -> None:
+    """
+    Hand the notifications of every registered channel to its handler,
+    reconnecting whenever the listening connection is lost. Runs until
+    cancelled. Notifications sent while reconnecting are lost.
+    """
+    while True:
+        try:
+            await _listen_until_lost()
+            logger.warning("Lost the notifications connection, reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Listening for notifications failed: {e}")
+        await asyncio.sleep(LISTEN_RETRY_SECONDS)
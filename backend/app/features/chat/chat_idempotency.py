@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from typing import TypeVar
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import engine
+from app.features.chat.chat_models import IdempotencyRecord
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+POLL_INTERVAL_SECONDS = 0.5
+
+# Duplicates landing on this worker wait on the first request's future instead
+# of polling the database, the request hash is kept to reject reused keys
+_in_flight: dict[tuple[uuid.UUID, str], tuple[str, asyncio.Future[str]]] = {}
+
+
+def hash_request(scope: str, payload: BaseModel) -> str:
+    return hashlib.sha256(f"{scope}:{payload.model_dump_json()}".encode()).hexdigest()
+
+
+async def _claim_key(
+    session: AsyncSession, user_id: uuid.UUID, key: str, request_hash: str
+) -> bool:
+    now = datetime.utcnow()
+    await session.exec(
+        delete(IdempotencyRecord).where(
+            IdempotencyRecord.user_id == user_id,
+            IdempotencyRecord.key == key,
+            IdempotencyRecord.expires_at < now,
+        )
+    )
+    statement = (
+        insert(IdempotencyRecord)
+        .values(
+            key=key,
+            user_id=user_id,
+            request_hash=request_hash,
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+        )
+        .on_conflict_do_nothing()
+        .returning(IdempotencyRecord.key)
+    )
+    result = await session.exec(statement)
+    claimed = result.first() is not None
+    await session.commit()
+    return claimed
+
+
+async def _get_record(
+    session: AsyncSession, user_id: uuid.UUID, key: str
+) -> IdempotencyRecord | None:
+    statement = select(IdempotencyRecord).where(
+        IdempotencyRecord.user_id == user_id, IdempotencyRecord.key == key
+    )
+    result = await session.exec(statement.execution_options(populate_existing=True))
+    return result.first()
+
+
+async def _wait_for_response(user_id: uuid.UUID, key: str, request_hash: str) -> str:
+    """
+    Wait for the request that owns the key to store its response.
+    """
+    if (user_id, key) in _in_flight:
+        in_flight_hash, in_flight = _in_flight[(user_id, key)]
+        if in_flight_hash != request_hash:
+            raise HTTPException(
+                422, "Idempotency-Key was already used with a different request"
+            )
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(in_flight), settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                409, "A request with this Idempotency-Key is still in progress"
+            )
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS
+    async with AsyncSession(engine) as session:
+        while True:
+            record = await _get_record(session, user_id, key)
+            if not record:
+                raise HTTPException(
+                    409, "A request with this Idempotency-Key failed, retry it"
+                )
+            if record.request_hash != request_hash:
+                raise HTTPException(
+                    422, "Idempotency-Key was already used with a different request"
+                )
+            if record.response_body is not None:
+                return record.response_body
+            if loop.time() >= deadline:
+                raise HTTPException(
+                    409, "A request with this Idempotency-Key is still in progress"
+                )
+            await session.commit()
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+async def run_idempotent(
+    *,
+    key: str | None,
+    user_id: uuid.UUID,
+    scope: str,
+    payload: BaseModel,
+    response_model: type[ResponseT],
+    handler: Callable[[], Awaitable[ResponseT]],
+) -> ResponseT:
+    """
+    Run handler once per (user, Idempotency-Key) and replay its stored response
+    for retries within the TTL.
+    """
+    if not key:
+        return await handler()
+
+    request_hash = hash_request(scope, payload)
+    async with AsyncSession(engine) as session:
+        claimed = await _claim_key(session, user_id, key, request_hash)
+    if not claimed:
+        response_body = await _wait_for_response(user_id, key, request_hash)
+        return response_model.model_validate_json(response_body)
+
+    in_flight: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+    _in_flight[(user_id, key)] = (request_hash, in_flight)
+    try:
+        response = await handler()
+    except BaseException as e:
+        async with AsyncSession(engine) as session:
+            await session.exec(
+                delete(IdempotencyRecord).where(
+                    IdempotencyRecord.user_id == user_id,
+                    IdempotencyRecord.key == key,
+                )
+            )
+            await session.commit()
+        in_flight.set_exception(
+            HTTPException(409, "A request with this Idempotency-Key failed, retry it")
+        )
+        # Mark the exception retrieved so an unawaited future doesn't log it
+        in_flight.exception()
+        raise e
+    finally:
+        _in_flight.pop((user_id, key), None)
+
+    response_body = response.model_dump_json()
+    async with AsyncSession(engine) as session:
+        record = await _get_record(session, user_id, key)
+        if record:
+            record.response_body = response_body
+            session.add(record)
+            await session.commit()
+    in_flight.set_result(response_body)
+    return response
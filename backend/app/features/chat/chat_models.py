@@ -0,0 +1,55 @@
+import uuid
+from datetime import date, datetime
+
+from sqlmodel import Field, SQLModel
+
+
+# Database model
+class IdempotencyRecord(SQLModel, table=True):
+    key: str = Field(primary_key=True, max_length=255)
+    user_id: uuid.UUID = Field(primary_key=True)
+    request_hash: str = Field(max_length=64)
+    response_body: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+
+
+# LLM usage of Letta message calls summed per user, conversation and day
+class LlmUsage(SQLModel, table=True):
+    user_id: uuid.UUID = Field(primary_key=True)
+    conversation_id: str = Field(primary_key=True, max_length=255)
+    chat_type: str = Field(primary_key=True, max_length=32)
+    day: date = Field(primary_key=True, index=True)
+    message_count: int = 0
+    step_count: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class LlmUsagePublic(SQLModel):
+    user_id: uuid.UUID
+    conversation_id: str
+    chat_type: str
+    day: date
+    message_count: int
+    step_count: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+
+
+class LlmUsagesPublic(SQLModel):
+    data: list[LlmUsagePublic]
+    count: int
+
+
+# Chat list preview of a conversation for one of its participants
+class ConversationSummary(SQLModel, table=True):
+    user_id: uuid.UUID = Field(primary_key=True)
+    conversation_id: str = Field(primary_key=True, max_length=255)
+    chat_type: str = Field(max_length=32)
+    last_message: str = Field(max_length=255)
+    last_message_at: datetime
+    unread_count: int = 0
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+
+from sqlalchemy import case
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import engine
+from app.features.chat.chat_models import ConversationSummary
+from app.features.letta_logic.letta_logic import CHAT_TYPES
+
+logger = logging.getLogger(__name__)
+
+SNIPPET_LENGTH = 140
+
+# Strong references to pending writes so they aren't garbage collected
+_pending_writes: set[asyncio.Task] = set()
+
+
+async def _save_message(
+    conversation_id: str,
+    chat_type: CHAT_TYPES,
+    participant_ids: list[str],
+    sender_id: uuid.UUID,
+    message: str,
+) -> None:
+    now = datetime.utcnow()
+    statement = insert(ConversationSummary).values(
+        [
+            {
+                "user_id": uuid.UUID(participant_id),
+                "conversation_id": conversation_id,
+                "chat_type": chat_type,
+                "last_message": message[:SNIPPET_LENGTH],
+                "last_message_at": now,
+                "unread_count": 0 if participant_id == str(sender_id) else 1,
+            }
+            for participant_id in participant_ids
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "conversation_id"],
+        set_={
+            "last_message": statement.excluded.last_message,
+            "last_message_at": statement.excluded.last_message_at,
+            # Sending a message means the sender has read the conversation
+            "unread_count": case(
+                (statement.excluded.unread_count == 0, 0),
+                else_=ConversationSummary.unread_count + 1,
+            ),
+        },
+    )
+    try:
+        async with AsyncSession(engine) as session:
+            await session.exec(statement)
+            await session.commit()
+    except Exception as e:
+        logger.error(f"Recording the preview of {conversation_id} failed: {e}")
+
+
+def record_message(
+    *,
+    conversation_id: str,
+    chat_type: CHAT_TYPES,
+    participant_ids: list[str],
+    sender_id: uuid.UUID,
+    message: str,
+) -> None:
+    """
+    Update the preview of every participant, counting the message as unread
+    for everyone but its sender, without making the caller wait for the write.
+    """
+    task = asyncio.create_task(
+        _save_message(conversation_id, chat_type, participant_ids, sender_id, message)
+    )
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+
+
+async def mark_read(
+    *, session: AsyncSession, user_id: uuid.UUID, conversation_id: str
+) -> None:
+    await session.exec(
+        update(ConversationSummary)
+        .where(
+            ConversationSummary.user_id == user_id,
+            ConversationSummary.conversation_id == conversation_id,
+            ConversationSummary.unread_count > 0,
+        )
+        .values(unread_count=0)
+    )
+    await session.commit()
+
+
+async def get_summaries(
+    *, session: AsyncSession, user_id: uuid.UUID, conversation_ids: list[str]
+) -> dict[str, ConversationSummary]:
+    """
+    The user's previews of the conversations, in a single query.
+    """
+    if not conversation_ids:
+        return {}
+    result = await session.exec(
+        select(ConversationSummary).where(
+            ConversationSummary.user_id == user_id,
+            col(ConversationSummary.conversation_id).in_(conversation_ids),
+        )
+    )
+    return {summary.conversation_id: summary for summary in result.all()}
+
+
+def to_preview(summary: ConversationSummary | None) -> dict:
+    if not summary:
+        return {}
+    return {
+        "last_message": summary.last_message,
+        "last_message_at": summary.last_message_at,
+        "unread_count": summary.unread_count,
+    }
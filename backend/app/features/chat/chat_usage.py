@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import uuid
+from datetime import date, datetime
+
+from letta_client.types import LettaUsageStatistics
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import engine
+from app.features.chat.chat_models import LlmUsage
+from app.features.letta_logic.letta_logic import CHAT_TYPES
+
+logger = logging.getLogger(__name__)
+
+# Strong references to pending writes so they aren't garbage collected
+_pending_writes: set[asyncio.Task] = set()
+
+
+async def _save_usage(
+    user_id: uuid.UUID,
+    conversation_id: str,
+    chat_type: CHAT_TYPES,
+    usage: LettaUsageStatistics,
+) -> None:
+    now = datetime.utcnow()
+    counters = {
+        "message_count": 1,
+        "step_count": usage.step_count or 0,
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "completion_tokens": usage.completion_tokens or 0,
+        "total_tokens": usage.total_tokens or 0,
+    }
+    statement = insert(LlmUsage).values(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        chat_type=chat_type,
+        day=now.date(),
+        updated_at=now,
+        **counters,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "conversation_id", "chat_type", "day"],
+        set_={
+            **{
+                name: getattr(LlmUsage, name) + value
+                for name, value in counters.items()
+            },
+            "updated_at": now,
+        },
+    )
+    try:
+        async with AsyncSession(engine) as session:
+            await session.exec(statement)
+            await session.commit()
+    except Exception as e:
+        logger.error(f"Recording LLM usage of {conversation_id} failed: {e}")
+
+
+def record_usage(
+    *,
+    user_id: uuid.UUID,
+    conversation_id: str,
+    chat_type: CHAT_TYPES,
+    usage: LettaUsageStatistics,
+) -> None:
+    """
+    Add the usage of a Letta response to the daily totals without making the
+    caller wait for the write.
+    """
+    task = asyncio.create_task(_save_usage(user_id, conversation_id, chat_type, usage))
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+
+
+async def get_usage(
+    *,
+    session: AsyncSession,
+    user_id: uuid.UUID | None = None,
+    conversation_id: str | None = None,
+    chat_type: CHAT_TYPES | None = None,
+    start_day: date | None = None,
+    end_day: date | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> tuple[list[LlmUsage], int]:
+    """
+    Daily usage rows matching the filters, heaviest first.
+    """
+    filters = []
+    if user_id:
+        filters.append(LlmUsage.user_id == user_id)
+    if conversation_id:
+        filters.append(LlmUsage.conversation_id == conversation_id)
+    if chat_type:
+        filters.append(LlmUsage.chat_type == chat_type)
+    if start_day:
+        filters.append(LlmUsage.day >= start_day)
+    if end_day:
+        filters.append(LlmUsage.day <= end_day)
+
+    count_statement = select(func.count()).select_from(LlmUsage).where(*filters)
+    count = (await session.exec(count_statement)).one()
+    statement = (
+        select(LlmUsage)
+        .where(*filters)
+        .order_by(col(LlmUsage.total_tokens).desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    usage = (await session.exec(statement)).all()
+    return list(usage), count
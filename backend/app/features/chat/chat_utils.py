@@ -1,14 +1,45 @@
-from fastapi import HTTPException
-from letta_client import AgentState
+import asyncio
+from collections.abc import Awaitable
+from typing import TypeVar
 
+from fastapi import HTTPException, Request
+
+from app.core import metrics
+from app.features.letta_logic.letta_logic import get_agent_summary
+from app.features.letta_logic.letta_models import AgentSummary
 from app.features.users.users_models import User
-from app.features.letta_logic.letta_logic import get_agent_by_id
+
+T = TypeVar("T")
+
+DISCONNECT_POLL_INTERVAL_SECONDS = 0.5
 
 
 async def get_conversation_for_user(
     current_user: User, chat_conversation_id: str
-) -> AgentState:
-    conversation_agent = await get_agent_by_id(chat_conversation_id)
+) -> AgentSummary:
+    conversation_agent = await get_agent_summary(chat_conversation_id)
     if str(current_user.id) not in conversation_agent.tags:
         raise HTTPException(403, "User not part of this conversation")
     return conversation_agent
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """
+    Await the handler while watching the client connection, cancelling the
+    outstanding Letta work if the client goes away.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {task}, timeout=DISCONNECT_POLL_INTERVAL_SECONDS
+            )
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                metrics.increment("requests_cancelled.disconnect")
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise HTTPException(499, "Client closed request")
+    finally:
+        task.cancel()
@@ -1,9 +1,12 @@
-from typing import Any
+import uuid
+from datetime import datetime
+from typing import Any, NoReturn
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.features.connections.connections_crud import (
+    count_user_connections,
     get_user_connections,
     get_connection,
     create_connection,
@@ -13,16 +16,27 @@ from app.features.connections.connections_crud import (
 from app.features.connections.connections_models import (
     ConnectionPublic,
     ConnectionCreate,
+    ConnectionDirection,
     ConnectionsPublic,
     ConnectionStatus,
     ConnectionUpdate,
 )
 from app.features.core.api_deps import get_current_user, get_db
+from app.features.core.pagination import decode_cursor, encode_cursor
 from app.features.users.users_models import User
 
 router = APIRouter(prefix="/connections", tags=["connections"])
 
 
+async def _raise_connection_not_writable(
+    session: AsyncSession, connection_id: str
+) -> NoReturn:
+    # Only looked up after the write matched nothing, to tell the two apart
+    if await get_connection(session=session, connection_id=connection_id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    raise HTTPException(status_code=404, detail="Connection not found")
+
+
 @router.post("/", response_model=ConnectionPublic)
 async def create_connection_endpoint(
     *,
@@ -45,16 +59,44 @@ async def read_connections(
     session: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
     status: ConnectionStatus | None = None,
-    skip: int = 0,
-    limit: int = Query(default=100, le=100),
+    direction: ConnectionDirection | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=100),
+    include_count: bool = False,
 ) -> Any:
     """
-    Retrieve connections.
+    Retrieve connections, most recently updated first.
     """
+    after = None
+    if cursor:
+        try:
+            updated_at, connection_id = decode_cursor(cursor)
+            after = (datetime.fromisoformat(updated_at), uuid.UUID(connection_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    # One extra row tells whether there is a next page
     connections = await get_user_connections(
-        session=session, user_id=str(current_user.id), status=status
+        session=session,
+        user_id=str(current_user.id),
+        status=status,
+        direction=direction,
+        after=after,
+        limit=limit + 1,
     )
-    return {"data": connections, "count": len(connections)}
+    next_cursor = None
+    if len(connections) > limit:
+        connections = connections[:limit]
+        last = connections[-1]
+        next_cursor = encode_cursor(last.updated_at.isoformat(), last.id)
+    count = None
+    if include_count:
+        count = await count_user_connections(
+            session=session,
+            user_id=str(current_user.id),
+            status=status,
+            direction=direction,
+        )
+    return ConnectionsPublic(data=connections, count=count, next_cursor=next_cursor)
 
 
 @router.get("/{connection_id}", response_model=ConnectionPublic)
@@ -88,14 +130,14 @@ async def update_connection_endpoint(
     """
     Update a connection.
     """
-    connection = await get_connection(session=session, connection_id=connection_id)
-    if not connection:
-        raise HTTPException(status_code=404, detail="Connection not found")
-    if str(connection.target_user_id) != str(current_user.id):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
     connection = await update_connection(
-        session=session, connection=connection, connection_update=connection_in
+        session=session,
+        connection_id=connection_id,
+        target_user_id=current_user.id,
+        connection_update=connection_in,
     )
+    if not connection:
+        await _raise_connection_not_writable(session, connection_id)
     return connection
 
 
@@ -109,12 +151,9 @@ async def delete_connection_endpoint(
     """
     Delete a connection.
     """
-    connection = await get_connection(session=session, connection_id=connection_id)
-    if not connection:
-        raise HTTPException(status_code=404, detail="Connection not found")
-    if str(connection.source_user_id) != str(current_user.id) and str(
-        connection.target_user_id
-    ) != str(current_user.id):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    await delete_connection(session=session, connection=connection)
+    deleted = await delete_connection(
+        session=session, connection_id=connection_id, user_id=current_user.id
+    )
+    if not deleted:
+        await _raise_connection_not_writable(session, connection_id)
     return {"ok": True}
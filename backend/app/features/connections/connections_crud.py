@@ -1,12 +1,16 @@
+import uuid
 from datetime import datetime
-from typing import Any, List
 
-from sqlmodel import select
+from sqlalchemy import ColumnElement, Select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+from sqlmodel import col, delete, func, select, tuple_, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.features.connections.connections_models import (
     Connection,
     ConnectionCreate,
+    ConnectionDirection,
     ConnectionStatus,
     ConnectionUpdate,
 )
@@ -16,38 +20,58 @@ from app.features.users.users_models import User
 async def create_connection(
     *, session: AsyncSession, connection_create: ConnectionCreate, source_user: User
 ) -> Connection:
-    # Check if connection already exists
-    existing_connection = await get_connection_by_users(
-        session=session,
-        source_user_id=source_user.id,
-        target_user_id=connection_create.target_user_id,
-    )
-    if existing_connection:
-        return existing_connection
-
+    """
+    Create a connection request, or return the connection the two users
+    already have, whichever of them sent it.
+    """
     connection = Connection(
         source_user_id=source_user.id,
         target_user_id=connection_create.target_user_id,
         status=connection_create.status,
     )
-    session.add(connection)
+    statement = (
+        insert(Connection)
+        .values(connection.model_dump())
+        .on_conflict_do_update(
+            index_elements=[
+                func.least(Connection.source_user_id, Connection.target_user_id),
+                func.greatest(Connection.source_user_id, Connection.target_user_id),
+            ],
+            # Changes nothing, but unlike DO NOTHING returns the existing row
+            set_={"status": Connection.status},
+        )
+        .returning(Connection)
+    )
+    result = await session.exec(statement)
+    connection = result.scalar_one()
     await session.commit()
-    await session.refresh(connection)
     return connection
 
 
 async def update_connection(
     *,
     session: AsyncSession,
-    connection: Connection,
+    connection_id: str,
+    target_user_id: uuid.UUID,
     connection_update: ConnectionUpdate,
-) -> Connection:
+) -> Connection | None:
+    """
+    Update a connection sent to target_user_id, None if there is no such
+    connection.
+    """
     connection_data = connection_update.model_dump(exclude_unset=True)
     connection_data["updated_at"] = datetime.utcnow()
-    connection.sqlmodel_update(connection_data)
-    session.add(connection)
+    result = await session.exec(
+        update(Connection)
+        .where(
+            Connection.id == connection_id,
+            Connection.target_user_id == target_user_id,
+        )
+        .values(connection_data)
+        .returning(Connection)
+    )
+    connection = result.scalar_one_or_none()
     await session.commit()
-    await session.refresh(connection)
     return connection
 
 
@@ -59,29 +83,109 @@ async def get_connection(
     return result.first()
 
 
-async def get_connection_by_users(
-    *, session: AsyncSession, source_user_id: str, target_user_id: str
-) -> Connection | None:
-    statement = select(Connection).where(
-        Connection.source_user_id == source_user_id,
-        Connection.target_user_id == target_user_id,
-    )
-    result = await session.exec(statement)
-    return result.first()
+def _user_connection_filters(
+    user_id: str,
+    status: ConnectionStatus | None,
+    direction: ConnectionDirection | None,
+) -> list:
+    if direction == ConnectionDirection.INCOMING:
+        filters = [Connection.target_user_id == user_id]
+    elif direction == ConnectionDirection.OUTGOING:
+        filters = [Connection.source_user_id == user_id]
+    else:
+        filters = [
+            (Connection.source_user_id == user_id)
+            | (Connection.target_user_id == user_id)
+        ]
+    if status:
+        filters.append(Connection.status == status)
+    return filters
 
 
-async def get_user_connections(
-    *, session: AsyncSession, user_id: str, status: ConnectionStatus | None = None
-) -> List[Connection]:
-    statement = select(Connection).where(
-        (Connection.source_user_id == user_id) | (Connection.target_user_id == user_id)
-    )
+def _connection_page(
+    side: ColumnElement[bool],
+    status: ConnectionStatus | None,
+    after: tuple[datetime, uuid.UUID] | None,
+    limit: int | None,
+) -> Select:
+    statement = select(Connection).where(side)
     if status:
         statement = statement.where(Connection.status == status)
+    if after:
+        statement = statement.where(
+            tuple_(Connection.updated_at, Connection.id) < tuple_(*after)
+        )
+    return statement.order_by(
+        col(Connection.updated_at).desc(), col(Connection.id).desc()
+    ).limit(limit)
+
+
+async def get_user_connections(
+    *,
+    session: AsyncSession,
+    user_id: str,
+    status: ConnectionStatus | None = None,
+    direction: ConnectionDirection | None = None,
+    after: tuple[datetime, uuid.UUID] | None = None,
+    limit: int | None = None,
+) -> list[Connection]:
+    """
+    The user's connections, most recently updated first. after is the
+    (updated_at, id) of the last connection of the previous page.
+    """
+    sides = []
+    if direction != ConnectionDirection.INCOMING:
+        sides.append(Connection.source_user_id == user_id)
+    if direction != ConnectionDirection.OUTGOING:
+        incoming = Connection.target_user_id == user_id
+        if direction is None:
+            # A connection to oneself is already on the outgoing side
+            incoming &= Connection.source_user_id != user_id
+        sides.append(incoming)
+    pages = [_connection_page(side, status, after, limit) for side in sides]
+    if len(pages) == 1:
+        statement = pages[0]
+    else:
+        # Each side reads its (user id, updated_at, id) index in order, an OR
+        # would sort all of the user's connections for every page
+        page = union_all(*pages).subquery()
+        statement = (
+            select(aliased(Connection, page))
+            .order_by(page.c.updated_at.desc(), page.c.id.desc())
+            .limit(limit)
+        )
     result = await session.exec(statement)
-    return result.all()
+    return list(result.all())
+
+
+async def count_user_connections(
+    *,
+    session: AsyncSession,
+    user_id: str,
+    status: ConnectionStatus | None = None,
+    direction: ConnectionDirection | None = None,
+) -> int:
+    filters = _user_connection_filters(user_id, status, direction)
+    statement = select(func.count()).select_from(Connection).where(*filters)
+    return (await session.exec(statement)).one()
 
 
-async def delete_connection(*, session: AsyncSession, connection: Connection) -> None:
-    await session.delete(connection)
+async def delete_connection(
+    *, session: AsyncSession, connection_id: str, user_id: uuid.UUID
+) -> bool:
+    """
+    Delete a connection user_id takes part in, False if there is no such
+    connection.
+    """
+    result = await session.exec(
+        delete(Connection)
+        .where(
+            Connection.id == connection_id,
+            (Connection.source_user_id == user_id)
+            | (Connection.target_user_id == user_id),
+        )
+        .returning(Connection.id)
+    )
+    deleted = result.first() is not None
     await session.commit()
+    return deleted
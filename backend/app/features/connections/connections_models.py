@@ -1,6 +1,8 @@
 import uuid
 from datetime import datetime
 from enum import Enum
+
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel
 
 
@@ -10,6 +12,11 @@ class ConnectionStatus(str, Enum):
     REJECTED = "rejected"
 
 
+class ConnectionDirection(str, Enum):
+    INCOMING = "incoming"
+    OUTGOING = "outgoing"
+
+
 # Shared properties
 class ConnectionBase(SQLModel):
     status: ConnectionStatus = Field(default=ConnectionStatus.PENDING)
@@ -27,6 +34,31 @@ class ConnectionUpdate(ConnectionBase):
 
 # Database model
 class Connection(ConnectionBase, table=True):
+    __table_args__ = (
+        Index("ix_connection_source_user_id_status", "source_user_id", "status"),
+        Index("ix_connection_target_user_id_status", "target_user_id", "status"),
+        # Pages of a user's connections, most recently updated first
+        Index(
+            "ix_connection_source_user_id_updated_at",
+            "source_user_id",
+            "updated_at",
+            "id",
+        ),
+        Index(
+            "ix_connection_target_user_id_updated_at",
+            "target_user_id",
+            "updated_at",
+            "id",
+        ),
+        # At most one connection between two users, whoever sent it
+        Index(
+            "uq_connection_user_pair",
+            text("LEAST(source_user_id, target_user_id)"),
+            text("GREATEST(source_user_id, target_user_id)"),
+            unique=True,
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     status: str = Field(default=ConnectionStatus.PENDING)
     source_user_id: uuid.UUID = Field(foreign_key="user.id")
@@ -46,4 +78,7 @@ class ConnectionPublic(ConnectionBase):
 
 class ConnectionsPublic(SQLModel):
     data: list[ConnectionPublic]
-    count: int
+    # Only counted when asked for
+    count: int | None = None
+    # Pass as cursor to get the next page, None on the last one
+    next_cursor: str | None = None
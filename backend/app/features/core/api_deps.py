@@ -3,16 +3,30 @@ from typing import Annotated
 import os
 
 import jwt
-from fastapi import Depends, HTTPException, status, Header
+from fastapi import (
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    WebSocketException,
+    status,
+)
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core import security
+from app.core import metrics, security
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import (
+    create_session,
+    release_connection,
+    request_session,
+    use_primary,
+)
 from app.features.core.models import TokenPayload
+from app.features.letta_logic.letta_logic import set_deadline
 from app.features.users.users_models import User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -20,16 +34,35 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSession(engine) as session:
-        yield session
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    # Only reads of GET requests can go to the replica, the rest read rows
+    # they are about to change
+    primary_only = request.method not in ("GET", "HEAD")
+    async with request_session(primary_only) as session:
+        try:
+            yield session
+        finally:
+            # Routes that never use their session can drop SessionDep
+            route = request.scope.get("route")
+            path = route.path if route else request.url.path
+            usage = "used" if session.used else "unused"
+            metrics.increment(f"db_sessions.{usage}.{request.method} {path}")
 
 
 SessionDep = Annotated[AsyncSession, Depends(get_db)]
+
+
+async def get_primary_db(session: SessionDep) -> AsyncSession:
+    use_primary()
+    return session
+
+
+# For GET routes that must see what the client just wrote
+PrimarySessionDep = Annotated[AsyncSession, Depends(get_primary_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-async def get_current_user(session: SessionDep, token: TokenDep) -> User:
+async def _get_user_from_token(session: AsyncSession, token: str) -> User:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -47,9 +80,42 @@ async def get_current_user(session: SessionDep, token: TokenDep) -> User:
     return user
 
 
+async def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    return await _get_user_from_token(session, token)
+
+
+async def get_websocket_user(token: str = Query()) -> User:
+    """
+    Authenticate a WebSocket with the access token in the query string, since
+    browsers can't set headers on WebSocket connections.
+    """
+    # Not SessionDep, which would hold a connection for the socket's lifetime
+    async with create_session() as session:
+        try:
+            return await _get_user_from_token(session, token)
+        except HTTPException as e:
+            raise WebSocketException(
+                code=status.WS_1008_POLICY_VIOLATION, reason=e.detail
+            )
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
+async def get_letta_user(current_user: CurrentUser) -> User:
+    # The route calls Letta next, which must not hold a pooled connection.
+    # Closing the session detaches what it loaded, the user was already
+    # expunged by the lookup so it stays usable.
+    await release_connection()
+    return current_user
+
+
+# For routes calling Letta after reading the user, the user's lookup hands its
+# connection back before the Letta calls
+LettaUser = Annotated[User, Depends(get_letta_user)]
+WebSocketUser = Annotated[User, Depends(get_websocket_user)]
+
+
 async def get_current_active_superuser(current_user: CurrentUser) -> User:
     if not current_user.is_superuser:
         raise HTTPException(
@@ -68,3 +134,21 @@ async def get_letta_agent_key(api_key: str = Depends(Header(alias="X-LETTA-AGENT
 
 
 LettaAgentKey = Annotated[str, Depends(get_letta_agent_key)]
+
+
+def request_deadline(default_timeout_seconds: float):
+    """
+    Dependency setting the deadline for the request's Letta calls, from the
+    X-Request-Timeout header capped by the route default.
+    """
+
+    async def set_request_deadline(
+        request_timeout: float | None = Header(None, alias="X-Request-Timeout", gt=0),
+    ) -> float:
+        timeout = default_timeout_seconds
+        if request_timeout is not None:
+            timeout = min(request_timeout, default_timeout_seconds)
+        set_deadline(timeout)
+        return timeout
+
+    return Depends(set_request_deadline)
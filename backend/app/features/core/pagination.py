@@ -0,0 +1,41 @@
+import base64
+import json
+from typing import Any
+
+from sqlalchemy import Select, text
+from sqlalchemy.dialects import postgresql
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Opaque cursor holding the sort key of the last row of a page.
+    """
+    payload = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """
+    Values passed to encode_cursor, raises ValueError for malformed cursors.
+    """
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if not isinstance(values, list):
+        raise ValueError("Cursor must hold a list")
+    return values
+
+
+async def estimate_count(session: AsyncSession, statement: Select) -> int:
+    """
+    Rows the planner expects the statement to return, from the table
+    statistics rather than a scan. Parameters are inlined, so the statement
+    must only hold trusted values.
+    """
+    sql = statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    result = await session.exec(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
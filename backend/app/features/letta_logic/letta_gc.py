@@ -0,0 +1,296 @@
+"""
+Delete Letta blocks and agents that nothing in Postgres refers to anymore.
+
+    python -m app.features.letta_logic.letta_gc [--dry-run] [--grace-hours 24] [--max-deletes-per-second 5]
+
+Meant to run on a schedule, e.g. a nightly cron job. Agents are deleted once
+they are older than the grace period and none of their participants exist.
+Blocks are deleted once they have stayed unattached and unreferenced for longer
+than the grace period, counted from the run that first saw them orphaned. With
+--dry-run nothing is written and the orphans are only logged.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from typing import get_args
+
+from letta_client import NotFoundError
+from letta_client.types import AgentState, Block
+from sqlmodel import col, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import engine
+from app.features.letta_logic.letta_logic import (
+    AGENT_LIST_RELATIONSHIPS,
+    BLOCK_TYPES,
+    CHAT_TYPES,
+)
+from app.features.letta_logic.letta_models import (
+    LettaBlockReplica,
+    LettaOrphanBlock,
+    LettaPlacement,
+)
+from app.features.letta_logic.letta_shards import LETTA_URLS, get_letta_client
+from app.features.users.users_models import (
+    TeardownJobStatus,
+    User,
+    UserTeardownJob,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100
+
+
+class RateLimiter:
+    def __init__(self, per_second: float):
+        self.interval = 1 / per_second
+        self._next_at = 0.0
+
+    async def wait(self) -> None:
+        now = time.monotonic()
+        if self._next_at > now:
+            await asyncio.sleep(self._next_at - now)
+        self._next_at = max(now, self._next_at) + self.interval
+
+
+async def load_references() -> tuple[set[str], set[str]]:
+    """
+    Letta ids of every block still in use and the ids of every user whose
+    agents must be kept. Users with an unfinished teardown job count as
+    existing, their resources are left to the job.
+    """
+    async with AsyncSession(engine) as session:
+        users = (
+            await session.exec(
+                select(User.id, User.profile_block_id, User.yenta_block_id)
+            )
+        ).all()
+        jobs = (
+            await session.exec(
+                select(
+                    UserTeardownJob.user_id,
+                    UserTeardownJob.profile_block_id,
+                    UserTeardownJob.yenta_block_id,
+                ).where(
+                    col(UserTeardownJob.status).in_(
+                        [TeardownJobStatus.PENDING, TeardownJobStatus.RUNNING]
+                    )
+                )
+            )
+        ).all()
+        placements = (
+            await session.exec(
+                select(LettaPlacement.resource_id, LettaPlacement.letta_id).where(
+                    LettaPlacement.resource_type == "block"
+                )
+            )
+        ).all()
+        replica_ids = (
+            await session.exec(select(LettaBlockReplica.replica_block_id))
+        ).all()
+
+    letta_ids = dict(placements)
+    block_ids = {
+        letta_ids.get(block_id, block_id)
+        for _, profile_block_id, yenta_block_id in [*users, *jobs]
+        for block_id in (profile_block_id, yenta_block_id)
+        if block_id
+    }
+    block_ids.update(replica_ids)
+    user_ids = {str(user_id) for user_id, _, _ in [*users, *jobs]}
+    return block_ids, user_ids
+
+
+def is_orphan_agent(agent: AgentState, user_ids: set[str], cutoff: datetime) -> bool:
+    # Only agents created by the backend are tagged with a chat type
+    if not set(agent.tags) & set(get_args(CHAT_TYPES)):
+        return False
+    if agent.created_at is None:
+        return False
+    created_at = agent.created_at
+    if created_at.tzinfo:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    if created_at >= cutoff:
+        return False
+    return not any(tag in user_ids for tag in agent.tags)
+
+
+async def list_agents(shard: str) -> AsyncIterator[AgentState]:
+    client = get_letta_client(shard)
+    after = None
+    while True:
+        agents = await client.agents.list(
+            limit=PAGE_SIZE,
+            after=after,
+            include_relationships=AGENT_LIST_RELATIONSHIPS,
+        )
+        if not agents:
+            return
+        for agent in agents:
+            yield agent
+        after = agents[-1].id
+
+
+async def list_unattached_blocks(shard: str) -> AsyncIterator[Block]:
+    client = get_letta_client(shard)
+    # The backend creates its blocks as templates, which some Letta versions
+    # leave out unless templates_only is set, so both kinds are listed
+    seen: set[str] = set()
+    for templates_only in (True, False):
+        after = None
+        while True:
+            blocks = await client.blocks.list(
+                templates_only=templates_only,
+                connected_to_agents_count_eq=[0],
+                limit=PAGE_SIZE,
+                after=after,
+            )
+            if not blocks:
+                break
+            for block in blocks:
+                if block.id not in seen:
+                    seen.add(block.id)
+                    yield block
+            after = blocks[-1].id
+
+
+async def _forget_deleted(shard: str, letta_ids: list[str]) -> None:
+    if not letta_ids:
+        return
+    async with AsyncSession(engine) as session:
+        await session.exec(
+            delete(LettaPlacement).where(
+                LettaPlacement.shard == shard,
+                col(LettaPlacement.letta_id).in_(letta_ids),
+            )
+        )
+        await session.exec(
+            delete(LettaOrphanBlock).where(
+                col(LettaOrphanBlock.letta_id).in_(letta_ids)
+            )
+        )
+        await session.commit()
+
+
+async def sweep_agents(
+    shard: str,
+    user_ids: set[str],
+    cutoff: datetime,
+    limiter: RateLimiter,
+    dry_run: bool,
+) -> int:
+    client = get_letta_client(shard)
+    # Collected first, deleting while paging would invalidate the cursor
+    orphan_ids = [
+        agent.id
+        async for agent in list_agents(shard)
+        if is_orphan_agent(agent, user_ids, cutoff)
+    ]
+    if dry_run:
+        for agent_id in orphan_ids:
+            logger.info(f"{shard} {agent_id}: orphaned agent")
+        return len(orphan_ids)
+
+    deleted = []
+    for agent_id in orphan_ids:
+        await limiter.wait()
+        try:
+            await client.agents.delete(agent_id)
+        except NotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"{shard} {agent_id}: deleting agent failed: {e}")
+            continue
+        deleted.append(agent_id)
+    await _forget_deleted(shard, deleted)
+    return len(deleted)
+
+
+async def sweep_blocks(
+    shard: str,
+    block_ids: set[str],
+    cutoff: datetime,
+    limiter: RateLimiter,
+    dry_run: bool,
+) -> int:
+    client = get_letta_client(shard)
+    labels = set(get_args(BLOCK_TYPES))
+    orphan_ids = {
+        block.id
+        async for block in list_unattached_blocks(shard)
+        if block.id not in block_ids and block.label in labels
+    }
+
+    async with AsyncSession(engine) as session:
+        result = await session.exec(
+            select(LettaOrphanBlock).where(LettaOrphanBlock.shard == shard)
+        )
+        first_seen = {o.letta_id: o.first_seen_at for o in result.all()}
+        if not dry_run:
+            # Blocks attached or referenced again since the previous run
+            reclaimed = list(first_seen.keys() - orphan_ids)
+            if reclaimed:
+                await session.exec(
+                    delete(LettaOrphanBlock).where(
+                        col(LettaOrphanBlock.letta_id).in_(reclaimed)
+                    )
+                )
+            session.add_all(
+                LettaOrphanBlock(letta_id=letta_id, shard=shard)
+                for letta_id in orphan_ids - first_seen.keys()
+            )
+            await session.commit()
+
+    expired = [
+        letta_id
+        for letta_id in orphan_ids
+        if letta_id in first_seen and first_seen[letta_id] < cutoff
+    ]
+    if dry_run:
+        for letta_id in expired:
+            logger.info(f"{shard} {letta_id}: orphaned block")
+        return len(expired)
+
+    deleted = []
+    for letta_id in expired:
+        await limiter.wait()
+        try:
+            await client.blocks.delete(letta_id)
+        except NotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"{shard} {letta_id}: deleting block failed: {e}")
+            continue
+        deleted.append(letta_id)
+    await _forget_deleted(shard, deleted)
+    return len(deleted)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--grace-hours", type=float, default=24)
+    parser.add_argument("--max-deletes-per-second", type=float, default=5)
+    args = parser.parse_args()
+
+    cutoff = datetime.utcnow() - timedelta(hours=args.grace_hours)
+    limiter = RateLimiter(args.max_deletes_per_second)
+    action = "to delete" if args.dry_run else "deleted"
+    for shard in LETTA_URLS:
+        # Loaded per shard so users created during a long sweep are seen
+        block_ids, user_ids = await load_references()
+        agents = await sweep_agents(shard, user_ids, cutoff, limiter, args.dry_run)
+        logger.info(f"{shard}: {agents} orphaned agents {action}")
+        # After the agents, since deleting them can leave their blocks unattached
+        blocks = await sweep_blocks(shard, block_ids, cutoff, limiter, args.dry_run)
+        logger.info(f"{shard}: {blocks} orphaned blocks {action}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
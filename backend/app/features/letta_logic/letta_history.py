@@ -0,0 +1,245 @@
+"""
+Trim the message history of agents that have grown past a threshold.
+
+    python -m app.features.letta_logic.letta_history [--chat-type yenta-chat] [--reset] [--apply]
+
+Every message except the newest --keep-messages is copied into the
+archivedmessage table, starting after the newest message a previous run
+archived. Then the agent's in-context buffer is summarized
+down to --keep-messages. With --reset the agent's messages are cleared
+instead, which also drops Letta's recall memory. Memory blocks are kept
+either way.
+
+Meant to run from cron during off-peak hours. Agents are only started
+inside --off-peak-hours (UTC), so a run that lasts too long stops on its
+own. Without --apply only the agents over the threshold are logged.
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import get_args
+
+from letta_client import NotFoundError
+from letta_client.types import AgentState, LettaMessageUnion
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import engine
+from app.features.letta_logic.letta_logic import CHAT_TYPES, get_letta_client
+from app.features.letta_logic.letta_models import (
+    ArchivedMessage,
+    ArchivedMessageCursor,
+)
+from app.features.letta_logic.letta_shards import LETTA_URLS, to_resource_ids
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100
+
+
+def parse_hours(value: str) -> tuple[int, int]:
+    start, _, end = value.partition("-")
+    return int(start), int(end)
+
+
+def in_window(hours: tuple[int, int], now: datetime) -> bool:
+    start, end = hours
+    if start <= end:
+        return start <= now.hour < end
+    # Windows like 22-4 wrap around midnight
+    return now.hour >= start or now.hour < end
+
+
+async def needs_trimming(
+    shard: str, agent: AgentState, max_messages: int, max_context_ratio: float
+) -> bool:
+    if len(agent.message_ids or []) > max_messages:
+        return True
+    if not max_context_ratio:
+        return False
+    context = await get_letta_client(shard).agents.context.retrieve(agent.id)
+    return (
+        context.context_window_size_current
+        > context.context_window_size_max * max_context_ratio
+    )
+
+
+def _to_archived(agent_id: str, message: LettaMessageUnion) -> dict:
+    date = message.date
+    if date.tzinfo:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    return {
+        "message_id": message.id,
+        "message_type": message.message_type,
+        "agent_id": agent_id,
+        "date": date,
+        "content": message.model_dump_json(),
+        "archived_at": datetime.utcnow(),
+    }
+
+
+async def _get_archived_until(agent_id: str) -> str | None:
+    async with AsyncSession(engine) as session:
+        cursor = await session.get(ArchivedMessageCursor, agent_id)
+        return cursor.message_id if cursor else None
+
+
+async def _set_archived_until(agent_id: str, message_id: str) -> None:
+    values = {
+        "agent_id": agent_id,
+        "message_id": message_id,
+        "updated_at": datetime.utcnow(),
+    }
+    async with AsyncSession(engine) as session:
+        await session.exec(
+            insert(ArchivedMessageCursor)
+            .values(values)
+            .on_conflict_do_update(index_elements=["agent_id"], set_=values)
+        )
+        await session.commit()
+
+
+async def archive_messages(
+    shard: str, letta_id: str, agent_id: str, keep_messages: int
+) -> int:
+    """
+    Copy all but the newest keep_messages of the agent into the archive, page
+    by page from the newest one back to the newest one archived before.
+    """
+    client = get_letta_client(shard)
+    archived_until = await _get_archived_until(agent_id)
+    archived = 0
+    skipped = 0
+    newest_archived = None
+    before = None
+    while True:
+        try:
+            # Letta returns the newest messages between after and before
+            messages = await client.agents.messages.list(
+                letta_id, after=archived_until, before=before, limit=PAGE_SIZE
+            )
+        except NotFoundError:
+            if not archived_until:
+                raise
+            # The message is gone since a reset, so start over from the newest
+            archived_until = None
+            continue
+        if not messages:
+            break
+        before = messages[0].id
+        # Each page is in chronological order, the messages kept are at its end
+        older = messages[: max(len(messages) - (keep_messages - skipped), 0)]
+        skipped += len(messages) - len(older)
+        if older:
+            async with AsyncSession(engine) as session:
+                await session.exec(
+                    insert(ArchivedMessage)
+                    .values([_to_archived(agent_id, m) for m in older])
+                    .on_conflict_do_nothing()
+                )
+                await session.commit()
+            archived += len(older)
+            newest_archived = newest_archived or older[-1].id
+    # Only moved once every page is in, a run that fails halfway is redone
+    if newest_archived:
+        await _set_archived_until(agent_id, newest_archived)
+    return archived
+
+
+async def trim_agent(
+    shard: str, letta_id: str, agent_id: str, keep_messages: int, reset: bool
+) -> int:
+    archived = await archive_messages(shard, letta_id, agent_id, keep_messages)
+    client = get_letta_client(shard)
+    if reset:
+        await client.agents.messages.reset(letta_id, add_default_initial_messages=True)
+    else:
+        await client.agents.messages.summarize(
+            letta_id, max_message_length=keep_messages
+        )
+    return archived
+
+
+async def trim_chat_type(
+    shard: str,
+    chat_type: str,
+    args: argparse.Namespace,
+    semaphore: asyncio.Semaphore,
+) -> int:
+    client = get_letta_client(shard)
+    off_peak_hours = parse_hours(args.off_peak_hours)
+    trimmed = 0
+    after = None
+    while True:
+        if not in_window(off_peak_hours, datetime.utcnow()):
+            logger.info(f"{shard} {chat_type}: off-peak window over, stopping")
+            return trimmed
+        agents = await client.agents.list(
+            tags=[chat_type], limit=PAGE_SIZE, after=after
+        )
+        if not agents:
+            return trimmed
+        resource_ids = await to_resource_ids(shard, [a.id for a in agents])
+
+        async def trim(agent: AgentState, agent_id: str) -> bool:
+            async with semaphore:
+                if not in_window(off_peak_hours, datetime.utcnow()):
+                    return False
+                try:
+                    if not await needs_trimming(
+                        shard, agent, args.max_messages, args.max_context_ratio
+                    ):
+                        return False
+                    logger.info(
+                        f"{shard} {agent.id}: {len(agent.message_ids or [])} "
+                        "messages in context"
+                    )
+                    if not args.apply:
+                        return True
+                    archived = await trim_agent(
+                        shard,
+                        agent.id,
+                        agent_id,
+                        args.keep_messages,
+                        args.reset,
+                    )
+                    logger.info(f"{shard} {agent.id}: archived {archived} messages")
+                    return True
+                except Exception as e:
+                    logger.error(f"{shard} {agent.id}: trimming failed: {e}")
+                    return False
+
+        results = await asyncio.gather(
+            *[trim(agent, resource_ids[agent.id]) for agent in agents]
+        )
+        trimmed += sum(results)
+        after = agents[-1].id
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chat-type", choices=get_args(CHAT_TYPES))
+    parser.add_argument("--apply", action="store_true")
+    parser.add_argument("--reset", action="store_true")
+    parser.add_argument("--max-messages", type=int, default=200)
+    # Fraction of the context window, 0 skips the per-agent context lookup
+    parser.add_argument("--max-context-ratio", type=float, default=0.75)
+    parser.add_argument("--keep-messages", type=int, default=20)
+    parser.add_argument("--off-peak-hours", default="1-6")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    chat_types = [args.chat_type] if args.chat_type else list(get_args(CHAT_TYPES))
+    semaphore = asyncio.Semaphore(args.concurrency)
+    for shard in LETTA_URLS:
+        for chat_type in chat_types:
+            trimmed = await trim_chat_type(shard, chat_type, args, semaphore)
+            action = "trimmed" if args.apply else "to trim"
+            logger.info(f"{shard} {chat_type}: {trimmed} agents {action}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,13 @@
 import asyncio
 import os
-from typing import Literal
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Literal, TypeVar
 
-from letta_client import AsyncLetta, CreateBlock
+from letta_client import AsyncLetta, CreateBlock, NotFoundError
 from letta_client.types import (
     AgentState,
     Block,
@@ -12,25 +17,261 @@ from letta_client.types import (
     LettaResponse,
 )
 
+from app.core import metrics, notifications
+from app.features.core.pagination import decode_cursor, encode_cursor
+from app.features.letta_logic.letta_model_policy import get_model_tier
+from app.features.letta_logic.letta_models import AgentSummary
+from app.features.letta_logic.letta_shards import (
+    LETTA_URLS,
+    delete_block_replicas,
+    delete_placements,
+    forget_placement,
+    get_block_replica,
+    get_letta_client,
+    get_shard_for_key,
+    record_block_replica,
+    record_placement,
+    resolve,
+    resolve_many,
+    to_resource_ids,
+)
+from app.features.letta_logic.letta_tools import get_tool_ids
+
 BLOCK_TYPES = Literal["human", "persona", "interactions"]
 CHAT_TYPES = Literal["yenta-chat", "users-chat"]
-LETTA_URL = os.getenv("LETTA_URL", "http://localhost:8283")
+# Relationships loaded for agent lists and summaries, which only need tags
+AGENT_LIST_RELATIONSHIPS = ["tags"]
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Agent summaries back the membership check and are cached per worker. Tag
+# changes and deletions notify every worker to drop the agent's entry, the
+# expiry only bounds how long one stays stale when a notification is missed,
+# e.g. while a worker's listener reconnects.
+AGENT_SUMMARY_TTL_SECONDS = 30
+AGENT_SUMMARY_CACHE_SIZE = 10_000
+AGENT_SUMMARY_CHANNEL = "agent_summary_invalidations"
+
+T = TypeVar("T")
+
+# Absolute time.monotonic() deadline for the Letta calls of the current request
+_deadline: ContextVar[float | None] = ContextVar("letta_deadline", default=None)
+# Strong references to shielded cleanup tasks so they outlive a cancelled caller
+_cleanup_tasks: set[asyncio.Task] = set()
+# (agent id, user id, mentioned ids) -> (task resolving to the shard, letta
+# agent id and attached block ids, expiry timer) of yenta sends prepared ahead
+# of time
+_prepared: dict[
+    tuple[str, str, frozenset[str]],
+    tuple[asyncio.Future[tuple[str, str, list[str]]], asyncio.TimerHandle],
+] = {}
+# user id -> number of the user's prepared sends
+_prepared_per_user: Counter[str] = Counter()
+# agent id -> (time.monotonic() expiry, summary)
+_agent_summaries: dict[str, tuple[float, AgentSummary]] = {}
+
+
+class LettaDeadlineExceeded(TimeoutError):
+    pass
+
+
+def set_deadline(timeout_seconds: float) -> None:
+    _deadline.set(time.monotonic() + timeout_seconds)
+
+
+def get_remaining_time() -> float | None:
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+async def _call(awaitable: Awaitable[T], name: str) -> T:
+    """
+    Await a Letta call, cancelling it if the request deadline passes.
+    """
+    started_at = time.monotonic()
+    remaining = get_remaining_time()
+    try:
+        if remaining is None:
+            return await awaitable
+        return await asyncio.wait_for(awaitable, max(remaining, 0))
+    except LettaDeadlineExceeded:
+        # Raised by a nested call, which already counted it
+        raise
+    except asyncio.TimeoutError:
+        metrics.increment(f"letta_calls_cancelled.deadline.{name}")
+        metrics.observe("letta_cancelled_seconds", time.monotonic() - started_at)
+        raise LettaDeadlineExceeded(f"Deadline exceeded while calling Letta {name}")
+    except asyncio.CancelledError:
+        metrics.increment(f"letta_calls_cancelled.disconnect.{name}")
+        metrics.observe("letta_cancelled_seconds", time.monotonic() - started_at)
+        raise
+
+
+async def _run_shielded(awaitable: Awaitable[T]) -> T:
+    """
+    Run cleanup work to completion even if the calling request is cancelled.
+    """
+    task = asyncio.ensure_future(awaitable)
+    _cleanup_tasks.add(task)
+    task.add_done_callback(_cleanup_tasks.discard)
+    return await asyncio.shield(task)
+
+
+async def _call_on_resource(
+    resource_id: str,
+    call: Callable[[AsyncLetta, str], Awaitable[T]],
+    name: str,
+) -> T:
+    """
+    Route a call to the shard holding the resource, using its id on that shard.
+    """
+    shard, letta_id = await resolve(resource_id)
+    try:
+        return await _call(call(get_letta_client(shard), letta_id), name)
+    except NotFoundError:
+        # A rebalance on another worker may have moved it since it was cached
+        forget_placement(resource_id)
+        placement = await resolve(resource_id)
+        if placement == (shard, letta_id):
+            raise
+        shard, letta_id = placement
+        return await _call(call(get_letta_client(shard), letta_id), name)
+
+
+async def _list_agents_on_all_shards(
+    tags: list[str], match_all_tags: bool
+) -> list[tuple[str, AgentState]]:
+    async def list_shard(shard: str) -> list[tuple[str, AgentState]]:
+        client = get_letta_client(shard)
+        agents = await _call(
+            client.agents.list(tags=tags, match_all_tags=match_all_tags),
+            "agents.list",
+        )
+        resource_ids = await to_resource_ids(shard, [a.id for a in agents])
+        return [
+            (shard, a.model_copy(update={"id": resource_ids[a.id]})) for a in agents
+        ]
+
+    results = await asyncio.gather(*[list_shard(shard) for shard in LETTA_URLS])
+    return [agent for shard_agents in results for agent in shard_agents]
+
+
+async def get_all_agents_for_user(
+    user_id: str, page_size: int = 100
+) -> list[AgentState]:
+    """
+    Every agent tagged with the user on any shard, without memory blocks.
+    """
+
+    async def list_shard(shard: str) -> list[AgentState]:
+        client = get_letta_client(shard)
+        agents: list[AgentState] = []
+        after = None
+        while True:
+            page = await _call(
+                client.agents.list(
+                    tags=[user_id],
+                    limit=page_size,
+                    after=after,
+                    include_relationships=AGENT_LIST_RELATIONSHIPS,
+                ),
+                "agents.list",
+            )
+            agents.extend(page)
+            if len(page) < page_size:
+                break
+            after = page[-1].id
+        resource_ids = await to_resource_ids(shard, [a.id for a in agents])
+        return [a.model_copy(update={"id": resource_ids[a.id]}) for a in agents]
+
+    results = await asyncio.gather(*[list_shard(shard) for shard in LETTA_URLS])
+    return [agent for shard_agents in results for agent in shard_agents]
+
+
+async def update_agent_tags(agent_id: str, tags: list[str]) -> None:
+    await _call_on_resource(
+        agent_id,
+        lambda client, letta_id: client.agents.modify(letta_id, tags=tags),
+        "agents.modify",
+    )
+    await _invalidate_agent_summary(agent_id)
 
 
-def get_letta_client():
-    return AsyncLetta(base_url=LETTA_URL)
+async def delete_agent(agent_id: str) -> None:
+    await _call_on_resource(
+        agent_id,
+        lambda client, letta_id: client.agents.delete(letta_id),
+        "agents.delete",
+    )
+    await _invalidate_agent_summary(agent_id)
+    await delete_placements([agent_id])
+
+
+async def _delete_replica_block(shard: str, replica_block_id: str) -> None:
+    try:
+        await _call(
+            get_letta_client(shard).blocks.delete(replica_block_id), "blocks.delete"
+        )
+    except NotFoundError:
+        pass
+
+
+async def delete_block(block_id: str) -> None:
+    """
+    Delete the block and its replicas on other shards. A replica whose delete
+    fails is left to the garbage collector, no longer being referenced.
+    """
+    replicas = await delete_block_replicas(block_id)
+    await asyncio.gather(
+        *[
+            _delete_replica_block(replica.shard, replica.replica_block_id)
+            for replica in replicas
+        ],
+        return_exceptions=True,
+    )
+    await _call_on_resource(
+        block_id,
+        lambda client, letta_id: client.blocks.delete(letta_id),
+        "blocks.delete",
+    )
+    await delete_placements([block_id])
+
+
+async def get_agent_block_ids(agent_id: str, label: BLOCK_TYPES) -> list[str]:
+    """
+    Resource ids of the blocks with this label attached to the agent.
+    """
+    shard, letta_id = await resolve(agent_id)
+    blocks = await _call(
+        get_letta_client(shard).agents.blocks.list(letta_id), "agents.blocks.list"
+    )
+    letta_ids = [block.id for block in blocks if block.label == label]
+    resource_ids = await to_resource_ids(shard, letta_ids)
+    return [resource_ids[letta_id] for letta_id in letta_ids]
 
 
 async def get_block_by_id(block_id: str) -> Block:
-    client = get_letta_client()
-    block = await client.blocks.retrieve(block_id)
+    block = await _call_on_resource(
+        block_id,
+        lambda client, letta_id: client.blocks.retrieve(letta_id),
+        "blocks.retrieve",
+    )
     return block
 
 
-async def create_block(label: BLOCK_TYPES, value: str) -> Block:
-    client = get_letta_client()
-    block = await client.blocks.create(value=value, label=label, is_template=True)
+async def create_block(label: BLOCK_TYPES, value: str, placement_key: str) -> Block:
+    shard = get_shard_for_key(placement_key)
+    client = get_letta_client(shard)
+    block = await _call(
+        client.blocks.create(value=value, label=label, is_template=True),
+        "blocks.create",
+    )
+    await record_placement(
+        resource_id=block.id,
+        resource_type="block",
+        placement_key=placement_key,
+        shard=shard,
+    )
     return block
 
 
@@ -40,67 +281,424 @@ async def create_agent(
     block_ids: list[str] | None = None,
     memory_blocks: list[CreateBlock] | None = None,
     tools: list[str] | None = None,
+    placement_key: str | None = None,
 ) -> AgentState:
-    client = get_letta_client()
+    # Agents live with their attached blocks, agents without blocks go to the
+    # shard of their placement key, the first user by default
+    placement_key = placement_key or str(user_ids[0])
+    shard = get_shard_for_key(placement_key)
     kwargs = {}
     if block_ids:
-        kwargs["block_ids"] = block_ids
+        placements = await resolve_many(block_ids)
+        shards = {block_shard for block_shard, _ in placements.values()}
+        if len(shards) > 1:
+            raise ValueError(f"Blocks {block_ids} live on different Letta shards")
+        shard = shards.pop()
+        kwargs["block_ids"] = [placements[block_id][1] for block_id in block_ids]
     if memory_blocks:
         kwargs["memory_blocks"] = memory_blocks
     if tools:
-        kwargs["tools"] = tools
-    agent = await client.agents.create(
-        tags=[chat_type] + user_ids,
-        model="openai/gpt-4o-mini",
-        embedding="openai/text-embedding-3-small",
-        **kwargs,
+        tool_ids = get_tool_ids(shard, tools)
+        if tool_ids is None:
+            kwargs["tools"] = tools
+        else:
+            kwargs["tool_ids"] = tool_ids
+    tier = get_model_tier(chat_type, group_size=len(user_ids))
+    if tier.embedding:
+        kwargs["embedding"] = tier.embedding
+    if tier.context_window_limit:
+        kwargs["context_window_limit"] = tier.context_window_limit
+    client = get_letta_client(shard)
+    agent = await _call(
+        client.agents.create(
+            tags=[chat_type] + user_ids,
+            model=tier.model,
+            **kwargs,
+        ),
+        "agents.create",
+    )
+    await record_placement(
+        resource_id=agent.id,
+        resource_type="agent",
+        placement_key=placement_key,
+        shard=shard,
     )
     return agent
 
 
-async def get_agents(user_id: str, chat_type: CHAT_TYPES) -> list[AgentState]:
-    client = get_letta_client()
-    agents = await client.agents.list(tags=[chat_type, user_id], match_all_tags=True)
-    return agents
+def decode_agents_cursor(cursor: str) -> dict[str, str | None]:
+    """
+    Shard positions held by a get_agents_page cursor, raises ValueError for
+    malformed cursors.
+    """
+    (positions,) = decode_cursor(cursor)
+    if not isinstance(positions, dict) or not all(
+        isinstance(position, str | None) for position in positions.values()
+    ):
+        raise ValueError("Cursor must hold shard positions")
+    return positions
 
 
-async def get_agent_by_id(agent_id: str) -> AgentState:
-    client = get_letta_client()
-    agent = await client.agents.retrieve(agent_id)
-    return agent
+def _created_at_key(agent: AgentState) -> datetime:
+    # Agents missing a creation time sort as the oldest
+    if agent.created_at is None:
+        return datetime.min
+    if agent.created_at.tzinfo:
+        return agent.created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return agent.created_at
 
 
-async def send_message_to_yenta(
-    current_user_id: str, agent_id: str, message: str, mentioned_ids: list[str]
-) -> LettaResponse:
-    client = get_letta_client()
-    shared_agents = await client.agents.list(
+async def get_agents_page(
+    user_id: str,
+    chat_type: CHAT_TYPES,
+    limit: int,
+    positions: dict[str, str | None] | None = None,
+) -> tuple[list[AgentState], str | None]:
+    """
+    A page of the user's agents, newest first, without their memory blocks.
+
+    The positions, from decode_agents_cursor, hold the last agent taken from
+    each shard, exhausted shards are dropped from them. Returns the page and
+    the cursor of the next one.
+    """
+    if positions is None:
+        positions = dict.fromkeys(LETTA_URLS)
+    shards = [shard for shard in LETTA_URLS if shard in positions]
+
+    async def list_shard(shard: str) -> list[AgentState]:
+        client = get_letta_client(shard)
+        return await _call(
+            client.agents.list(
+                tags=[chat_type, user_id],
+                match_all_tags=True,
+                limit=limit,
+                after=positions[shard],
+                order="desc",
+                include_relationships=AGENT_LIST_RELATIONSHIPS,
+            ),
+            "agents.list",
+        )
+
+    results = await asyncio.gather(*[list_shard(shard) for shard in shards])
+    candidates = sorted(
+        (
+            (agent, shard)
+            for shard, agents in zip(shards, results, strict=True)
+            for agent in agents
+        ),
+        key=lambda candidate: _created_at_key(candidate[0]),
+        reverse=True,
+    )
+    page = candidates[:limit]
+
+    next_positions = dict(positions)
+    for shard, agents in zip(shards, results, strict=True):
+        taken = [agent for agent, agent_shard in page if agent_shard == shard]
+        if taken:
+            next_positions[shard] = taken[-1].id
+        if len(agents) < limit and len(taken) == len(agents):
+            del next_positions[shard]
+
+    resource_ids: dict[str, str] = {}
+    for shard_resource_ids in await asyncio.gather(
+        *[
+            to_resource_ids(shard, [a.id for a, a_shard in page if a_shard == shard])
+            for shard in shards
+        ]
+    ):
+        resource_ids |= shard_resource_ids
+    page_agents = [
+        agent.model_copy(update={"id": resource_ids[agent.id]}) for agent, _ in page
+    ]
+    next_cursor = encode_cursor(next_positions) if next_positions else None
+    return page_agents, next_cursor
+
+
+async def get_agent_summary(agent_id: str) -> AgentSummary:
+    """
+    The agent's id, name and tags, fetched without its memory blocks and tools.
+    """
+    cached = _agent_summaries.get(agent_id)
+    if cached and cached[0] > time.monotonic():
+        metrics.increment("agent_summary_cache.hit")
+        return cached[1]
+    metrics.increment("agent_summary_cache.miss")
+    agent = await _call_on_resource(
+        agent_id,
+        lambda client, letta_id: client.agents.retrieve(
+            letta_id, include_relationships=AGENT_LIST_RELATIONSHIPS
+        ),
+        "agents.retrieve",
+    )
+    summary = AgentSummary(id=agent_id, name=agent.name, tags=agent.tags)
+    _agent_summaries.pop(agent_id, None)
+    if len(_agent_summaries) >= AGENT_SUMMARY_CACHE_SIZE:
+        # Entries are in insertion order, so this drops the oldest one
+        del _agent_summaries[next(iter(_agent_summaries))]
+    _agent_summaries[agent_id] = (time.monotonic() + AGENT_SUMMARY_TTL_SECONDS, summary)
+    return summary
+
+
+def _forget_agent_summary(agent_id: str) -> None:
+    _agent_summaries.pop(agent_id, None)
+
+
+async def _invalidate_agent_summary(agent_id: str) -> None:
+    _forget_agent_summary(agent_id)
+    await notifications.notify(AGENT_SUMMARY_CHANNEL, agent_id)
+
+
+notifications.register(AGENT_SUMMARY_CHANNEL, _forget_agent_summary)
+
+
+async def _get_replica_block_id(block_id: str, block: Block, shard: str) -> str:
+    """
+    Copy a block living on another shard onto this one, refreshing the value
+    of an existing replica. Replicas are recorded by the block's resource id,
+    which stays the same when rebalancing moves the block.
+    """
+    client = get_letta_client(shard)
+    replica_block_id = await get_block_replica(block_id, shard)
+    if replica_block_id:
+        await _call(
+            client.blocks.modify(
+                replica_block_id, value=block.value, limit=block.limit
+            ),
+            "blocks.modify",
+        )
+        return replica_block_id
+    replica = await _call(
+        client.blocks.create(
+            value=block.value, label=block.label, limit=block.limit, is_template=True
+        ),
+        "blocks.create",
+    )
+    replica_block_id = await record_block_replica(block_id, shard, replica.id)
+    if replica_block_id != replica.id:
+        # A concurrent send replicated the block first
+        await _delete_replica_block(shard, replica.id)
+    return replica_block_id
+
+
+async def _detach_blocks(
+    client: AsyncLetta, letta_agent_id: str, block_ids: list[str]
+) -> None:
+    await asyncio.gather(
+        *[
+            client.agents.blocks.detach(letta_agent_id, block_id)
+            for block_id in block_ids
+        ],
+        return_exceptions=True,
+    )
+
+
+async def _attach_interactions_blocks(
+    shard: str, letta_agent_id: str, current_user_id: str, mentioned_ids: list[str]
+) -> list[str]:
+    """
+    Attach the interactions blocks the user shares with the mentioned users to
+    the yenta agent, returning the ids of the attached blocks.
+    """
+    client = get_letta_client(shard)
+    shared_agents = await _list_agents_on_all_shards(
         tags=[current_user_id] + mentioned_ids, match_all_tags=True
     )
-    summary = []
-    block_ids = []
-    for agent in shared_agents:
+    local_block_ids = []
+    remote_blocks: dict[str, list[Block]] = {}
+    for agent_shard, agent in shared_agents:
         for block in agent.memory.blocks:
             if block.label == "interactions":
-                summary.append(block.value)
-                block_ids.append(block.id)
+                if agent_shard == shard:
+                    local_block_ids.append(block.id)
+                else:
+                    remote_blocks.setdefault(agent_shard, []).append(block)
+    # Interactions blocks are placed with their users-chat, so the ones on other
+    # shards are replicated onto the yenta agent's shard before attaching
+    resource_ids = {}
+    for agent_shard, blocks in remote_blocks.items():
+        resource_ids |= await to_resource_ids(agent_shard, [b.id for b in blocks])
+    replica_block_ids = await asyncio.gather(
+        *[
+            _get_replica_block_id(resource_ids[block.id], block, shard)
+            for blocks in remote_blocks.values()
+            for block in blocks
+        ]
+    )
+    block_ids = local_block_ids + list(replica_block_ids)
+    try:
+        await asyncio.gather(
+            *[
+                client.agents.blocks.attach(letta_agent_id, block_id)
+                for block_id in block_ids
+            ]
+        )
+    except BaseException:
+        await _detach_blocks(client, letta_agent_id, block_ids)
+        raise
+    return block_ids
 
-    await asyncio.gather(
-        *[client.agents.blocks.attach(agent_id, block_id) for block_id in block_ids]
-    )
-    interactions_summary = "\n".join(summary)
-    response = await client.agents.messages.create(
-        agent_id=agent_id,
-        messages=[
-            {
-                "role": "user",
-                "content": message,
-            }
-        ],
+
+async def _detach_when_attached(
+    shard: str, letta_agent_id: str, attaching: asyncio.Future[list[str]]
+) -> None:
+    try:
+        block_ids = await attaching
+    except BaseException:
+        # A failed attach already detached what it attached
+        return
+    await _detach_blocks(get_letta_client(shard), letta_agent_id, block_ids)
+
+
+def _prepared_key(
+    agent_id: str, current_user_id: str, mentioned_ids: list[str]
+) -> tuple[str, str, frozenset[str]]:
+    return agent_id, str(current_user_id), frozenset(mentioned_ids)
+
+
+async def _resolve_and_attach(
+    agent_id: str, current_user_id: str, mentioned_ids: list[str]
+) -> tuple[str, str, list[str]]:
+    shard, letta_agent_id = await resolve(agent_id)
+    block_ids = await _attach_interactions_blocks(
+        shard, letta_agent_id, current_user_id, mentioned_ids
     )
-    await asyncio.gather(
-        *[client.agents.blocks.detach(agent_id, block_id) for block_id in block_ids]
+    return shard, letta_agent_id, block_ids
+
+
+async def _detach_prepared(
+    preparing: asyncio.Future[tuple[str, str, list[str]]],
+) -> None:
+    try:
+        shard, letta_agent_id, block_ids = await preparing
+    except BaseException:
+        # A failed attach already detached what it attached
+        return
+    await _detach_blocks(get_letta_client(shard), letta_agent_id, block_ids)
+
+
+def _detach_in_background(
+    preparing: asyncio.Future[tuple[str, str, list[str]]],
+) -> None:
+    task = asyncio.ensure_future(_detach_prepared(preparing))
+    _cleanup_tasks.add(task)
+    task.add_done_callback(_cleanup_tasks.discard)
+
+
+def _pop_prepared(
+    key: tuple[str, str, frozenset[str]],
+) -> asyncio.Future[tuple[str, str, list[str]]] | None:
+    prepared = _prepared.pop(key, None)
+    if not prepared:
+        return None
+    preparing, expiry = prepared
+    expiry.cancel()
+    _, user_id, _ = key
+    _prepared_per_user[user_id] -= 1
+    if not _prepared_per_user[user_id]:
+        del _prepared_per_user[user_id]
+    return preparing
+
+
+def _expire_prepared(key: tuple[str, str, frozenset[str]]) -> None:
+    preparing = _pop_prepared(key)
+    if preparing:
+        _detach_in_background(preparing)
+
+
+async def prepare_message_to_yenta(
+    current_user_id: str,
+    agent_id: str,
+    mentioned_ids: list[str],
+    ttl_seconds: float,
+    max_per_user: int,
+) -> None:
+    """
+    Start attaching the blocks a send mentioning these users needs, so the send
+    finds them ready. Blocks no send picked up are detached after ttl_seconds.
+
+    Prepared sends are kept per worker, a send landing on another worker
+    attaches its blocks itself. Past max_per_user pending ones a user's
+    prepares are ignored and their sends attach inline.
+    """
+    key = _prepared_key(agent_id, current_user_id, mentioned_ids)
+    _, user_id, _ = key
+    if key in _prepared:
+        return
+    if _prepared_per_user[user_id] >= max_per_user:
+        metrics.increment("yenta_prepared_sends.rejected")
+        return
+    # Registered before anything is awaited so concurrent prepares of the same
+    # send share one attach. Not tied to the preparing request, which returns
+    # before the attach ends
+    preparing = asyncio.ensure_future(
+        _resolve_and_attach(agent_id, user_id, mentioned_ids)
+    )
+    expiry = asyncio.get_running_loop().call_later(ttl_seconds, _expire_prepared, key)
+    _prepared[key] = (preparing, expiry)
+    _prepared_per_user[user_id] += 1
+
+
+async def _attach_after_prepared(
+    prepared: asyncio.Future[tuple[str, str, list[str]]],
+    shard: str,
+    letta_agent_id: str,
+    current_user_id: str,
+    mentioned_ids: list[str],
+) -> list[str]:
+    try:
+        prepared_shard, prepared_letta_agent_id, block_ids = await prepared
+    except Exception:
+        # A failed attach already detached what it attached, so start over
+        metrics.increment("yenta_prepared_sends.failed")
+    else:
+        if (prepared_shard, prepared_letta_agent_id) == (shard, letta_agent_id):
+            return block_ids
+        # The agent was moved since, drop what was attached to the old copy
+        _detach_in_background(prepared)
+    return await _attach_interactions_blocks(
+        shard, letta_agent_id, current_user_id, mentioned_ids
     )
+
+
+async def send_message_to_yenta(
+    current_user_id: str, agent_id: str, message: str, mentioned_ids: list[str]
+) -> LettaResponse:
+    shard, letta_agent_id = await resolve(agent_id)
+    client = get_letta_client(shard)
+    key = _prepared_key(agent_id, current_user_id, mentioned_ids)
+    prepared = _pop_prepared(key)
+    if prepared:
+        metrics.increment("yenta_prepared_sends")
+        attaching = asyncio.ensure_future(
+            _attach_after_prepared(
+                prepared, shard, letta_agent_id, str(current_user_id), mentioned_ids
+            )
+        )
+    else:
+        attaching = asyncio.ensure_future(
+            _attach_interactions_blocks(
+                shard, letta_agent_id, str(current_user_id), mentioned_ids
+            )
+        )
+
+    try:
+        await _call(asyncio.shield(attaching), "agents.blocks.attach")
+        response = await _call(
+            client.agents.messages.create(
+                agent_id=letta_agent_id,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": message,
+                    }
+                ],
+            ),
+            "agents.messages.create",
+        )
+    finally:
+        # Detach even when the request was cancelled or timed out, without
+        # the request deadline since the caller may already be gone
+        await _run_shielded(_detach_when_attached(shard, letta_agent_id, attaching))
     return response
 
 
@@ -109,15 +707,18 @@ async def send_message_to_users_chat(
     sender_id: str,
     message: str,
 ) -> LettaResponse:
-    client = get_letta_client()
-    response = await client.agents.messages.create(
-        agent_id=agent_id,
-        messages=[
-            {
-                "role": "user",
-                "content": f"{sender_id}:{message}",
-            }
-        ],
+    response = await _call_on_resource(
+        agent_id,
+        lambda client, letta_id: client.agents.messages.create(
+            agent_id=letta_id,
+            messages=[
+                {
+                    "role": "user",
+                    "content": f"{sender_id}:{message}",
+                }
+            ],
+        ),
+        "agents.messages.create",
     )
     return response
 
@@ -125,9 +726,12 @@ async def send_message_to_users_chat(
 async def get_messages(
     agent_id: str, limit: int = 10, message_id: str | None = None
 ) -> list[LettaMessageUnion]:
-    client = get_letta_client()
-    messages = await client.agents.messages.list(
-        agent_id=agent_id, limit=limit, before=message_id
+    messages = await _call_on_resource(
+        agent_id,
+        lambda client, letta_id: client.agents.messages.list(
+            agent_id=letta_id, limit=limit, before=message_id
+        ),
+        "agents.messages.list",
     )
     return messages
 
@@ -135,8 +739,11 @@ async def get_messages(
 async def create_identity(
     internal_id: str, name: str | None, identity_type: IdentityType = "user"
 ) -> Identity:
-    client = get_letta_client()
-    identity = await client.identities.create(
-        identifier_key=internal_id, name=name, identity_type=identity_type
+    client = get_letta_client(get_shard_for_key(internal_id))
+    identity = await _call(
+        client.identities.create(
+            identifier_key=internal_id, name=name, identity_type=identity_type
+        ),
+        "identities.create",
     )
     return identity
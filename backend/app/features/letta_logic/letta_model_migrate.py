@@ -0,0 +1,106 @@
+"""
+Move existing agents onto the model tier the current policy assigns them.
+
+    python -m app.features.letta_logic.letta_model_migrate [--chat-type yenta-chat] [--apply]
+
+Without --apply only the agents that would change are logged.
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import get_args
+
+from letta_client.types import AgentState
+
+from app.features.letta_logic.letta_logic import CHAT_TYPES, get_letta_client
+from app.features.letta_logic.letta_model_policy import ModelTier, get_model_tier
+from app.features.letta_logic.letta_shards import LETTA_URLS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100
+
+
+def needs_migration(agent: AgentState, tier: ModelTier) -> bool:
+    if agent.llm_config.handle != tier.model:
+        return True
+    if tier.embedding and agent.embedding_config.handle != tier.embedding:
+        return True
+    return bool(
+        tier.context_window_limit
+        and agent.llm_config.context_window != tier.context_window_limit
+    )
+
+
+async def migrate_agent(shard: str, agent: AgentState, tier: ModelTier) -> None:
+    client = get_letta_client(shard)
+    kwargs = {"model": tier.model}
+    if tier.embedding:
+        kwargs["embedding"] = tier.embedding
+    agent = await client.agents.modify(agent.id, **kwargs)
+    if (
+        tier.context_window_limit
+        and agent.llm_config.context_window != tier.context_window_limit
+    ):
+        await client.agents.modify(
+            agent.id,
+            llm_config=agent.llm_config.model_copy(
+                update={"context_window": tier.context_window_limit}
+            ),
+        )
+
+
+async def migrate_chat_type(
+    shard: str, chat_type: str, apply: bool, semaphore: asyncio.Semaphore
+) -> int:
+    client = get_letta_client(shard)
+    migrated = 0
+    after = None
+    while True:
+        agents = await client.agents.list(
+            tags=[chat_type], limit=PAGE_SIZE, after=after
+        )
+        if not agents:
+            return migrated
+
+        async def migrate(agent: AgentState) -> bool:
+            tier = get_model_tier(chat_type, group_size=len(agent.tags) - 1)
+            if not needs_migration(agent, tier):
+                return False
+            logger.info(
+                f"{shard} {agent.id}: {agent.llm_config.handle} -> {tier.model}"
+            )
+            if apply:
+                async with semaphore:
+                    try:
+                        await migrate_agent(shard, agent, tier)
+                    except Exception as e:
+                        logger.error(f"{shard} {agent.id}: migration failed: {e}")
+                        return False
+            return True
+
+        results = await asyncio.gather(*[migrate(agent) for agent in agents])
+        migrated += sum(results)
+        after = agents[-1].id
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chat-type", choices=get_args(CHAT_TYPES))
+    parser.add_argument("--apply", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    chat_types = [args.chat_type] if args.chat_type else list(get_args(CHAT_TYPES))
+    semaphore = asyncio.Semaphore(args.concurrency)
+    for shard in LETTA_URLS:
+        for chat_type in chat_types:
+            migrated = await migrate_chat_type(shard, chat_type, args.apply, semaphore)
+            action = "migrated" if args.apply else "to migrate"
+            logger.info(f"{shard} {chat_type}: {migrated} agents {action}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
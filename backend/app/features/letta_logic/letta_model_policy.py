@@ -0,0 +1,72 @@
+import os
+
+from pydantic import BaseModel
+
+
+class ModelTier(BaseModel):
+    model: str
+    # None leaves the embedding to the Letta server default
+    embedding: str | None = None
+    context_window_limit: int | None = None
+
+
+class GroupSizeTier(BaseModel):
+    max_group_size: int
+    tier: ModelTier
+
+
+class ChatTypePolicy(BaseModel):
+    tier: ModelTier
+    # Checked in order, the first tier whose max_group_size fits is used
+    group_size_tiers: list[GroupSizeTier] = []
+
+
+class ModelPolicy(BaseModel):
+    default: ModelTier
+    chat_types: dict[str, ChatTypePolicy] = {}
+
+
+DEFAULT_MODEL_POLICY = ModelPolicy(
+    default=ModelTier(
+        model="openai/gpt-4o-mini", embedding="openai/text-embedding-3-small"
+    ),
+    chat_types={
+        # The users-chat observer only extracts facts with summarize_interaction
+        "users-chat": ChatTypePolicy(
+            tier=ModelTier(
+                model="openai/gpt-4.1-nano",
+                embedding="openai/text-embedding-3-small",
+                context_window_limit=16000,
+            ),
+            group_size_tiers=[
+                GroupSizeTier(
+                    max_group_size=2,
+                    tier=ModelTier(
+                        model="openai/gpt-4.1-nano",
+                        embedding="openai/text-embedding-3-small",
+                        context_window_limit=8000,
+                    ),
+                ),
+            ],
+        ),
+    },
+)
+
+# JSON in the shape of ModelPolicy overrides the default policy
+LETTA_MODEL_POLICY = os.getenv("LETTA_MODEL_POLICY")
+model_policy = (
+    ModelPolicy.model_validate_json(LETTA_MODEL_POLICY)
+    if LETTA_MODEL_POLICY
+    else DEFAULT_MODEL_POLICY
+)
+
+
+def get_model_tier(chat_type: str, group_size: int | None = None) -> ModelTier:
+    chat_type_policy = model_policy.chat_types.get(chat_type)
+    if not chat_type_policy:
+        return model_policy.default
+    if group_size is not None:
+        for group_size_tier in chat_type_policy.group_size_tiers:
+            if group_size <= group_size_tier.max_group_size:
+                return group_size_tier.tier
+    return chat_type_policy.tier
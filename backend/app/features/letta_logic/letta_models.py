@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+from sqlmodel import Field, SQLModel
+
+RESOURCE_TYPES = Literal["agent", "block"]
+
+
+# Slim view of an agent for lookups that only check names and participants
+class AgentSummary(BaseModel):
+    id: str
+    name: str
+    tags: list[str]
+
+
+# Database models
+class LettaPlacement(SQLModel, table=True):
+    # Id handed out to the app and stored in Postgres, stable across rebalancing
+    resource_id: str = Field(primary_key=True, max_length=255)
+    resource_type: str = Field(max_length=32)
+    placement_key: str = Field(index=True, max_length=255)
+    shard: str = Field(max_length=255)
+    # Id of the resource on its current shard
+    letta_id: str = Field(index=True, max_length=255)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class LettaBlockReplica(SQLModel, table=True):
+    # Resource id of the replicated block, not its id on its current shard
+    source_block_id: str = Field(primary_key=True, max_length=255)
+    shard: str = Field(primary_key=True, max_length=255)
+    replica_block_id: str = Field(max_length=255)
+
+
+# Unreferenced block seen by the garbage collector, deleted once it stays
+# orphaned past the grace period (Letta blocks carry no creation time)
+class LettaOrphanBlock(SQLModel, table=True):
+    letta_id: str = Field(primary_key=True, max_length=255)
+    shard: str = Field(max_length=255)
+    first_seen_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Agent message moved out of Letta by history trimming, content holds the
+# Letta message as JSON
+class ArchivedMessage(SQLModel, table=True):
+    message_id: str = Field(primary_key=True, max_length=255)
+    message_type: str = Field(primary_key=True, max_length=64)
+    agent_id: str = Field(index=True, max_length=255)
+    date: datetime
+    content: str
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Newest message of an agent copied into the archive, later runs only read
+# the messages after it
+class ArchivedMessageCursor(SQLModel, table=True):
+    agent_id: str = Field(primary_key=True, max_length=255)
+    message_id: str = Field(max_length=255)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,146 @@
+"""
+Move Letta resources onto the shard the hash ring assigns them after adding
+servers to LETTA_URLS.
+
+    python -m app.features.letta_logic.letta_rebalance [--apply]
+
+Resources are moved per placement key so agents stay with their blocks. Without
+--apply only the planned moves are logged. Workers pick up the new placements
+on their next call that misses the old location.
+"""
+
+import argparse
+import asyncio
+import logging
+from collections import defaultdict
+
+from sqlmodel import col, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import engine
+from app.features.letta_logic.letta_logic import get_letta_client
+from app.features.letta_logic.letta_models import LettaBlockReplica, LettaPlacement
+from app.features.letta_logic.letta_shards import ring
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def plan_moves() -> dict[str, list[LettaPlacement]]:
+    async with AsyncSession(engine) as session:
+        result = await session.exec(
+            select(LettaPlacement).order_by(LettaPlacement.placement_key)
+        )
+        placements = result.all()
+    groups: dict[str, list[LettaPlacement]] = defaultdict(list)
+    for placement in placements:
+        groups[placement.placement_key].append(placement)
+    return {
+        key: group
+        for key, group in groups.items()
+        if any(p.shard != ring.get_node(key) for p in group)
+    }
+
+
+async def move_group(placements: list[LettaPlacement], target: str) -> None:
+    target_client = get_letta_client(target)
+    to_move = [p for p in placements if p.shard != target]
+
+    # Old letta id -> letta id on the target shard
+    moved_blocks: dict[str, str] = {}
+    for placement in [p for p in to_move if p.resource_type == "block"]:
+        block = await get_letta_client(placement.shard).blocks.retrieve(
+            placement.letta_id
+        )
+        new_block = await target_client.blocks.create(
+            value=block.value, label=block.label, limit=block.limit, is_template=True
+        )
+        moved_blocks[placement.letta_id] = new_block.id
+
+    moved_agents: dict[str, str] = {}
+    for placement in [p for p in to_move if p.resource_type == "agent"]:
+        source_client = get_letta_client(placement.shard)
+        agent = await source_client.agents.retrieve(placement.letta_id)
+        exported = await source_client.agents.export_file(placement.letta_id)
+        imported = await target_client.agents.import_file(
+            file=("agent.af", exported.encode(), "application/json"),
+            append_copy_suffix=False,
+        )
+        new_agent_id = imported.agent_ids[0]
+        new_agent = await target_client.agents.retrieve(new_agent_id)
+        # The import copies every attached block, swap the copies of shared
+        # blocks for the ones moved above so they stay shared
+        copies = {block.label: block.id for block in new_agent.memory.blocks}
+        for block in agent.memory.blocks:
+            if block.id not in moved_blocks or block.label not in copies:
+                continue
+            await target_client.agents.blocks.detach(new_agent_id, copies[block.label])
+            await target_client.blocks.delete(copies[block.label])
+            await target_client.agents.blocks.attach(
+                new_agent_id, moved_blocks[block.id]
+            )
+        moved_agents[placement.letta_id] = new_agent_id
+
+    async with AsyncSession(engine) as session:
+        for placement in to_move:
+            db_placement = await session.get(LettaPlacement, placement.resource_id)
+            if not db_placement:
+                continue
+            db_placement.shard = target
+            db_placement.letta_id = (moved_blocks | moved_agents)[placement.letta_id]
+            session.add(db_placement)
+        result = await session.exec(
+            select(LettaBlockReplica).where(
+                col(LettaBlockReplica.source_block_id).in_(list(moved_blocks))
+            )
+        )
+        replicas = result.all()
+        await session.exec(
+            delete(LettaBlockReplica).where(
+                col(LettaBlockReplica.source_block_id).in_(list(moved_blocks))
+            )
+        )
+        await session.commit()
+
+    for placement in to_move:
+        source_client = get_letta_client(placement.shard)
+        if placement.resource_type == "agent":
+            await source_client.agents.delete(placement.letta_id)
+        else:
+            await source_client.blocks.delete(placement.letta_id)
+    for replica in replicas:
+        await get_letta_client(replica.shard).blocks.delete(replica.replica_block_id)
+
+
+async def rebalance(apply: bool, concurrency: int) -> None:
+    moves = await plan_moves()
+    logger.info(f"{len(moves)} placement keys to move")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def move(key: str, group: list[LettaPlacement]) -> None:
+        target = ring.get_node(key)
+        logger.info(f"{key}: {len(group)} resources -> {target}")
+        if not apply:
+            return
+        async with semaphore:
+            try:
+                await move_group(group, target)
+            except Exception as e:
+                logger.error(f"{key}: move to {target} failed: {e}")
+
+    await asyncio.gather(*[move(key, group) for key, group in moves.items()])
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apply", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    logger.info("Rebalancing Letta shards")
+    await rebalance(apply=args.apply, concurrency=args.concurrency)
+    logger.info("Rebalancing finished")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,209 @@
+import bisect
+import hashlib
+import os
+
+from letta_client import AsyncLetta
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import engine
+from app.features.letta_logic.letta_models import (
+    RESOURCE_TYPES,
+    LettaBlockReplica,
+    LettaPlacement,
+)
+
+LETTA_URL = os.getenv("LETTA_URL", "http://localhost:8283")
+# Comma separated Letta servers, the first one also holds every resource
+# created before sharding (those have no placement record)
+LETTA_URLS = [
+    url.strip() for url in os.getenv("LETTA_URLS", LETTA_URL).split(",") if url.strip()
+]
+DEFAULT_SHARD = LETTA_URLS[0]
+VIRTUAL_NODES_PER_SHARD = 128
+PLACEMENT_CACHE_SIZE = 10_000
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    def __init__(self, nodes: list[str], virtual_nodes: int = VIRTUAL_NODES_PER_SHARD):
+        self.nodes = list(nodes)
+        self._ring = sorted(
+            (_hash(f"{node}#{i}"), node) for node in nodes for i in range(virtual_nodes)
+        )
+        self._hashes = [h for h, _ in self._ring]
+
+    def get_node(self, key: str) -> str:
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+
+ring = HashRing(LETTA_URLS)
+
+# resource_id -> (shard, letta_id) of looked up placements, least recently used
+# first. Placements only change when rebalancing.
+_placements: dict[str, tuple[str, str]] = {}
+
+
+def get_letta_client(shard: str = DEFAULT_SHARD):
+    return AsyncLetta(base_url=shard)
+
+
+def get_shard_for_key(placement_key: str) -> str:
+    return ring.get_node(placement_key)
+
+
+def forget_placement(resource_id: str) -> None:
+    _placements.pop(resource_id, None)
+
+
+def _cache_placement(resource_id: str, placement: tuple[str, str]) -> None:
+    _placements.pop(resource_id, None)
+    if len(_placements) >= PLACEMENT_CACHE_SIZE:
+        # Entries are in use order, so this drops the least recently used one
+        del _placements[next(iter(_placements))]
+    _placements[resource_id] = placement
+
+
+async def resolve_many(resource_ids: list[str]) -> dict[str, tuple[str, str]]:
+    """
+    Map resource ids to the shard they live on and their id on that shard.
+    """
+    placements = {}
+    missing = []
+    for resource_id in resource_ids:
+        if resource_id in _placements:
+            placements[resource_id] = _placements[resource_id]
+            _cache_placement(resource_id, placements[resource_id])
+        else:
+            missing.append(resource_id)
+    if missing:
+        async with AsyncSession(engine) as session:
+            result = await session.exec(
+                select(LettaPlacement).where(
+                    col(LettaPlacement.resource_id).in_(missing)
+                )
+            )
+            found = {p.resource_id: (p.shard, p.letta_id) for p in result.all()}
+        for resource_id in missing:
+            if resource_id in found:
+                placements[resource_id] = found[resource_id]
+                _cache_placement(resource_id, found[resource_id])
+            else:
+                # Created before sharding. Resources created since have their
+                # placement recorded before their id is handed out.
+                placements[resource_id] = (DEFAULT_SHARD, resource_id)
+                _cache_placement(resource_id, placements[resource_id])
+    return placements
+
+
+async def resolve(resource_id: str) -> tuple[str, str]:
+    return (await resolve_many([resource_id]))[resource_id]
+
+
+async def record_placement(
+    *,
+    resource_id: str,
+    resource_type: RESOURCE_TYPES,
+    placement_key: str,
+    shard: str,
+) -> None:
+    async with AsyncSession(engine) as session:
+        session.add(
+            LettaPlacement(
+                resource_id=resource_id,
+                resource_type=resource_type,
+                placement_key=placement_key,
+                shard=shard,
+                letta_id=resource_id,
+            )
+        )
+        await session.commit()
+    _cache_placement(resource_id, (shard, resource_id))
+
+
+async def delete_placements(resource_ids: list[str]) -> None:
+    async with AsyncSession(engine) as session:
+        await session.exec(
+            delete(LettaPlacement).where(
+                col(LettaPlacement.resource_id).in_(resource_ids)
+            )
+        )
+        await session.commit()
+    for resource_id in resource_ids:
+        forget_placement(resource_id)
+
+
+async def to_resource_ids(shard: str, letta_ids: list[str]) -> dict[str, str]:
+    """
+    Map ids listed on a shard back to resource ids, which only differ for
+    resources moved there by rebalancing.
+    """
+    if not letta_ids:
+        return {}
+    async with AsyncSession(engine) as session:
+        result = await session.exec(
+            select(LettaPlacement).where(
+                LettaPlacement.shard == shard,
+                col(LettaPlacement.letta_id).in_(letta_ids),
+            )
+        )
+        moved = {p.letta_id: p.resource_id for p in result.all()}
+    return {letta_id: moved.get(letta_id, letta_id) for letta_id in letta_ids}
+
+
+async def get_block_replica(source_block_id: str, shard: str) -> str | None:
+    async with AsyncSession(engine) as session:
+        replica = await session.get(LettaBlockReplica, (source_block_id, shard))
+        return replica.replica_block_id if replica else None
+
+
+async def record_block_replica(
+    source_block_id: str, shard: str, replica_block_id: str
+) -> str:
+    """
+    Record the replica unless one of the block was recorded on the shard in
+    the meantime, returning the id of the replica that is kept.
+    """
+    statement = (
+        insert(LettaBlockReplica)
+        .values(
+            source_block_id=source_block_id,
+            shard=shard,
+            replica_block_id=replica_block_id,
+        )
+        .on_conflict_do_nothing()
+        .returning(LettaBlockReplica.replica_block_id)
+    )
+    async with AsyncSession(engine) as session:
+        recorded = (await session.exec(statement)).scalar()
+        if recorded is None:
+            existing = await session.get(LettaBlockReplica, (source_block_id, shard))
+            recorded = existing.replica_block_id
+        await session.commit()
+    return recorded
+
+
+async def delete_block_replicas(source_block_id: str) -> list[LettaBlockReplica]:
+    """
+    Forget the replicas of a block, returning them so their Letta blocks can
+    be deleted.
+    """
+    async with AsyncSession(engine) as session:
+        result = await session.exec(
+            select(LettaBlockReplica).where(
+                LettaBlockReplica.source_block_id == source_block_id
+            )
+        )
+        replicas = result.all()
+        await session.exec(
+            delete(LettaBlockReplica).where(
+                LettaBlockReplica.source_block_id == source_block_id
+            )
+        )
+        await session.commit()
+    return list(replicas)
@@ -0,0 +1,76 @@
+import asyncio
+import hashlib
+import inspect
+import logging
+from types import ModuleType
+
+from app.features.letta_logic import get_user_profile_tool, summarize_interaction_tool
+from app.features.letta_logic.letta_shards import LETTA_URLS, get_letta_client
+
+logger = logging.getLogger(__name__)
+
+# Modules uploaded to Letta as tools, each defines the tool function last
+TOOL_MODULES: dict[str, ModuleType] = {
+    "summarize_interaction": summarize_interaction_tool,
+    "get_user_profile": get_user_profile_tool,
+}
+SOURCE_HASH_TAG_PREFIX = "source-sha256:"
+
+# (shard, tool name) -> tool id, filled by sync_tools on startup
+_tool_ids: dict[tuple[str, str], str] = {}
+
+
+def get_tool_source(name: str) -> str:
+    return inspect.getsource(TOOL_MODULES[name])
+
+
+def get_source_hash(source_code: str) -> str:
+    return hashlib.sha256(source_code.encode()).hexdigest()
+
+
+def get_tool_ids(shard: str, names: list[str]) -> list[str] | None:
+    """
+    Tool ids on the shard, or None if the tools weren't synced to it yet.
+    """
+    if any((shard, name) not in _tool_ids for name in names):
+        return None
+    return [_tool_ids[(shard, name)] for name in names]
+
+
+async def sync_tools_on_shard(shard: str) -> None:
+    client = get_letta_client(shard)
+    existing_tools = await client.tools.list(names=list(TOOL_MODULES))
+    existing_hashes = {
+        tool.name: tag.removeprefix(SOURCE_HASH_TAG_PREFIX)
+        for tool in existing_tools
+        for tag in tool.tags or []
+        if tag.startswith(SOURCE_HASH_TAG_PREFIX)
+    }
+    existing_ids = {tool.name: tool.id for tool in existing_tools}
+
+    for name in TOOL_MODULES:
+        source_code = get_tool_source(name)
+        source_hash = get_source_hash(source_code)
+        if existing_hashes.get(name) == source_hash:
+            _tool_ids[(shard, name)] = existing_ids[name]
+            continue
+        tool = await client.tools.upsert(
+            source_code=source_code,
+            tags=[f"{SOURCE_HASH_TAG_PREFIX}{source_hash}"],
+        )
+        logger.info(f"Registered tool {name} on {shard} ({source_hash[:12]})")
+        _tool_ids[(shard, name)] = tool.id
+
+
+async def sync_tools() -> None:
+    """
+    Upsert the backend's tools to every Letta shard whose copy is out of date.
+    """
+    results = await asyncio.gather(
+        *[sync_tools_on_shard(shard) for shard in LETTA_URLS],
+        return_exceptions=True,
+    )
+    for shard, result in zip(LETTA_URLS, results, strict=True):
+        if isinstance(result, Exception):
+            # Agent creation falls back to tool names on this shard
+            logger.error(f"Syncing tools to {shard} failed: {result}")
@@ -1,48 +1,79 @@
 import uuid
-from typing import Any
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlmodel import func, select
 
 import app.features.users.users_crud
 from app.core.config import settings
-from app.core.db import save_to_db
+from app.core.db import release_connection
 from app.core.security import get_password_hash
 from app.features.core.api_deps import (
     CurrentUser,
     SessionDep,
     get_current_active_superuser,
+    get_primary_db,
 )
-from app.features.core.models import Message
+from app.features.core.pagination import decode_cursor, encode_cursor
 from app.features.users.users_models import (
     User,
     UserCreate,
+    UserDeleted,
     UserPublic,
     UserRegister,
     UsersPublic,
+    UserTeardownJob,
+    UserTeardownJobPublic,
     UserUpdate,
     UserUpdateMe,
 )
+from app.features.users.users_teardown import run_teardown_job
 from app.utils import generate_new_account_email, send_email
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/", response_model=UsersPublic)
-async def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+async def read_users(
+    session: SessionDep,
+    is_active: bool | None = None,
+    is_superuser: bool | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    count: Literal["exact", "estimated", "none"] = "exact",
+) -> Any:
     """
-    Retrieve users.
+    Retrieve users, ordered by email.
     """
-    count_statement = select(func.count()).select_from(User)
-    count = await session.exec(count_statement)
-    count = count.one()
-
-    statement = select(User).offset(skip).limit(limit)
-    result = await session.exec(statement)
-    users = result.all()
-
-    return UsersPublic(data=users, count=count)
+    after_email = None
+    if cursor:
+        try:
+            (after_email,) = decode_cursor(cursor)
+        except (TypeError, ValueError):
+            after_email = None
+        if not isinstance(after_email, str):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    # One extra row tells whether there is a next page
+    users = await app.features.users.users_crud.get_users(
+        session=session,
+        is_active=is_active,
+        is_superuser=is_superuser,
+        after_email=after_email,
+        limit=limit + 1,
+    )
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].email)
+    user_count = None
+    if count != "none":
+        user_count = await app.features.users.users_crud.count_users(
+            session=session,
+            is_active=is_active,
+            is_superuser=is_superuser,
+            estimated=count == "estimated",
+        )
+    return UsersPublic(data=users, count=user_count, next_cursor=next_cursor)
 
 
 @router.post(
@@ -61,6 +92,9 @@ async def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
             detail="The user with this email already exists in the system.",
         )
 
+    # create_user calls Letta before its insert. Closing the session detaches
+    # what it loaded, nothing the route uses since no user was found.
+    await release_connection()
     user = await app.features.users.users_crud.create_user(
         session=session, user_create=user_in
     )
@@ -91,13 +125,13 @@ async def update_user_me(
             raise HTTPException(
                 status_code=409, detail="User with this email already exists"
             )
-    user_data = user_in.model_dump(exclude_unset=True)
-    current_user.sqlmodel_update(user_data)
-    await save_to_db(current_user)
-    return current_user
+    return await app.features.users.users_crud.update_user(
+        session=session, db_user=current_user, user_in=user_in
+    )
 
 
-@router.get("/me", response_model=UserPublic)
+# Clients read their profile right after updating it
+@router.get("/me", response_model=UserPublic, dependencies=[Depends(get_primary_db)])
 async def read_user_me(current_user: CurrentUser) -> Any:
     """
     Get current user.
@@ -105,8 +139,10 @@ async def read_user_me(current_user: CurrentUser) -> Any:
     return current_user
 
 
-@router.delete("/me", response_model=Message)
-async def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
+@router.delete("/me", response_model=UserDeleted)
+async def delete_user_me(
+    session: SessionDep, current_user: CurrentUser, background_tasks: BackgroundTasks
+) -> Any:
     """
     Delete own user.
     """
@@ -114,9 +150,11 @@ async def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    session.delete(current_user)
-    await session.commit()
-    return Message(message="User deleted successfully")
+    job = await app.features.users.users_crud.delete_user(
+        session=session, user=current_user
+    )
+    background_tasks.add_task(run_teardown_job, job.id)
+    return UserDeleted(message="User deleted successfully", teardown_job_id=job.id)
 
 
 @router.post("/signup", response_model=UserPublic)
@@ -133,6 +171,9 @@ async def register_user(session: SessionDep, user_in: UserRegister) -> Any:
             detail="The user with this email already exists in the system",
         )
     user_create = UserCreate.model_validate(user_in)
+    # create_user calls Letta before its insert. Closing the session detaches
+    # what it loaded, nothing the route uses since no user was found.
+    await release_connection()
     user = await app.features.users.users_crud.create_user(
         session=session, user_create=user_create
     )
@@ -194,8 +235,11 @@ async def update_user(
 
 @router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser)])
 async def delete_user(
-    session: SessionDep, current_user: CurrentUser, user_id: uuid.UUID
-) -> Message:
+    session: SessionDep,
+    current_user: CurrentUser,
+    user_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
+) -> UserDeleted:
     """
     Delete a user.
     """
@@ -206,9 +250,24 @@ async def delete_user(
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    session.delete(user)
-    await session.commit()
-    return Message(message="User deleted successfully")
+    job = await app.features.users.users_crud.delete_user(session=session, user=user)
+    background_tasks.add_task(run_teardown_job, job.id)
+    return UserDeleted(message="User deleted successfully", teardown_job_id=job.id)
+
+
+@router.get(
+    "/teardown-jobs/{job_id}",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=UserTeardownJobPublic,
+)
+async def read_teardown_job(session: SessionDep, job_id: uuid.UUID) -> Any:
+    """
+    Get the progress of a deleted user's Letta teardown.
+    """
+    job = await session.get(UserTeardownJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Teardown job not found")
+    return job
 
 
 # Private routes
@@ -233,5 +292,4 @@ async def create_private_user(user_in: PrivateUserCreate, session: SessionDep) -
     )
     session.add(db_obj)
     await session.commit()
-    await session.refresh(db_obj)
     return db_obj
@@ -1,20 +1,28 @@
 import asyncio
-from typing import Any
 
-from sqlmodel import select
+from sqlmodel import delete, func, insert, select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.db import with_async_session
 from app.core.security import get_password_hash
+from app.features.chat.chat_models import ConversationSummary
+from app.features.connections.connections_models import Connection
+from app.features.core.pagination import estimate_count
 from app.features.letta_logic.letta_logic import create_block
 from app.features.prompts.yenta_persona import yenta_persona_prompt
-from app.features.users.users_models import User, UserCreate, UserUpdate
+from app.features.users.users_models import (
+    User,
+    UserCreate,
+    UserTeardownJob,
+    UserUpdate,
+    UserUpdateMe,
+)
 
 
 async def create_letta_fields(user: User):
     yenta_block, profile_block = await asyncio.gather(
-        create_block("persona", yenta_persona_prompt),
-        create_block("human", f"Profile: {user.full_name}"),
+        create_block("persona", yenta_persona_prompt, placement_key=str(user.id)),
+        create_block("human", f"Profile: {user.full_name}", placement_key=str(user.id)),
     )
 
     user.profile_block_id, user.yenta_block_id = (
@@ -27,29 +35,95 @@ async def create_user(*, session: AsyncSession, user_create: UserCreate) -> User
     user = User.model_validate(
         user_create, update={"hashed_password": get_password_hash(user_create.password)}
     )
-    session.add(user)
-    await session.flush()
-    await session.refresh(user)
+    # The blocks only need the user's id, creating them before the insert
+    # keeps the transaction out of the Letta calls
     await create_letta_fields(user)
+    result = await session.exec(insert(User).values(user.model_dump()).returning(User))
+    user = result.scalar_one()
     await session.commit()
-    await session.refresh(user)
     return user
 
 
 async def update_user(
-    *, session: AsyncSession, db_user: User, user_in: UserUpdate
-) -> Any:
+    *, session: AsyncSession, db_user: User, user_in: UserUpdate | UserUpdateMe
+) -> User:
     user_data = user_in.model_dump(exclude_unset=True)
-    extra_data = {}
     if "password" in user_data:
-        password = user_data["password"]
-        hashed_password = get_password_hash(password)
-        extra_data["hashed_password"] = hashed_password
-    db_user.sqlmodel_update(user_data, update=extra_data)
-    session.add(db_user)
+        user_data["hashed_password"] = get_password_hash(user_data.pop("password"))
+    if not user_data:
+        return db_user
+    result = await session.exec(
+        update(User).where(User.id == db_user.id).values(user_data).returning(User)
+    )
+    user = result.scalar_one()
+    await session.commit()
+    return user
+
+
+async def delete_user(*, session: AsyncSession, user: User) -> UserTeardownJob:
+    """
+    Delete the user row and record a job tearing down their Letta resources.
+    """
+    job = UserTeardownJob(
+        user_id=user.id,
+        profile_block_id=user.profile_block_id,
+        yenta_block_id=user.yenta_block_id,
+    )
+    await session.exec(
+        delete(Connection).where(
+            (Connection.source_user_id == user.id)
+            | (Connection.target_user_id == user.id)
+        )
+    )
+    await session.exec(
+        delete(ConversationSummary).where(ConversationSummary.user_id == user.id)
+    )
+    await session.exec(delete(User).where(User.id == user.id))
+    session.add(job)
     await session.commit()
-    await session.refresh(db_user)
-    return db_user
+    return job
+
+
+def _user_filters(is_active: bool | None, is_superuser: bool | None) -> list:
+    filters = []
+    if is_active is not None:
+        filters.append(User.is_active == is_active)
+    if is_superuser is not None:
+        filters.append(User.is_superuser == is_superuser)
+    return filters
+
+
+async def get_users(
+    *,
+    session: AsyncSession,
+    is_active: bool | None = None,
+    is_superuser: bool | None = None,
+    after_email: str | None = None,
+    limit: int | None = None,
+) -> list[User]:
+    """
+    Users ordered by email, starting after after_email.
+    """
+    filters = _user_filters(is_active, is_superuser)
+    if after_email is not None:
+        filters.append(User.email > after_email)
+    statement = select(User).where(*filters).order_by(User.email).limit(limit)
+    result = await session.exec(statement)
+    return list(result.all())
+
+
+async def count_users(
+    *,
+    session: AsyncSession,
+    is_active: bool | None = None,
+    is_superuser: bool | None = None,
+    estimated: bool = False,
+) -> int:
+    filters = _user_filters(is_active, is_superuser)
+    if estimated:
+        return await estimate_count(session, select(User.id).where(*filters))
+    statement = select(func.count()).select_from(User).where(*filters)
+    return (await session.exec(statement)).one()
 
 
 async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
@@ -1,7 +1,12 @@
 import uuid
+from datetime import datetime
+from enum import Enum
+
 from pydantic import BaseModel
 from sqlmodel import Field, SQLModel
 
+from app.features.core.models import Message
+
 
 # Shared properties
 class UserBase(SQLModel):
@@ -48,7 +53,46 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    # Exact or estimated depending on the count parameter, None if not counted
+    count: int | None = None
+    # Pass as cursor to get the next page, None on the last one
+    next_cursor: str | None = None
+
+
+class TeardownJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+# Letta resources of a deleted user, removed in the background
+class UserTeardownJob(SQLModel, table=True):
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(index=True)
+    profile_block_id: str | None = Field(None, max_length=255)
+    yenta_block_id: str | None = Field(None, max_length=255)
+    status: str = Field(default=TeardownJobStatus.PENDING)
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class UserTeardownJobPublic(SQLModel):
+    id: uuid.UUID
+    user_id: uuid.UUID
+    status: TeardownJobStatus
+    total: int
+    completed: int
+    failed: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class UserDeleted(Message):
+    teardown_job_id: uuid.UUID
 
 
 # Private API models
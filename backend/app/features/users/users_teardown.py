@@ -0,0 +1,137 @@
+"""
+Background removal of a deleted user's Letta resources.
+
+Pending or interrupted jobs can be resumed with:
+
+    python -m app.features.users.users_teardown
+"""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable
+from datetime import datetime
+from typing import get_args
+
+from letta_client.types import AgentState
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import engine
+from app.features.letta_logic.letta_logic import (
+    CHAT_TYPES,
+    delete_agent,
+    delete_block,
+    get_agent_block_ids,
+    get_all_agents_for_user,
+    update_agent_tags,
+)
+from app.features.users.users_models import TeardownJobStatus, UserTeardownJob
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TEARDOWN_CONCURRENCY = 8
+PROGRESS_BATCH_SIZE = 20
+
+
+async def _teardown_agent(agent: AgentState, user_id: str) -> None:
+    if "yenta-chat" in agent.tags:
+        await delete_agent(agent.id)
+        return
+    remaining_tags = [tag for tag in agent.tags if tag != user_id]
+    participants = [tag for tag in remaining_tags if tag not in get_args(CHAT_TYPES)]
+    if participants:
+        # Other participants keep the group chat, the user just leaves it
+        await update_agent_tags(agent.id, remaining_tags)
+    else:
+        # The chat's interactions block and its replicas go with it
+        block_ids = await get_agent_block_ids(agent.id, "interactions")
+        await delete_agent(agent.id)
+        for block_id in block_ids:
+            await delete_block(block_id)
+
+
+async def _save_progress(
+    session: AsyncSession, job: UserTeardownJob, **progress: int | str
+) -> None:
+    job.sqlmodel_update(progress, update={"updated_at": datetime.utcnow()})
+    session.add(job)
+    await session.commit()
+
+
+async def _run_steps(
+    session: AsyncSession, job: UserTeardownJob, steps: list[Awaitable[None]]
+) -> None:
+    semaphore = asyncio.Semaphore(TEARDOWN_CONCURRENCY)
+
+    async def run(step: Awaitable[None]) -> bool:
+        async with semaphore:
+            try:
+                await step
+                return True
+            except Exception as e:
+                logger.error(f"Teardown job {job.id}: step failed: {e}")
+                return False
+
+    completed, failed = job.completed, job.failed
+    for i, result in enumerate(asyncio.as_completed([run(s) for s in steps]), 1):
+        if await result:
+            completed += 1
+        else:
+            failed += 1
+        if i % PROGRESS_BATCH_SIZE == 0:
+            await _save_progress(session, job, completed=completed, failed=failed)
+    await _save_progress(session, job, completed=completed, failed=failed)
+
+
+async def run_teardown_job(job_id: uuid.UUID) -> None:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        job = await session.get(UserTeardownJob, job_id)
+        if not job or job.status == TeardownJobStatus.COMPLETED:
+            return
+        await _save_progress(
+            session, job, status=TeardownJobStatus.RUNNING, completed=0, failed=0
+        )
+        user_id = str(job.user_id)
+        try:
+            agents = await get_all_agents_for_user(user_id)
+            block_ids = [
+                block_id
+                for block_id in (job.profile_block_id, job.yenta_block_id)
+                if block_id
+            ]
+            await _save_progress(session, job, total=len(agents) + len(block_ids))
+            # Agents go first since the user's blocks are attached to them
+            await _run_steps(
+                session, job, [_teardown_agent(agent, user_id) for agent in agents]
+            )
+            await _run_steps(session, job, [delete_block(b) for b in block_ids])
+        except Exception as e:
+            logger.error(f"Teardown job {job.id} failed: {e}")
+            await _save_progress(session, job, status=TeardownJobStatus.FAILED)
+            return
+        status = TeardownJobStatus.FAILED if job.failed else TeardownJobStatus.COMPLETED
+        await _save_progress(session, job, status=status)
+        logger.info(
+            f"Teardown job {job.id}: {job.completed}/{job.total} done, {job.failed} failed"
+        )
+
+
+async def main() -> None:
+    async with AsyncSession(engine) as session:
+        result = await session.exec(
+            select(UserTeardownJob.id).where(
+                col(UserTeardownJob.status).in_(
+                    [TeardownJobStatus.PENDING, TeardownJobStatus.RUNNING]
+                )
+            )
+        )
+        job_ids = result.all()
+    logger.info(f"Resuming {len(job_ids)} teardown jobs")
+    for job_id in job_ids:
+        await run_teardown_job(job_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
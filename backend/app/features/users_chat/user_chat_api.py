@@ -1,18 +1,48 @@
+import asyncio
 import logging
 
-from fastapi import APIRouter, Path, Query
+from fastapi import (
+    APIRouter,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from letta_client import CreateBlock
 
-from app.features.chat.chat_utils import get_conversation_for_user
+from app.core.db import release_connection
+from app.features.chat.chat_idempotency import run_idempotent
+from app.features.chat.chat_summaries import (
+    get_summaries,
+    mark_read,
+    record_message,
+    to_preview,
+)
+from app.features.chat.chat_usage import record_usage
+from app.core.config import settings
+from app.features.chat.chat_utils import (
+    cancel_on_disconnect,
+    get_conversation_for_user,
+)
 from app.features.connections.connections_utils import validate_connections
-from app.features.core.api_deps import CurrentUser
+from app.features.core.api_deps import (
+    LettaUser,
+    SessionDep,
+    WebSocketUser,
+    request_deadline,
+)
 from app.features.letta_logic.letta_logic import (
     create_agent,
-    get_agents,
+    decode_agents_cursor,
+    get_agents_page,
     get_messages,
     send_message_to_users_chat,
     create_block,
 )
+from app.features.users_chat.user_chat_events import publish, subscribe
 from app.features.users_chat.user_chat_models import (
     UsersChatCreationResponse,
     UsersChatHistoryResponse,
@@ -22,45 +52,75 @@ from app.features.users_chat.user_chat_models import (
     UsersMessageResponse,
     get_user_chat_messages,
     UsersChatCreationRequest,
+    UsersChatEvent,
+    UsersChatMessage,
 )
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
-users_chat_router = APIRouter(prefix="/users-chat", tags=["users-chat"])
+users_chat_router = APIRouter(
+    prefix="/users-chat",
+    tags=["users-chat"],
+    dependencies=[request_deadline(settings.LETTA_REQUEST_TIMEOUT_SECONDS)],
+)
 
 
 @users_chat_router.get("", response_model=UsersChatsResponse)
-async def get_chats(current_user: CurrentUser) -> UsersChatsResponse:
-    conversation_agents = await get_agents(
-        user_id=current_user.id, chat_type="users-chat"
+async def get_chats(
+    session: SessionDep,
+    current_user: LettaUser,
+    limit: int = Query(20, ge=1, le=100),
+    after: str | None = Query(None),
+) -> UsersChatsResponse:
+    positions = None
+    if after:
+        try:
+            positions = decode_agents_cursor(after)
+        except ValueError:
+            raise HTTPException(400, "Invalid cursor")
+    conversation_agents, next_cursor = await get_agents_page(
+        user_id=str(current_user.id),
+        chat_type="users-chat",
+        limit=limit,
+        positions=positions,
+    )
+    summaries = await get_summaries(
+        session=session,
+        user_id=current_user.id,
+        conversation_ids=[a.id for a in conversation_agents],
     )
-    user_ids = set()
-    for agent in conversation_agents:
-        user_ids.update(agent.tags)
     return UsersChatsResponse(
         chats_info=[
             UsersChatInfo(
                 conversation_id=a.id,
                 name=a.name,
-                participant_ids=[ui for ui in user_ids if len(ui) == 36],
+                participant_ids=[tag for tag in a.tags if len(tag) == 36],
+                **to_preview(summaries.get(a.id)),
             )
             for a in conversation_agents
-        ]
+        ],
+        next_cursor=next_cursor,
     )
 
 
 @users_chat_router.post("", response_model=UsersChatCreationResponse)
 async def create_chat(
-    chat_request: UsersChatCreationRequest, current_user: CurrentUser
+    chat_request: UsersChatCreationRequest, current_user: LettaUser
 ) -> UsersChatCreationResponse:
+    # The check keeps none of the rows its session loads, so closing it before
+    # the Letta calls detaches nothing the route uses
     await validate_connections(current_user.id, chat_request.participant_ids)
-    interactions_block = await create_block("interactions", "")
+    await release_connection()
+    interactions_block = await create_block(
+        "interactions", "", placement_key=str(current_user.id)
+    )
     conversation_agent = await create_agent(
         user_ids=chat_request.participant_ids + [current_user.id],
         chat_type="users-chat",
         tools=["summarize_interaction"],
         block_ids=[interactions_block.id],
+        placement_key=str(current_user.id),
         memory_blocks=[
             CreateBlock(
                 label="persona",
@@ -79,29 +139,108 @@ Only store meaningful takeaways, not every message. Do not reply to users.
     return UsersChatCreationResponse(conversation_id=conversation_agent.id)
 
 
-@users_chat_router.post("/{chat_conversation_id}", response_model=UsersMessageResponse)
+@users_chat_router.websocket("/ws")
+async def stream_events(websocket: WebSocket, current_user: WebSocketUser) -> None:
+    """
+    Push every new message of the user's conversations as a UsersChatEvent
+    """
+    await websocket.accept()
+
+    async def wait_for_disconnect() -> None:
+        # Clients send nothing, receiving only notices when they go away
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    with subscribe(str(current_user.id)) as queue:
+        disconnected = asyncio.ensure_future(wait_for_disconnect())
+        try:
+            while True:
+                next_event = asyncio.ensure_future(queue.get())
+                await asyncio.wait(
+                    {next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if disconnected.done():
+                    next_event.cancel()
+                    return
+                await websocket.send_text(next_event.result())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            disconnected.cancel()
+
+
+@users_chat_router.post(
+    "/{chat_conversation_id}",
+    response_model=UsersMessageResponse,
+    dependencies=[request_deadline(settings.LETTA_MESSAGE_TIMEOUT_SECONDS)],
+)
 async def chat_with_memory(
+    request: Request,
     chat_request: UsersMessageRequest,
-    current_user: CurrentUser,
+    current_user: LettaUser,
     chat_conversation_id: str = Path(),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
 ) -> UsersMessageResponse:
-    await get_conversation_for_user(
+    conversation = await get_conversation_for_user(
         current_user=current_user, chat_conversation_id=chat_conversation_id
     )
-    response = await send_message_to_users_chat(
-        agent_id=chat_conversation_id,
-        sender_id=current_user.id,
-        message=chat_request.message,
+
+    async def send_message() -> UsersMessageResponse:
+        response = await send_message_to_users_chat(
+            agent_id=chat_conversation_id,
+            sender_id=current_user.id,
+            message=chat_request.message,
+        )
+        record_usage(
+            user_id=current_user.id,
+            conversation_id=chat_conversation_id,
+            chat_type="users-chat",
+            usage=response.usage,
+        )
+        participant_ids = [tag for tag in conversation.tags if len(tag) == 36]
+        record_message(
+            conversation_id=chat_conversation_id,
+            chat_type="users-chat",
+            participant_ids=participant_ids,
+            sender_id=current_user.id,
+            message=chat_request.message,
+        )
+        publish(
+            participant_ids,
+            UsersChatEvent(
+                conversation_id=chat_conversation_id,
+                message=UsersChatMessage(
+                    content=chat_request.message,
+                    message_type="user_message",
+                    sender_id=str(current_user.id),
+                ),
+            ),
+        )
+        messages = await get_user_chat_messages(response.messages)
+        return UsersMessageResponse(messages=messages)
+
+    return await cancel_on_disconnect(
+        request,
+        run_idempotent(
+            key=idempotency_key,
+            user_id=current_user.id,
+            scope=f"users-chat/{chat_conversation_id}",
+            payload=chat_request,
+            response_model=UsersMessageResponse,
+            handler=send_message,
+        ),
     )
-    messages = await get_user_chat_messages(response.messages)
-    return UsersMessageResponse(messages=messages)
 
 
 @users_chat_router.get(
     "/{chat_conversation_id}", response_model=UsersChatHistoryResponse
 )
 async def get_chat_history(
-    current_user: CurrentUser,
+    session: SessionDep,
+    current_user: LettaUser,
     limit: int = Query(10, ge=1, le=50),
     last_message_id: str | None = Query(None),
     chat_conversation_id: str = Path(),
@@ -113,5 +252,10 @@ async def get_chat_history(
         agent_id=conversation.id, limit=limit, message_id=last_message_id
     )
     messages = await get_user_chat_messages(messages)
+    if last_message_id is None:
+        # The newest messages were fetched, so the conversation has been read
+        await mark_read(
+            session=session, user_id=current_user.id, conversation_id=conversation.id
+        )
 
     return UsersChatHistoryResponse(messages=messages)
@@ -0,0 +1,92 @@
+"""
+Push new users-chat messages to the WebSockets of their participants.
+
+Events go straight to the sockets open on this worker and through Postgres
+NOTIFY to every other worker, whose listener hands them to its own sockets.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from app.core import metrics, notifications
+from app.features.users_chat.user_chat_models import UsersChatEvent
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "users_chat_events"
+SOCKET_QUEUE_SIZE = 100
+WORKER_ID = uuid.uuid4().hex
+
+# user id -> event queues of the user's sockets open on this worker
+_subscribers: dict[str, set[asyncio.Queue[str]]] = defaultdict(set)
+
+# Strong references to pending notifications so they aren't garbage collected
+_pending_notifications: set[asyncio.Task] = set()
+
+
+@contextmanager
+def subscribe(user_id: str) -> Iterator[asyncio.Queue[str]]:
+    queue: asyncio.Queue[str] = asyncio.Queue(maxsize=SOCKET_QUEUE_SIZE)
+    _subscribers[user_id].add(queue)
+    try:
+        yield queue
+    finally:
+        _subscribers[user_id].discard(queue)
+        if not _subscribers[user_id]:
+            del _subscribers[user_id]
+
+
+def _deliver(participant_ids: list[str], event_json: str) -> None:
+    for user_id in participant_ids:
+        for queue in _subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(event_json)
+            except asyncio.QueueFull:
+                # The socket can't keep up, the client refetches the history
+                metrics.increment("users_chat_events.dropped")
+
+
+async def _notify(payload: str) -> None:
+    try:
+        await notifications.notify(CHANNEL, payload)
+    except Exception as e:
+        logger.error(f"Notifying the other workers of an event failed: {e}")
+
+
+def publish(participant_ids: list[str], event: UsersChatEvent) -> None:
+    """
+    Deliver the event to the participants' sockets on this worker right away
+    and to those on the other workers without making the caller wait.
+    """
+    event_json = event.model_dump_json()
+    _deliver(participant_ids, event_json)
+
+    notification = {
+        "worker_id": WORKER_ID,
+        "participant_ids": participant_ids,
+        "event": event_json,
+    }
+    payload = json.dumps(notification)
+    if len(payload.encode()) > notifications.MAX_NOTIFY_PAYLOAD_BYTES:
+        # Too long to notify, the other workers only announce the message
+        announcement = event.model_copy(update={"message": None})
+        notification["event"] = announcement.model_dump_json()
+        payload = json.dumps(notification)
+    task = asyncio.create_task(_notify(payload))
+    _pending_notifications.add(task)
+    task.add_done_callback(_pending_notifications.discard)
+
+
+def _on_notification(payload: str) -> None:
+    notification = json.loads(payload)
+    if notification["worker_id"] == WORKER_ID:
+        return
+    _deliver(notification["participant_ids"], notification["event"])
+
+
+notifications.register(CHANNEL, _on_notification)
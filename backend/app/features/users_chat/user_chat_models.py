@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Literal
 
 from letta_client.types.letta_message_union import LettaMessageUnion
@@ -13,10 +14,14 @@ class UsersChatInfo(BaseModel):
     conversation_id: str
     name: str
     participant_ids: list[str]
+    last_message: str | None = None
+    last_message_at: datetime | None = None
+    unread_count: int = 0
 
 
 class UsersChatsResponse(BaseModel):
     chats_info: list[UsersChatInfo]
+    next_cursor: str | None = None
 
 
 class UsersChatCreationRequest(BaseModel):
@@ -55,6 +60,13 @@ async def get_user_chat_messages(
     return res
 
 
+# Pushed over the users-chat WebSocket, without the message when it was too
+# long to send between workers
+class UsersChatEvent(BaseModel):
+    conversation_id: str
+    message: UsersChatMessage | None
+
+
 class UsersMessageResponse(BaseModel):
     messages: list[UsersChatMessage]
 
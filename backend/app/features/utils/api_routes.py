@@ -1,4 +1,14 @@
-from fastapi import APIRouter
+import uuid
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core import metrics
+from app.core.db import get_pool_stats
+from app.features.chat.chat_models import LlmUsagesPublic
+from app.features.chat.chat_usage import get_usage
+from app.features.core.api_deps import SessionDep, get_current_active_superuser
+from app.features.letta_logic.letta_logic import CHAT_TYPES
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -6,3 +16,50 @@ router = APIRouter(prefix="/utils", tags=["utils"])
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+@router.get("/metrics/", dependencies=[Depends(get_current_active_superuser)])
+async def read_metrics() -> dict:
+    """
+    Process-local counters and summaries of this worker.
+    """
+    return metrics.snapshot()
+
+
+@router.get("/db-pool/", dependencies=[Depends(get_current_active_superuser)])
+async def read_db_pool() -> dict:
+    """
+    Connection pool state and checkout statistics of this worker.
+    """
+    return get_pool_stats()
+
+
+@router.get(
+    "/llm-usage/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=LlmUsagesPublic,
+)
+async def read_llm_usage(
+    session: SessionDep,
+    user_id: uuid.UUID | None = None,
+    conversation_id: str | None = None,
+    chat_type: CHAT_TYPES | None = None,
+    start_day: date | None = None,
+    end_day: date | None = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+) -> LlmUsagesPublic:
+    """
+    Daily LLM usage per user and conversation, heaviest first.
+    """
+    usage, count = await get_usage(
+        session=session,
+        user_id=user_id,
+        conversation_id=conversation_id,
+        chat_type=chat_type,
+        start_day=start_day,
+        end_day=end_day,
+        skip=skip,
+        limit=limit,
+    )
+    return LlmUsagesPublic(data=usage, count=count)
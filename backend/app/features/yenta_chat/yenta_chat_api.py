@@ -2,14 +2,36 @@ import logging
 import re
 from typing import Annotated
 
-from fastapi import APIRouter, Path, Query, Depends, HTTPException
-
-from app.features.chat.chat_utils import get_conversation_for_user
-from app.features.core.api_deps import CurrentUser, LettaAgentKey
+from fastapi import APIRouter, Path, Query, Depends, HTTPException, Header, Request
+
+from app.core.config import settings
+from app.core.db import release_connection
+from app.features.chat.chat_idempotency import run_idempotent
+from app.features.chat.chat_summaries import (
+    get_summaries,
+    mark_read,
+    record_message,
+    to_preview,
+)
+from app.features.chat.chat_usage import record_usage
+from app.features.chat.chat_utils import (
+    cancel_on_disconnect,
+    get_conversation_for_user,
+)
+from app.features.connections.connections_utils import validate_connections
+from app.features.core.api_deps import (
+    LettaAgentKey,
+    LettaUser,
+    SessionDep,
+    request_deadline,
+)
+from app.features.core.models import Message
 from app.features.letta_logic.letta_logic import (
     create_agent,
-    get_agents,
+    decode_agents_cursor,
+    get_agents_page,
     get_messages,
+    prepare_message_to_yenta,
     send_message_to_yenta,
     get_block_by_id,
 )
@@ -21,30 +43,57 @@ from app.features.yenta_chat.yenta_chat_models import (
     YentaChatsResponse,
     YentaMessageRequest,
     YentaMessageResponse,
+    YentaPrepareRequest,
     get_yenta_chat_messages,
 )
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
-yenta_chat_router = APIRouter(prefix="/yenta-chat", tags=["yenta-chat"])
+yenta_chat_router = APIRouter(
+    prefix="/yenta-chat",
+    tags=["yenta-chat"],
+    dependencies=[request_deadline(settings.LETTA_REQUEST_TIMEOUT_SECONDS)],
+)
 
 
 @yenta_chat_router.get("", response_model=YentaChatsResponse)
-async def get_chats(current_user: CurrentUser) -> YentaChatsResponse:
-    conversation_agents = await get_agents(
-        user_id=current_user.id, chat_type="yenta-chat"
+async def get_chats(
+    session: SessionDep,
+    current_user: LettaUser,
+    limit: int = Query(20, ge=1, le=100),
+    after: str | None = Query(None),
+) -> YentaChatsResponse:
+    positions = None
+    if after:
+        try:
+            positions = decode_agents_cursor(after)
+        except ValueError:
+            raise HTTPException(400, "Invalid cursor")
+    conversation_agents, next_cursor = await get_agents_page(
+        user_id=str(current_user.id),
+        chat_type="yenta-chat",
+        limit=limit,
+        positions=positions,
+    )
+    summaries = await get_summaries(
+        session=session,
+        user_id=current_user.id,
+        conversation_ids=[a.id for a in conversation_agents],
     )
     return YentaChatsResponse(
         chats_info=[
-            YentaChatInfo(conversation_id=a.id, name=a.name)
+            YentaChatInfo(
+                conversation_id=a.id, name=a.name, **to_preview(summaries.get(a.id))
+            )
             for a in conversation_agents
-        ]
+        ],
+        next_cursor=next_cursor,
     )
 
 
 @yenta_chat_router.post("", response_model=YentaChatCreationResponse)
-async def create_chat(current_user: CurrentUser) -> YentaChatCreationResponse:
+async def create_chat(current_user: LettaUser) -> YentaChatCreationResponse:
     conversation_agent = await create_agent(
         user_ids=[current_user.id],
         chat_type="yenta-chat",
@@ -53,11 +102,17 @@ async def create_chat(current_user: CurrentUser) -> YentaChatCreationResponse:
     return YentaChatCreationResponse(conversation_id=conversation_agent.id)
 
 
-@yenta_chat_router.post("/{chat_conversation_id}", response_model=YentaMessageResponse)
+@yenta_chat_router.post(
+    "/{chat_conversation_id}",
+    response_model=YentaMessageResponse,
+    dependencies=[request_deadline(settings.LETTA_MESSAGE_TIMEOUT_SECONDS)],
+)
 async def chat_with_memory(
+    request: Request,
     chat_request: YentaMessageRequest,
-    current_user: CurrentUser,
+    current_user: LettaUser,
     chat_conversation_id: str = Path(),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
 ) -> YentaMessageResponse:
     await get_conversation_for_user(
         current_user=current_user, chat_conversation_id=chat_conversation_id
@@ -66,21 +121,82 @@ async def chat_with_memory(
     # Extract mentioned user IDs from the message text
     mention_pattern = r"@\[.*?\]\((.*?)\)"
     mentioned_ids = re.findall(mention_pattern, chat_request.message)
+    if mentioned_ids:
+        # Only the interactions with connections are shared with yenta. The
+        # check keeps none of the rows its session loads, so closing it
+        # before the Letta calls detaches nothing the route uses.
+        await validate_connections(current_user.id, mentioned_ids)
+        await release_connection()
+
+    async def send_message() -> YentaMessageResponse:
+        response = await send_message_to_yenta(
+            current_user_id=current_user.id,
+            agent_id=chat_conversation_id,
+            message=chat_request.message,
+            mentioned_ids=mentioned_ids,
+        )
+        record_usage(
+            user_id=current_user.id,
+            conversation_id=chat_conversation_id,
+            chat_type="yenta-chat",
+            usage=response.usage,
+        )
+        messages = get_yenta_chat_messages(response.messages)
+        replies = [m.content for m in messages if m.role == "yenta"]
+        record_message(
+            conversation_id=chat_conversation_id,
+            chat_type="yenta-chat",
+            participant_ids=[str(current_user.id)],
+            sender_id=current_user.id,
+            message=replies[-1] if replies else chat_request.message,
+        )
+        return YentaMessageResponse(messages=messages)
+
+    return await cancel_on_disconnect(
+        request,
+        run_idempotent(
+            key=idempotency_key,
+            user_id=current_user.id,
+            scope=f"yenta-chat/{chat_conversation_id}",
+            payload=chat_request,
+            response_model=YentaMessageResponse,
+            handler=send_message,
+        ),
+    )
+
 
-    response = await send_message_to_yenta(
+@yenta_chat_router.post("/{chat_conversation_id}/prepare", response_model=Message)
+async def prepare_chat_message(
+    prepare_request: YentaPrepareRequest,
+    current_user: LettaUser,
+    chat_conversation_id: str = Path(),
+) -> Message:
+    """
+    Get a send mentioning these users ready while the message is being typed
+    """
+    if prepare_request.mentioned_user_ids:
+        # Keeps none of the rows it loads, see chat_with_memory
+        await validate_connections(current_user.id, prepare_request.mentioned_user_ids)
+        await release_connection()
+    await get_conversation_for_user(
+        current_user=current_user, chat_conversation_id=chat_conversation_id
+    )
+    await prepare_message_to_yenta(
         current_user_id=current_user.id,
         agent_id=chat_conversation_id,
-        message=chat_request.message,
-        mentioned_ids=mentioned_ids,
+        mentioned_ids=prepare_request.mentioned_user_ids,
+        ttl_seconds=settings.YENTA_PREPARE_TTL_SECONDS,
+        max_per_user=settings.YENTA_PREPARE_MAX_PER_USER,
     )
-    return YentaMessageResponse(messages=get_yenta_chat_messages(response.messages))
+    return Message(message="Prepared")
 
 
 @yenta_chat_router.get(
     "/{chat_conversation_id}", response_model=YentaChatHistoryResponse
 )
 async def get_chat_history(
-    current_user: CurrentUser,
+    session: SessionDep,
+    current_user: LettaUser,
     limit: int = Query(10, ge=1, le=50),
     last_message_id: str | None = Query(None),
     chat_conversation_id: str = Path(),
@@ -91,6 +207,11 @@ async def get_chat_history(
     messages = await get_messages(
         agent_id=conversation.id, limit=limit, message_id=last_message_id
     )
+    if last_message_id is None:
+        # The newest messages were fetched, so the conversation has been read
+        await mark_read(
+            session=session, user_id=current_user.id, conversation_id=conversation.id
+        )
     return YentaChatHistoryResponse(
         messages=get_yenta_chat_messages(messages),
     )
@@ -101,6 +222,7 @@ async def get_user_profile_block(user_id: str = Path()) -> dict:
     """
     Get a user's profile block value
     """
+    # Reads with its own session, which is closed before the Letta call
     users = await get_users_by_ids([user_id])
 
     if not users:
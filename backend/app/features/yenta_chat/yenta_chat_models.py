@@ -1,9 +1,10 @@
+from datetime import datetime
 from typing import Literal
 
 from letta_client.types.assistant_message import AssistantMessage
 from letta_client.types.letta_message_union import LettaMessageUnion
 from letta_client.types.user_message import UserMessage
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 ROLE = Literal["user", "yenta"]
 
@@ -12,10 +13,14 @@ ROLE = Literal["user", "yenta"]
 class YentaChatInfo(BaseModel):
     conversation_id: str
     name: str
+    last_message: str | None = None
+    last_message_at: datetime | None = None
+    unread_count: int = 0
 
 
 class YentaChatsResponse(BaseModel):
     chats_info: list[YentaChatInfo]
+    next_cursor: str | None = None
 
 
 class YentaChatCreationResponse(BaseModel):
@@ -27,6 +32,10 @@ class YentaMessageRequest(BaseModel):
     mentioned_user_ids: list[str] = []
 
 
+class YentaPrepareRequest(BaseModel):
+    mentioned_user_ids: list[str] = Field(max_length=20)
+
+
 class YentaChatMessage(BaseModel):
     content: str
     message_type: str
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import traceback
 from collections.abc import Callable
@@ -8,11 +9,17 @@ from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.cors import CORSMiddleware
-from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+from starlette.status import (
+    HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_504_GATEWAY_TIMEOUT,
+)
 
 from app.core.config import settings
+from app.core.notifications import listen as listen_for_notifications
 from app.features.core.api_main import api_router
 from app.features.core.models import ErrorResponse
+from app.features.letta_logic.letta_logic import LettaDeadlineExceeded
+from app.features.letta_logic.letta_tools import sync_tools
 
 # Configure logging
 logging.basicConfig(
@@ -70,7 +77,10 @@ async def lifespan(app: FastAPI):
         )
     except Exception:
         pass
+    await sync_tools()
+    notifications_listener = asyncio.create_task(listen_for_notifications())
     yield
+    notifications_listener.cancel()
 
 
 app = FastAPI(
@@ -80,6 +90,20 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+
+@app.exception_handler(LettaDeadlineExceeded)
+async def letta_deadline_exceeded_handler(
+    request: Request, exc: LettaDeadlineExceeded
+) -> JSONResponse:
+    logger.warning(f"{exc} - Path: {request.url.path}")
+    return JSONResponse(
+        status_code=HTTP_504_GATEWAY_TIMEOUT,
+        content=ErrorResponse(
+            detail="Request deadline exceeded", error_code="deadline_exceeded"
+        ).model_dump(),
+    )
+
+
 # Add exception handling middleware
 app.add_middleware(ExceptionMiddleware)
 
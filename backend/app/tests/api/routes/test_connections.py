@@ -0,0 +1,156 @@
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.features.connections.connections_models import Connection
+from app.features.users.users_models import User
+from app.tests.utils.utils import count_queries, random_email, random_lower_string
+
+
+def test_connection_query_count(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    superuser_id = r.json()["id"]
+
+    with count_queries() as statements:
+        r = client.post(
+            f"{settings.API_V1_STR}/connections/",
+            headers=normal_user_token_headers,
+            json={"target_user_id": superuser_id},
+        )
+    assert r.status_code == 200
+    connection = r.json()
+    assert connection["target_user_id"] == superuser_id
+    # The token's user and the upsert
+    assert len(statements) == 2
+
+    # Asking again, from either side, returns the same connection
+    r = client.post(
+        f"{settings.API_V1_STR}/connections/",
+        headers=superuser_token_headers,
+        json={"target_user_id": connection["source_user_id"]},
+    )
+    assert r.status_code == 200
+    assert r.json()["id"] == connection["id"]
+
+    with count_queries() as statements:
+        r = client.put(
+            f"{settings.API_V1_STR}/connections/{connection['id']}",
+            headers=superuser_token_headers,
+            json={"status": "accepted"},
+        )
+    assert r.status_code == 200
+    assert r.json()["status"] == "accepted"
+    # The token's user and the UPDATE
+    assert len(statements) == 2
+
+    with count_queries() as statements:
+        r = client.delete(
+            f"{settings.API_V1_STR}/connections/{connection['id']}",
+            headers=normal_user_token_headers,
+        )
+    assert r.status_code == 200
+    # The token's user and the DELETE
+    assert len(statements) == 2
+
+
+def test_update_connection_not_target(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    r = client.post(
+        f"{settings.API_V1_STR}/connections/",
+        headers=normal_user_token_headers,
+        json={"target_user_id": r.json()["id"]},
+    )
+    connection_id = r.json()["id"]
+    # Only the target can accept or reject
+    r = client.put(
+        f"{settings.API_V1_STR}/connections/{connection_id}",
+        headers=normal_user_token_headers,
+        json={"status": "accepted"},
+    )
+    assert r.status_code == 403
+
+
+def test_update_connection_not_found(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.put(
+        f"{settings.API_V1_STR}/connections/{uuid.uuid4()}",
+        headers=normal_user_token_headers,
+        json={"status": "accepted"},
+    )
+    assert r.status_code == 404
+
+
+def test_read_connections_invalid_cursor(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/connections/",
+        headers=normal_user_token_headers,
+        params={"cursor": "not a cursor"},
+    )
+    assert r.status_code == 400
+
+
+def test_read_connections_pages(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    user_id = r.json()["id"]
+    now = datetime.utcnow()
+    created_ids = []
+    for i in range(5):
+        other = User(
+            email=random_email(),
+            full_name=random_lower_string(),
+            hashed_password=random_lower_string(),
+        )
+        db.add(other)
+        db.flush()
+        # Both directions, so the page merges the two sides
+        source_id, target_id = (user_id, other.id) if i % 2 else (other.id, user_id)
+        connection = Connection(
+            source_user_id=source_id,
+            target_user_id=target_id,
+            updated_at=now + timedelta(minutes=i),
+        )
+        db.add(connection)
+        created_ids.append(str(connection.id))
+    db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get(
+            f"{settings.API_V1_STR}/connections/",
+            headers=normal_user_token_headers,
+            params=params,
+        )
+        assert r.status_code == 200
+        page = r.json()
+        assert len(page["data"]) <= 2
+        seen.extend(page["data"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    seen_ids = [c["id"] for c in seen]
+    assert len(seen_ids) == len(set(seen_ids))
+    keys = [(datetime.fromisoformat(c["updated_at"]), c["id"]) for c in seen]
+    assert keys == sorted(keys, reverse=True)
+    # Newest first, and nothing is newer than the connections just created
+    assert seen_ids[:5] == created_ids[::-1]
@@ -1,14 +1,16 @@
 import uuid
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
+import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
 import app.features.users.users_crud
 from app.core.config import settings
 from app.core.security import verify_password
+from app.features.core.pagination import encode_cursor
 from app.features.users.users_models import User, UserCreate
-from app.tests.utils.utils import random_email, random_lower_string
+from app.tests.utils.utils import count_queries, random_email, random_lower_string
 
 
 def test_get_users_superuser_me(
@@ -58,6 +60,25 @@ def test_create_user_new_email(
         assert user.email == created_user["email"]
 
 
+def test_create_user_query_count(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    data = {"email": random_email(), "password": random_lower_string()}
+    # Letta records block placements through the same engine, leave it out
+    with (
+        patch("app.features.users.users_crud.create_letta_fields", AsyncMock()),
+        count_queries() as statements,
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/users/",
+            headers=superuser_token_headers,
+            json=data,
+        )
+    assert 200 <= r.status_code < 300
+    # The token's user, the email check, then the INSERT returning the row
+    assert len(statements) == 3
+
+
 def test_get_existing_user(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -174,6 +195,54 @@ def test_retrieve_users(
         assert "email" in item
 
 
+def test_retrieve_users_pages(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    params = {"limit": 1, "count": "estimated"}
+    r = client.get(
+        f"{settings.API_V1_STR}/users/", headers=superuser_token_headers, params=params
+    )
+    first_page = r.json()
+    assert len(first_page["data"]) == 1
+    assert first_page["count"] is not None
+    assert first_page["next_cursor"]
+
+    params = {"limit": 1, "count": "none", "cursor": first_page["next_cursor"]}
+    r = client.get(
+        f"{settings.API_V1_STR}/users/", headers=superuser_token_headers, params=params
+    )
+    second_page = r.json()
+    assert second_page["count"] is None
+    assert second_page["data"][0]["email"] > first_page["data"][0]["email"]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(1), encode_cursor()])
+def test_retrieve_users_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str], cursor: str
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"cursor": cursor},
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+
+
+def test_retrieve_users_filters(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"is_superuser": True},
+    )
+    users = r.json()
+    assert users["data"]
+    assert all(user["is_superuser"] for user in users["data"])
+    assert users["count"] == len(users["data"])
+
+
 def test_update_user_me(
     client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -197,6 +266,22 @@ def test_update_user_me(
     assert user_db.full_name == full_name
 
 
+def test_update_user_me_query_count(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    data = {"full_name": random_lower_string()}
+    with count_queries() as statements:
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/me",
+            headers=normal_user_token_headers,
+            json=data,
+        )
+    assert r.status_code == 200
+    assert r.json()["full_name"] == data["full_name"]
+    # The token's user, then the UPDATE returning the row
+    assert len(statements) == 2
+
+
 def test_update_password_me(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -310,6 +395,18 @@ def test_register_user(client: TestClient, db: Session) -> None:
     assert verify_password(password, user_db.hashed_password)
 
 
+def test_register_user_query_count(client: TestClient) -> None:
+    data = {"email": random_email(), "password": random_lower_string()}
+    with (
+        patch("app.features.users.users_crud.create_letta_fields", AsyncMock()),
+        count_queries() as statements,
+    ):
+        r = client.post(f"{settings.API_V1_STR}/users/signup", json=data)
+    assert r.status_code == 200
+    # The email check, then the INSERT returning the row
+    assert len(statements) == 2
+
+
 def test_register_user_already_exists_error(client: TestClient) -> None:
     password = random_lower_string()
     full_name = random_lower_string()
@@ -352,6 +449,26 @@ def test_update_user(
     assert user_db.full_name == "Updated_full_name"
 
 
+def test_update_user_query_count(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user = User(email=random_email(), hashed_password=random_lower_string())
+    db.add(user)
+    db.commit()
+
+    data = {"full_name": random_lower_string()}
+    with count_queries() as statements:
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/{user.id}",
+            headers=superuser_token_headers,
+            json=data,
+        )
+    assert r.status_code == 200
+    assert r.json()["full_name"] == data["full_name"]
+    # The token's user, the user to update, then the UPDATE returning the row
+    assert len(statements) == 3
+
+
 def test_update_user_not_exists(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -0,0 +1,39 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.features.chat import chat_idempotency
+
+
+def test_in_flight_key_with_different_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    user_id = uuid.uuid4()
+
+    async def wait() -> None:
+        in_flight = asyncio.get_running_loop().create_future()
+        monkeypatch.setitem(
+            chat_idempotency._in_flight, (user_id, "key"), ("hash", in_flight)
+        )
+        await chat_idempotency._wait_for_response(user_id, "key", "other hash")
+
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(wait())
+    assert e.value.status_code == 422
+
+
+def test_in_flight_key_times_out(monkeypatch: pytest.MonkeyPatch) -> None:
+    user_id = uuid.uuid4()
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_TIMEOUT_SECONDS", 0.01)
+
+    async def wait() -> None:
+        in_flight = asyncio.get_running_loop().create_future()
+        monkeypatch.setitem(
+            chat_idempotency._in_flight, (user_id, "key"), ("hash", in_flight)
+        )
+        await chat_idempotency._wait_for_response(user_id, "key", "hash")
+
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(wait())
+    assert e.value.status_code == 409
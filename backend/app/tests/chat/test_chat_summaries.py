@@ -0,0 +1,119 @@
+import asyncio
+import uuid
+from collections.abc import Awaitable
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import engine
+from app.features.chat import chat_summaries
+from app.features.chat.chat_models import ConversationSummary
+
+
+def _run(awaitable: Awaitable[None]) -> None:
+    async def run() -> None:
+        try:
+            await awaitable
+        finally:
+            # The pooled connections belong to this test's event loop
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+async def _record(
+    conversation_id: str, participant_ids: list[str], sender_id: str, message: str
+) -> None:
+    chat_summaries.record_message(
+        conversation_id=conversation_id,
+        chat_type="users-chat",
+        participant_ids=participant_ids,
+        sender_id=uuid.UUID(sender_id),
+        message=message,
+    )
+    await asyncio.gather(*chat_summaries._pending_writes)
+
+
+async def _summaries(
+    user_id: str, conversation_ids: list[str]
+) -> dict[str, ConversationSummary]:
+    async with AsyncSession(engine) as session:
+        return await chat_summaries.get_summaries(
+            session=session,
+            user_id=uuid.UUID(user_id),
+            conversation_ids=conversation_ids,
+        )
+
+
+def test_message_is_unread_for_everyone_but_its_sender() -> None:
+    sender_id, recipient_id = str(uuid.uuid4()), str(uuid.uuid4())
+    conversation_id = f"agent-{uuid.uuid4()}"
+
+    async def check() -> None:
+        message = "x" * (chat_summaries.SNIPPET_LENGTH + 10)
+        await _record(conversation_id, [sender_id, recipient_id], sender_id, message)
+        sent = (await _summaries(sender_id, [conversation_id]))[conversation_id]
+        received = (await _summaries(recipient_id, [conversation_id]))[conversation_id]
+        assert sent.unread_count == 0
+        assert received.unread_count == 1
+        assert received.last_message == message[: chat_summaries.SNIPPET_LENGTH]
+
+    _run(check())
+
+
+def test_later_messages_update_the_preview() -> None:
+    user_id, other_user_id = str(uuid.uuid4()), str(uuid.uuid4())
+    conversation_id = f"agent-{uuid.uuid4()}"
+    participant_ids = [user_id, other_user_id]
+
+    async def check() -> None:
+        await _record(conversation_id, participant_ids, other_user_id, "first")
+        await _record(conversation_id, participant_ids, other_user_id, "second")
+        summary = (await _summaries(user_id, [conversation_id]))[conversation_id]
+        assert (summary.last_message, summary.unread_count) == ("second", 2)
+
+        # Replying means the user has read the conversation
+        await _record(conversation_id, participant_ids, user_id, "reply")
+        summary = (await _summaries(user_id, [conversation_id]))[conversation_id]
+        other = (await _summaries(other_user_id, [conversation_id]))[conversation_id]
+        assert (summary.last_message, summary.unread_count) == ("reply", 0)
+        assert other.unread_count == 1
+
+    _run(check())
+
+
+def test_mark_read_only_clears_the_users_count() -> None:
+    user_id, other_user_id = str(uuid.uuid4()), str(uuid.uuid4())
+    sender_id = str(uuid.uuid4())
+    conversation_id = f"agent-{uuid.uuid4()}"
+
+    async def check() -> None:
+        await _record(
+            conversation_id, [user_id, other_user_id, sender_id], sender_id, "hi"
+        )
+        async with AsyncSession(engine) as session:
+            await chat_summaries.mark_read(
+                session=session,
+                user_id=uuid.UUID(user_id),
+                conversation_id=conversation_id,
+            )
+        summary = (await _summaries(user_id, [conversation_id]))[conversation_id]
+        other = (await _summaries(other_user_id, [conversation_id]))[conversation_id]
+        assert summary.unread_count == 0
+        assert other.unread_count == 1
+
+    _run(check())
+
+
+def test_get_summaries_only_returns_the_requested_conversations() -> None:
+    user_id = str(uuid.uuid4())
+    conversation_ids = [f"agent-{uuid.uuid4()}" for _ in range(3)]
+
+    async def check() -> None:
+        for conversation_id in conversation_ids:
+            await _record(conversation_id, [user_id], user_id, conversation_id)
+        summaries = await _summaries(user_id, conversation_ids[:2] + ["agent-unknown"])
+        assert set(summaries) == set(conversation_ids[:2])
+        assert await _summaries(str(uuid.uuid4()), conversation_ids) == {}
+        assert await _summaries(user_id, []) == {}
+
+    _run(check())
@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+
+import pytest
+from letta_client.types import LettaUsageStatistics
+from sqlalchemy.dialects import postgresql
+
+from app.features.chat import chat_usage
+
+USER_ID = uuid.UUID("0f8fad5b-d9cb-469f-a165-70867728950e")
+
+
+class FakeSession:
+    statements: list = []
+    fail = False
+
+    def __init__(self, _engine) -> None:
+        pass
+
+    async def __aenter__(self) -> "FakeSession":
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        return self
+
+    async def __aexit__(self, *_exc) -> None:
+        pass
+
+    async def exec(self, statement) -> None:
+        self.statements.append(statement)
+
+    async def commit(self) -> None:
+        pass
+
+
+@pytest.fixture
+def session(monkeypatch: pytest.MonkeyPatch) -> type[FakeSession]:
+    monkeypatch.setattr(FakeSession, "statements", [])
+    monkeypatch.setattr(chat_usage, "AsyncSession", FakeSession)
+    return FakeSession
+
+
+def _record_usage(usage: LettaUsageStatistics) -> None:
+    async def record() -> None:
+        chat_usage.record_usage(
+            user_id=USER_ID,
+            conversation_id="agent-1",
+            chat_type="yenta-chat",
+            usage=usage,
+        )
+        # Recording returns before the write, which is kept until it ends
+        assert len(chat_usage._pending_writes) == 1
+        await asyncio.gather(*chat_usage._pending_writes)
+
+    asyncio.run(record())
+
+
+def test_usage_is_added_to_the_daily_totals(session: type[FakeSession]) -> None:
+    _record_usage(LettaUsageStatistics(prompt_tokens=10, completion_tokens=5))
+
+    (statement,) = session.statements
+    params = statement.compile(dialect=postgresql.dialect()).params
+    assert params["prompt_tokens"] == 10
+    assert params["total_tokens"] == 0
+    assert params["message_count"] == 1
+    assert "ON CONFLICT (user_id, conversation_id, chat_type, day)" in str(
+        statement.compile(dialect=postgresql.dialect())
+    )
+
+
+def test_failed_write_is_only_logged(
+    session: type[FakeSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(session, "fail", True)
+    _record_usage(LettaUsageStatistics(total_tokens=15))
+    assert session.statements == []
+    assert not chat_usage._pending_writes
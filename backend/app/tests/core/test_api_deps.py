@@ -0,0 +1,42 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.features.core.api_deps import SessionDep
+
+
+@pytest.fixture
+def counted(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    counted: list[str] = []
+    monkeypatch.setattr(
+        metrics, "increment", lambda name, value=1: counted.append(name)
+    )
+    return counted
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(session: SessionDep, item_id: int) -> int:
+        session.in_transaction()
+        return item_id
+
+    @app.post("/items")
+    async def create_item(_session: SessionDep) -> None:
+        return None
+
+    return TestClient(app)
+
+
+def test_session_use_is_counted_per_route(
+    client: TestClient, counted: list[str]
+) -> None:
+    client.get("/items/1")
+    client.post("/items")
+    assert counted == [
+        "db_sessions.used.GET /items/{item_id}",
+        "db_sessions.unused.POST /items",
+    ]
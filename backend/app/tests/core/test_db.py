@@ -0,0 +1,185 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.util import greenlet_spawn
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import db, metrics
+from app.core.config import settings
+from app.features.users.users_models import User
+
+
+@pytest.fixture
+def replica(monkeypatch: pytest.MonkeyPatch):
+    replica_engine = create_async_engine("postgresql+psycopg://replica/app")
+    monkeypatch.setattr(db, "replica_engine", replica_engine)
+    return replica_engine.sync_engine
+
+
+def test_reads_go_to_replica(replica) -> None:
+    session = db.create_session().sync_session
+    assert session.get_bind(clause=select(User)) is replica
+
+
+@pytest.mark.usefixtures("replica")
+def test_reads_after_write_stay_on_primary() -> None:
+    session = db.create_session().sync_session
+    statement = update(User).values(full_name="x")
+    assert session.get_bind(clause=statement) is db.engine.sync_engine
+    assert session.get_bind(clause=select(User)) is db.engine.sync_engine
+
+
+@pytest.mark.usefixtures("replica")
+def test_locking_reads_go_to_primary() -> None:
+    session = db.create_session().sync_session
+    statement = select(User).with_for_update()
+    assert session.get_bind(clause=statement) is db.engine.sync_engine
+
+
+@pytest.mark.usefixtures("replica")
+def test_primary_only_session() -> None:
+    session = db.create_session(primary_only=True).sync_session
+    assert session.get_bind(clause=select(User)) is db.engine.sync_engine
+
+
+@db.with_async_session
+async def _get_session(*, session):
+    return session
+
+
+def test_helpers_reuse_the_request_session() -> None:
+    async def check() -> None:
+        async with db.request_session() as request_session:
+            assert await _get_session() is request_session
+            async with db.get_session() as session:
+                assert session is request_session
+
+    asyncio.run(check())
+
+
+def test_helpers_outside_a_request_get_their_own_session() -> None:
+    async def check() -> None:
+        first, second = await _get_session(), await _get_session()
+        assert isinstance(first, AsyncSession)
+        assert first is not second
+
+    asyncio.run(check())
+
+
+def test_passed_session_is_used_as_is() -> None:
+    async def check() -> None:
+        session = db.create_session()
+        async with db.request_session():
+            assert await _get_session(session=session) is session
+
+    asyncio.run(check())
+
+
+def test_release_connection_closes_the_used_request_session() -> None:
+    closed: list[bool] = []
+
+    async def check() -> None:
+        async with db.request_session() as session:
+            # First use creates the session
+            assert not session.in_transaction()
+
+            async def close() -> None:
+                closed.append(True)
+
+            session._session.close = close
+            await db.release_connection()
+            assert closed == [True]
+
+    asyncio.run(check())
+
+
+def test_release_connection_without_a_used_session_does_nothing() -> None:
+    async def check() -> None:
+        await db.release_connection()
+        async with db.request_session() as session:
+            await db.release_connection()
+            assert not session.used
+
+    asyncio.run(check())
+
+
+class FakeConnection:
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def test_pool_records_waits_and_timeouts(monkeypatch: pytest.MonkeyPatch) -> None:
+    counted: list[str] = []
+    observed: list[str] = []
+    monkeypatch.setattr(
+        metrics, "increment", lambda name, value=1: counted.append(name)
+    )
+    monkeypatch.setattr(metrics, "observe", lambda name, _value: observed.append(name))
+
+    async def check_out_twice() -> None:
+        pool = db.TimedQueuePool(FakeConnection, pool_size=1, max_overflow=0, timeout=0)
+        connection = await greenlet_spawn(pool.connect)
+        try:
+            with pytest.raises(exc.TimeoutError):
+                await greenlet_spawn(pool.connect)
+        finally:
+            await greenlet_spawn(connection.close)
+
+    asyncio.run(check_out_twice())
+    assert counted == ["db_pool_timeouts"]
+    assert observed == ["db_pool_wait_seconds", "db_pool_wait_seconds"]
+
+
+@pytest.mark.parametrize(
+    ("profile", "pool_size"), [("api", 10), ("worker", 2), ("migration", None)]
+)
+def test_engine_options_follow_the_pool_profile(
+    profile: str, pool_size: int | None
+) -> None:
+    options = db.get_engine_options(profile, "psycopg")
+    assert options.get("pool_size") == pool_size
+    expected_pool = db.NullPool if profile == "migration" else db.TimedQueuePool
+    assert options["poolclass"] is expected_pool
+
+
+def test_pool_settings_override_the_profile(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT_SECONDS", None)
+    options = db.get_engine_options("api", "psycopg")
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == db.POOL_PROFILES["api"]["max_overflow"]
+    assert options["pool_timeout"] == db.POOL_PROFILES["api"]["pool_timeout"]
+
+
+def test_asyncpg_caches_statements_without_pgbouncer(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "DB_PGBOUNCER_MODE", False)
+    connect_args = db.get_engine_options("api", "asyncpg")["connect_args"]
+    assert connect_args == {
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+    }
+    assert db.get_engine_options("api", "psycopg")["connect_args"] == {}
+
+
+def test_pgbouncer_mode_disables_prepared_statement_reuse(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "DB_PGBOUNCER_MODE", True)
+    connect_args = db.get_engine_options("api", "asyncpg")["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+    psycopg_args = db.get_engine_options("api", "psycopg")["connect_args"]
+    assert psycopg_args == {"prepare_threshold": None}
+
+
+def test_database_url_uses_the_driver() -> None:
+    assert db.get_database_url("asyncpg").drivername == "postgresql+asyncpg"
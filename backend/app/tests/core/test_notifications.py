@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from app.core import notifications
+
+
+def test_listen_reconnects_after_lost_connection(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    attempts: list[int] = []
+
+    async def listen_until_lost() -> None:
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise OSError("connection refused")
+        if len(attempts) == 3:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(notifications, "_listen_until_lost", listen_until_lost)
+    monkeypatch.setattr(notifications, "LISTEN_RETRY_SECONDS", 0)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(notifications.listen())
+    assert len(attempts) == 3
+
+
+def test_failing_handler_doesnt_stop_notifications(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    received: list[str] = []
+
+    def fail(_payload: str) -> None:
+        raise ValueError("bad payload")
+
+    monkeypatch.setattr(
+        notifications, "_handlers", {"failing": fail, "working": received.append}
+    )
+    notifications._on_notification(None, 0, "failing", "1")
+    notifications._on_notification(None, 0, "working", "2")
+    assert received == ["2"]
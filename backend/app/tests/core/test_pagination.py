@@ -0,0 +1,19 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.features.core.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip() -> None:
+    updated_at = datetime(2025, 6, 1, 12, 30)
+    connection_id = uuid.uuid4()
+    cursor = encode_cursor(updated_at.isoformat(), connection_id)
+    assert decode_cursor(cursor) == [updated_at.isoformat(), str(connection_id)]
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor()[:-2] + "!"])
+def test_malformed_cursor(cursor: str) -> None:
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
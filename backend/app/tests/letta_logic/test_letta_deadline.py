@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.features.core.api_deps import request_deadline
+from app.features.letta_logic import letta_logic
+from app.main import letta_deadline_exceeded_handler
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.add_exception_handler(
+        letta_logic.LettaDeadlineExceeded, letta_deadline_exceeded_handler
+    )
+
+    @app.get("/timeout")
+    async def read_timeout(timeout: float = request_deadline(30)) -> float:
+        return timeout
+
+    @app.get("/slow")
+    async def read_slow(_timeout: float = request_deadline(0.01)) -> None:
+        await letta_logic._call(asyncio.sleep(1), "slow")
+
+    return TestClient(app)
+
+
+def test_request_timeout_header_is_capped_by_route_default(client: TestClient) -> None:
+    assert client.get("/timeout").json() == 30
+    assert client.get("/timeout", headers={"X-Request-Timeout": "5"}).json() == 5
+    assert client.get("/timeout", headers={"X-Request-Timeout": "300"}).json() == 30
+
+
+def test_non_positive_request_timeout_is_rejected(client: TestClient) -> None:
+    r = client.get("/timeout", headers={"X-Request-Timeout": "0"})
+    assert r.status_code == 422
+
+
+def test_exceeded_deadline_answers_504(client: TestClient) -> None:
+    r = client.get("/slow")
+    assert r.status_code == 504
+    assert r.json()["error_code"] == "deadline_exceeded"
+
+
+def test_nested_deadline_is_counted_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    counted: list[str] = []
+    monkeypatch.setattr(
+        metrics, "increment", lambda name, value=1: counted.append(name)
+    )
+
+    async def exceeded_inner_call() -> None:
+        metrics.increment("letta_calls_cancelled.deadline.inner")
+        raise letta_logic.LettaDeadlineExceeded("Deadline exceeded in inner")
+
+    async def call_nested() -> None:
+        letta_logic.set_deadline(30)
+        await letta_logic._call(exceeded_inner_call(), "outer")
+
+    with pytest.raises(letta_logic.LettaDeadlineExceeded, match="inner"):
+        asyncio.run(call_nested())
+    assert counted == ["letta_calls_cancelled.deadline.inner"]
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+
+from letta_client.types import AgentState
+
+from app.features.letta_logic.letta_gc import is_orphan_agent
+
+CUTOFF = datetime(2025, 6, 1)
+USER_ID = "0f8fad5b-d9cb-469f-a165-70867728950e"
+OTHER_USER_ID = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+
+
+def _agent(tags: list[str], created_at: datetime | None) -> AgentState:
+    return AgentState.model_construct(id="agent-1", tags=tags, created_at=created_at)
+
+
+def test_agent_without_existing_participants_is_orphan() -> None:
+    agent = _agent(["users-chat", USER_ID, OTHER_USER_ID], CUTOFF - timedelta(days=1))
+    assert is_orphan_agent(agent, set(), CUTOFF)
+
+
+def test_agent_with_an_existing_participant_is_kept() -> None:
+    agent = _agent(["users-chat", USER_ID, OTHER_USER_ID], CUTOFF - timedelta(days=1))
+    assert not is_orphan_agent(agent, {OTHER_USER_ID}, CUTOFF)
+
+
+def test_agent_within_grace_period_is_kept() -> None:
+    agent = _agent(["yenta-chat", USER_ID], CUTOFF + timedelta(minutes=1))
+    assert not is_orphan_agent(agent, set(), CUTOFF)
+
+
+def test_aware_created_at_is_compared_in_utc() -> None:
+    created_at = datetime(2025, 6, 1, 1, tzinfo=timezone(timedelta(hours=2)))
+    agent = _agent(["yenta-chat", USER_ID], created_at)
+    assert is_orphan_agent(agent, set(), CUTOFF)
+
+
+def test_agent_not_created_by_backend_is_kept() -> None:
+    agent = _agent(["some-other-app"], CUTOFF - timedelta(days=1))
+    assert not is_orphan_agent(agent, set(), CUTOFF)
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from app.features.letta_logic.letta_history import in_window, parse_hours
+
+
+def test_parse_hours() -> None:
+    assert parse_hours("1-6") == (1, 6)
+
+
+def test_in_window() -> None:
+    assert in_window((1, 6), datetime(2025, 6, 1, 1))
+    assert in_window((1, 6), datetime(2025, 6, 1, 5, 59))
+    assert not in_window((1, 6), datetime(2025, 6, 1, 6))
+
+
+def test_in_window_wraps_around_midnight() -> None:
+    assert in_window((22, 4), datetime(2025, 6, 1, 23))
+    assert in_window((22, 4), datetime(2025, 6, 1, 3))
+    assert not in_window((22, 4), datetime(2025, 6, 1, 12))
@@ -0,0 +1,213 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from letta_client.types import AgentState, Block
+
+from app.core import notifications
+from app.features.core.pagination import encode_cursor
+from app.features.letta_logic import letta_logic
+from app.features.letta_logic.letta_models import AgentSummary
+
+AGENT_ID = "agent-1"
+USER_ID = "0f8fad5b-d9cb-469f-a165-70867728950e"
+OTHER_USER_ID = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+
+
+@pytest.fixture
+def letta_agent(monkeypatch: pytest.MonkeyPatch) -> AgentState:
+    agent = AgentState.model_construct(
+        id="letta-agent-1", name="chat", tags=["users-chat", OTHER_USER_ID]
+    )
+
+    async def call_on_resource(_resource_id, _call, _name):
+        return agent
+
+    async def notify(channel: str, payload: str) -> None:
+        notifications._on_notification(None, 0, channel, payload)
+
+    monkeypatch.setattr(letta_logic, "_call_on_resource", call_on_resource)
+    monkeypatch.setattr(notifications, "notify", notify)
+    monkeypatch.setattr(letta_logic, "_agent_summaries", {})
+    return agent
+
+
+def _cache_summary(tags: list[str]) -> None:
+    summary = AgentSummary(id=AGENT_ID, name="chat", tags=tags)
+    expiry = time.monotonic() + letta_logic.AGENT_SUMMARY_TTL_SECONDS
+    letta_logic._agent_summaries[AGENT_ID] = (expiry, summary)
+
+
+@pytest.mark.usefixtures("letta_agent")
+def test_tag_change_invalidates_cached_summary() -> None:
+    _cache_summary(["users-chat", USER_ID, OTHER_USER_ID])
+
+    asyncio.run(letta_logic.update_agent_tags(AGENT_ID, ["users-chat", OTHER_USER_ID]))
+
+    summary = asyncio.run(letta_logic.get_agent_summary(AGENT_ID))
+    assert USER_ID not in summary.tags
+
+
+@pytest.mark.usefixtures("letta_agent")
+def test_notification_from_another_worker_invalidates_cached_summary() -> None:
+    _cache_summary(["users-chat", USER_ID, OTHER_USER_ID])
+
+    notifications._on_notification(None, 0, letta_logic.AGENT_SUMMARY_CHANNEL, AGENT_ID)
+
+    assert AGENT_ID not in letta_logic._agent_summaries
+    summary = asyncio.run(letta_logic.get_agent_summary(AGENT_ID))
+    assert USER_ID not in summary.tags
+
+
+@pytest.mark.usefixtures("letta_agent")
+def test_missed_notification_is_stale_until_expiry(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _cache_summary(["users-chat", USER_ID, OTHER_USER_ID])
+
+    summary = asyncio.run(letta_logic.get_agent_summary(AGENT_ID))
+    assert USER_ID in summary.tags
+
+    expired_at = time.monotonic() + letta_logic.AGENT_SUMMARY_TTL_SECONDS + 1
+    monkeypatch.setattr(letta_logic.time, "monotonic", lambda: expired_at)
+    summary = asyncio.run(letta_logic.get_agent_summary(AGENT_ID))
+    assert USER_ID not in summary.tags
+
+
+def test_agents_cursor_round_trips() -> None:
+    positions = {"http://letta-0:8283": "agent-1", "http://letta-1:8283": None}
+    assert letta_logic.decode_agents_cursor(encode_cursor(positions)) == positions
+
+
+@pytest.mark.parametrize(
+    "cursor", ["not-base64!", encode_cursor(["agent-1"]), encode_cursor({"s": 1})]
+)
+def test_malformed_agents_cursor_is_rejected(cursor: str) -> None:
+    with pytest.raises(ValueError):
+        letta_logic.decode_agents_cursor(cursor)
+
+
+def test_agents_without_created_at_sort_last() -> None:
+    created_at = datetime(2025, 6, 1, tzinfo=timezone(timedelta(hours=2)))
+    agents = [
+        AgentState.model_construct(id="no-date", created_at=None),
+        AgentState.model_construct(id="naive", created_at=datetime(2025, 6, 2)),
+        AgentState.model_construct(id="aware", created_at=created_at),
+    ]
+    ordered = sorted(agents, key=letta_logic._created_at_key, reverse=True)
+    assert [agent.id for agent in ordered] == ["naive", "aware", "no-date"]
+
+
+def test_failed_prepared_attach_falls_back_to_inline(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def attach(_shard, _letta_agent_id, _current_user_id, mentioned_ids):
+        return [f"interactions-{user_id}" for user_id in mentioned_ids]
+
+    async def attach_after_failed_prepare() -> list[str]:
+        prepared = asyncio.get_running_loop().create_future()
+        prepared.set_exception(RuntimeError("Letta unavailable"))
+        return await letta_logic._attach_after_prepared(
+            prepared, "http://letta-0:8283", "letta-agent-1", USER_ID, [OTHER_USER_ID]
+        )
+
+    monkeypatch.setattr(letta_logic, "_attach_interactions_blocks", attach)
+    block_ids = asyncio.run(attach_after_failed_prepare())
+    assert block_ids == [f"interactions-{OTHER_USER_ID}"]
+
+
+@pytest.fixture
+def attaches(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    attached: list[list[str]] = []
+
+    async def resolve(_agent_id):
+        await asyncio.sleep(0)
+        return "http://letta-0:8283", "letta-agent-1"
+
+    async def attach(_shard, _letta_agent_id, _current_user_id, mentioned_ids):
+        attached.append(mentioned_ids)
+        return [f"interactions-{user_id}" for user_id in mentioned_ids]
+
+    monkeypatch.setattr(letta_logic, "resolve", resolve)
+    monkeypatch.setattr(letta_logic, "_attach_interactions_blocks", attach)
+    monkeypatch.setattr(letta_logic, "_prepared", {})
+    monkeypatch.setattr(letta_logic, "_prepared_per_user", letta_logic.Counter())
+    return attached
+
+
+def test_concurrent_prepares_share_one_attach(attaches: list[list[str]]) -> None:
+    async def prepare_twice() -> None:
+        await asyncio.gather(
+            *[
+                letta_logic.prepare_message_to_yenta(
+                    USER_ID, AGENT_ID, [OTHER_USER_ID], ttl_seconds=30, max_per_user=5
+                )
+                for _ in range(2)
+            ]
+        )
+        (preparing, _), *_ = letta_logic._prepared.values()
+        await preparing
+
+    asyncio.run(prepare_twice())
+    assert attaches == [[OTHER_USER_ID]]
+    assert letta_logic._prepared_per_user[USER_ID] == 1
+
+
+def test_prepares_past_the_per_user_cap_are_ignored(
+    attaches: list[list[str]],
+) -> None:
+    async def prepare_each() -> None:
+        for user_id in [OTHER_USER_ID, "a", "b"]:
+            await letta_logic.prepare_message_to_yenta(
+                USER_ID, AGENT_ID, [user_id], ttl_seconds=30, max_per_user=2
+            )
+        await asyncio.gather(
+            *[preparing for preparing, _ in letta_logic._prepared.values()]
+        )
+        key = letta_logic._prepared_key(AGENT_ID, USER_ID, [OTHER_USER_ID])
+        assert letta_logic._pop_prepared(key)
+
+    asyncio.run(prepare_each())
+    assert attaches == [[OTHER_USER_ID], ["a"]]
+    assert letta_logic._prepared_per_user[USER_ID] == 1
+
+
+def test_replica_losing_a_concurrent_create_is_deleted(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    block = Block.model_construct(
+        id="letta-block-1", value="notes", label="interactions", limit=5000
+    )
+    created: list[dict] = []
+    deleted: list[str] = []
+
+    class Blocks:
+        async def create(self, **kwargs):
+            created.append(kwargs)
+            return Block.model_construct(id="replica-2", **kwargs)
+
+    class Client:
+        blocks = Blocks()
+
+    async def get_block_replica(_source_block_id, _shard):
+        return None
+
+    async def record_block_replica(source_block_id, _shard, _replica_block_id):
+        assert source_block_id == "block-1"
+        return "replica-1"
+
+    async def delete_replica_block(_shard, replica_block_id):
+        deleted.append(replica_block_id)
+
+    monkeypatch.setattr(letta_logic, "get_letta_client", lambda _shard: Client())
+    monkeypatch.setattr(letta_logic, "get_block_replica", get_block_replica)
+    monkeypatch.setattr(letta_logic, "record_block_replica", record_block_replica)
+    monkeypatch.setattr(letta_logic, "_delete_replica_block", delete_replica_block)
+
+    replica_block_id = asyncio.run(
+        letta_logic._get_replica_block_id("block-1", block, "http://letta-1:8283")
+    )
+    assert replica_block_id == "replica-1"
+    assert deleted == ["replica-2"]
+    assert created[0]["limit"] == 5000
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from app.features.letta_logic import letta_shards
+from app.features.letta_logic.letta_shards import HashRing
+
+
+def test_hash_ring_is_deterministic() -> None:
+    ring = HashRing(["http://letta-0:8283", "http://letta-1:8283"])
+    other_ring = HashRing(["http://letta-0:8283", "http://letta-1:8283"])
+    keys = [f"user-{i}" for i in range(100)]
+    assert [ring.get_node(k) for k in keys] == [other_ring.get_node(k) for k in keys]
+
+
+def test_hash_ring_spreads_keys() -> None:
+    nodes = ["http://letta-0:8283", "http://letta-1:8283", "http://letta-2:8283"]
+    ring = HashRing(nodes)
+    placed = [ring.get_node(f"user-{i}") for i in range(3000)]
+    for node in nodes:
+        assert placed.count(node) > 700
+
+
+def test_hash_ring_only_moves_keys_to_new_node() -> None:
+    nodes = ["http://letta-0:8283", "http://letta-1:8283", "http://letta-2:8283"]
+    ring = HashRing(nodes)
+    grown_ring = HashRing(nodes + ["http://letta-3:8283"])
+    for i in range(3000):
+        before, after = ring.get_node(f"user-{i}"), grown_ring.get_node(f"user-{i}")
+        assert before == after or after == "http://letta-3:8283"
+
+
+def test_placement_cache_drops_least_recently_used(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(letta_shards, "_placements", {})
+    monkeypatch.setattr(letta_shards, "PLACEMENT_CACHE_SIZE", 2)
+    shard = "http://letta-1:8283"
+    letta_shards._cache_placement("block-1", (shard, "block-1"))
+    letta_shards._cache_placement("block-2", (shard, "block-2"))
+
+    # A cache hit doesn't touch the database and marks block-1 as used
+    assert asyncio.run(letta_shards.resolve("block-1")) == (shard, "block-1")
+    letta_shards._cache_placement("block-3", (shard, "block-3"))
+
+    assert list(letta_shards._placements) == ["block-1", "block-3"]
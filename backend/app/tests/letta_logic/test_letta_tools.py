@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from letta_client.types import Tool
+
+from app.features.letta_logic import letta_tools
+
+SHARD = "http://letta-0:8283"
+
+
+@pytest.fixture
+def upserted(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    upserted: list[str] = []
+    current_hash = letta_tools.get_source_hash(
+        letta_tools.get_tool_source("summarize_interaction")
+    )
+    existing = [
+        Tool.model_construct(
+            id="tool-current",
+            name="summarize_interaction",
+            tags=[f"{letta_tools.SOURCE_HASH_TAG_PREFIX}{current_hash}"],
+        ),
+        Tool.model_construct(
+            id="tool-stale",
+            name="get_user_profile",
+            tags=[f"{letta_tools.SOURCE_HASH_TAG_PREFIX}outdated"],
+        ),
+    ]
+
+    class Tools:
+        async def list(self, names):
+            return [tool for tool in existing if tool.name in names]
+
+        async def upsert(self, source_code, tags):
+            upserted.append(source_code)
+            return Tool.model_construct(id="tool-upserted", tags=tags)
+
+    class Client:
+        tools = Tools()
+
+    monkeypatch.setattr(letta_tools, "get_letta_client", lambda _shard: Client())
+    monkeypatch.setattr(letta_tools, "_tool_ids", {})
+    return upserted
+
+
+def test_only_outdated_tools_are_upserted(upserted: list[str]) -> None:
+    asyncio.run(letta_tools.sync_tools_on_shard(SHARD))
+    assert upserted == [letta_tools.get_tool_source("get_user_profile")]
+    assert letta_tools.get_tool_ids(
+        SHARD, ["summarize_interaction", "get_user_profile"]
+    ) == ["tool-current", "tool-upserted"]
+
+
+@pytest.mark.usefixtures("upserted")
+def test_tool_ids_of_unsynced_shard_are_unknown() -> None:
+    assert letta_tools.get_tool_ids(SHARD, ["summarize_interaction"]) is None
+    asyncio.run(letta_tools.sync_tools_on_shard(SHARD))
+    assert letta_tools.get_tool_ids("http://letta-1:8283", ["get_user_profile"]) is None
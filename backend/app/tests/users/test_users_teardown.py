@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from letta_client.types import AgentState
+
+from app.features.users import users_teardown
+
+USER_ID = "0f8fad5b-d9cb-469f-a165-70867728950e"
+OTHER_USER_ID = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+
+
+@pytest.fixture
+def deleted(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    deleted: list[str] = []
+
+    async def get_agent_block_ids(agent_id: str, label: str) -> list[str]:
+        return [f"{label}-of-{agent_id}"]
+
+    async def delete(resource_id: str) -> None:
+        deleted.append(resource_id)
+
+    async def update_agent_tags(agent_id: str, _tags: list[str]) -> None:
+        deleted.append(f"tags-of-{agent_id}")
+
+    monkeypatch.setattr(users_teardown, "get_agent_block_ids", get_agent_block_ids)
+    monkeypatch.setattr(users_teardown, "delete_agent", delete)
+    monkeypatch.setattr(users_teardown, "delete_block", delete)
+    monkeypatch.setattr(users_teardown, "update_agent_tags", update_agent_tags)
+    return deleted
+
+
+def test_last_participant_deletes_chat_and_interactions_block(
+    deleted: list[str],
+) -> None:
+    agent = AgentState.model_construct(id="agent-1", tags=["users-chat", USER_ID])
+    asyncio.run(users_teardown._teardown_agent(agent, USER_ID))
+    assert deleted == ["agent-1", "interactions-of-agent-1"]
+
+
+def test_remaining_participants_keep_chat(deleted: list[str]) -> None:
+    agent = AgentState.model_construct(
+        id="agent-1", tags=["users-chat", USER_ID, OTHER_USER_ID]
+    )
+    asyncio.run(users_teardown._teardown_agent(agent, USER_ID))
+    assert deleted == ["tags-of-agent-1"]
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from app.core import metrics
+from app.features.users_chat import user_chat_events
+from app.features.users_chat.user_chat_events import subscribe
+
+USER_ID = "0f8fad5b-d9cb-469f-a165-70867728950e"
+OTHER_USER_ID = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+
+
+def test_event_reaches_every_socket_of_the_participants() -> None:
+    with (
+        subscribe(USER_ID) as first,
+        subscribe(USER_ID) as second,
+        subscribe(OTHER_USER_ID) as other,
+    ):
+        user_chat_events._deliver([USER_ID], "event")
+        assert [q.qsize() for q in (first, second, other)] == [1, 1, 0]
+    assert USER_ID not in user_chat_events._subscribers
+
+
+def test_full_socket_queue_drops_only_its_event(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    dropped: list[str] = []
+    monkeypatch.setattr(
+        metrics, "increment", lambda name, value=1: dropped.append(name)
+    )
+    monkeypatch.setattr(user_chat_events, "SOCKET_QUEUE_SIZE", 1)
+
+    with subscribe(USER_ID) as slow, subscribe(OTHER_USER_ID) as other:
+        user_chat_events._deliver([USER_ID], "first")
+        user_chat_events._deliver([USER_ID, OTHER_USER_ID], "second")
+        assert slow.get_nowait() == "first"
+        assert other.get_nowait() == "second"
+    assert dropped == ["users_chat_events.dropped"]
+
+
+def test_own_notifications_are_not_delivered_twice() -> None:
+    with subscribe(USER_ID) as queue:
+        for worker_id in [user_chat_events.WORKER_ID, "other-worker"]:
+            user_chat_events._on_notification(
+                json.dumps(
+                    {
+                        "worker_id": worker_id,
+                        "participant_ids": [USER_ID],
+                        "event": worker_id,
+                    }
+                )
+            )
+        assert queue.qsize() == 1
+        assert queue.get_nowait() == "other-worker"
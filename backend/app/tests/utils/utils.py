@@ -1,9 +1,13 @@
 import random
 import string
+from collections.abc import Generator
+from contextlib import contextmanager
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
 from app.core.config import settings
+from app.core.db import engine
 
 
 def random_lower_string() -> str:
@@ -24,3 +28,20 @@ def get_superuser_token_headers(client: TestClient) -> dict[str, str]:
     a_token = tokens["access_token"]
     headers = {"Authorization": f"Bearer {a_token}"}
     return headers
+
+
+@contextmanager
+def count_queries() -> Generator[list[str], None, None]:
+    """
+    Collect the SQL statements sent while the block runs.
+    """
+    statements: list[str] = []
+
+    def before_cursor_execute(_conn, _cursor, statement: str, *_args) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
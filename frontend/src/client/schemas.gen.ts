@@ -461,12 +461,30 @@ export const UsersPublicSchema = {
       title: "Data",
     },
     count: {
-      type: "integer",
+      anyOf: [
+        {
+          type: "integer",
+        },
+        {
+          type: "null",
+        },
+      ],
       title: "Count",
     },
+    next_cursor: {
+      anyOf: [
+        {
+          type: "string",
+        },
+        {
+          type: "null",
+        },
+      ],
+      title: "Next Cursor",
+    },
   },
   type: "object",
-  required: ["data", "count"],
+  required: ["data"],
   title: "UsersPublic",
 } as const
 
@@ -3,7 +3,7 @@
 import type { CancelablePromise } from './core/CancelablePromise';
 import { OpenAPI } from './core/OpenAPI';
 import { request as __request } from './core/request';
-import type { ConnectionsCreateConnectionData, ConnectionsCreateConnectionResponse, ConnectionsReadConnectionsData, ConnectionsReadConnectionsResponse, ConnectionsReadConnectionData, ConnectionsReadConnectionResponse, ConnectionsUpdateConnectionData, ConnectionsUpdateConnectionResponse, ConnectionsDeleteConnectionData, ConnectionsDeleteConnectionResponse, LoginLoginAccessTokenData, LoginLoginAccessTokenResponse, LoginTestTokenResponse, LoginRecoverPasswordData, LoginRecoverPasswordResponse, LoginResetPasswordData, LoginResetPasswordResponse, LoginRecoverPasswordHtmlContentData, LoginRecoverPasswordHtmlContentResponse, UsersReadUsersData, UsersReadUsersResponse, UsersCreateUserData, UsersCreateUserResponse, UsersReadUserMeResponse, UsersDeleteUserMeResponse, UsersUpdateUserMeData, UsersUpdateUserMeResponse, UsersRegisterUserData, UsersRegisterUserResponse, UsersReadUserByIdData, UsersReadUserByIdResponse, UsersUpdateUserData, UsersUpdateUserResponse, UsersDeleteUserData, UsersDeleteUserResponse, UsersCreatePrivateUserData, UsersCreatePrivateUserResponse, UsersChatGetChatsResponse, UsersChatCreateChatData, UsersChatCreateChatResponse, UsersChatChatWithMemoryData, UsersChatChatWithMemoryResponse, UsersChatGetChatHistoryData, UsersChatGetChatHistoryResponse, UtilsHealthCheckResponse, YentaChatGetChatsResponse, YentaChatCreateChatResponse, YentaChatChatWithMemoryData, YentaChatChatWithMemoryResponse, YentaChatGetChatHistoryData, YentaChatGetChatHistoryResponse } from './types.gen';
+import type { ConnectionsCreateConnectionData, ConnectionsCreateConnectionResponse, ConnectionsReadConnectionsData, ConnectionsReadConnectionsResponse, ConnectionsReadConnectionData, ConnectionsReadConnectionResponse, ConnectionsUpdateConnectionData, ConnectionsUpdateConnectionResponse, ConnectionsDeleteConnectionData, ConnectionsDeleteConnectionResponse, LoginLoginAccessTokenData, LoginLoginAccessTokenResponse, LoginTestTokenResponse, LoginRecoverPasswordData, LoginRecoverPasswordResponse, LoginResetPasswordData, LoginResetPasswordResponse, LoginRecoverPasswordHtmlContentData, LoginRecoverPasswordHtmlContentResponse, UsersReadUsersData, UsersReadUsersResponse, UsersCreateUserData, UsersCreateUserResponse, UsersReadUserMeResponse, UsersDeleteUserMeResponse, UsersUpdateUserMeData, UsersUpdateUserMeResponse, UsersRegisterUserData, UsersRegisterUserResponse, UsersReadUserByIdData, UsersReadUserByIdResponse, UsersUpdateUserData, UsersUpdateUserResponse, UsersDeleteUserData, UsersDeleteUserResponse, UsersReadTeardownJobData, UsersReadTeardownJobResponse, UsersCreatePrivateUserData, UsersCreatePrivateUserResponse, UsersChatGetChatsData, UsersChatGetChatsResponse, UsersChatCreateChatData, UsersChatCreateChatResponse, UsersChatChatWithMemoryData, UsersChatChatWithMemoryResponse, UsersChatGetChatHistoryData, UsersChatGetChatHistoryResponse, UtilsHealthCheckResponse, YentaChatGetChatsData, YentaChatGetChatsResponse, YentaChatCreateChatData, YentaChatCreateChatResponse, YentaChatChatWithMemoryData, YentaChatChatWithMemoryResponse, YentaChatGetChatHistoryData, YentaChatGetChatHistoryResponse, YentaChatPrepareChatMessageData, YentaChatPrepareChatMessageResponse, YentaChatGetUserProfileBlockData, YentaChatGetUserProfileBlockResponse } from './types.gen';
 
 export class ConnectionsService {
     /**
@@ -28,11 +28,13 @@ export class ConnectionsService {
     
     /**
      * Read Connections
-     * Retrieve connections.
+     * Retrieve connections, most recently updated first.
      * @param data The data for the request.
      * @param data.status
-     * @param data.skip
+     * @param data.direction
+     * @param data.cursor
      * @param data.limit
+     * @param data.includeCount
      * @returns ConnectionsPublic Successful Response
      * @throws ApiError
      */
@@ -42,8 +44,10 @@ export class ConnectionsService {
             url: '/api/v1/connections/',
             query: {
                 status: data.status,
-                skip: data.skip,
-                limit: data.limit
+                direction: data.direction,
+                cursor: data.cursor,
+                limit: data.limit,
+                include_count: data.includeCount
             },
             errors: {
                 422: 'Validation Error'
@@ -220,10 +224,13 @@ export class LoginService {
 export class UsersService {
     /**
      * Read Users
-     * Retrieve users.
+     * Retrieve users, ordered by email.
      * @param data The data for the request.
-     * @param data.skip
+     * @param data.isActive
+     * @param data.isSuperuser
+     * @param data.cursor
      * @param data.limit
+     * @param data.count
      * @returns UsersPublic Successful Response
      * @throws ApiError
      */
@@ -232,8 +239,11 @@ export class UsersService {
             method: 'GET',
             url: '/api/v1/users/',
             query: {
-                skip: data.skip,
-                limit: data.limit
+                is_active: data.isActive,
+                is_superuser: data.isSuperuser,
+                cursor: data.cursor,
+                limit: data.limit,
+                count: data.count
             },
             errors: {
                 422: 'Validation Error'
@@ -277,7 +287,7 @@ export class UsersService {
     /**
      * Delete User Me
      * Delete own user.
-     * @returns Message Successful Response
+     * @returns UserDeleted Successful Response
      * @throws ApiError
      */
     public static deleteUserMe(): CancelablePromise<UsersDeleteUserMeResponse> {
@@ -377,7 +387,7 @@ export class UsersService {
      * Delete a user.
      * @param data The data for the request.
      * @param data.userId
-     * @returns Message Successful Response
+     * @returns UserDeleted Successful Response
      * @throws ApiError
      */
     public static deleteUser(data: UsersDeleteUserData): CancelablePromise<UsersDeleteUserResponse> {
@@ -393,6 +403,27 @@ export class UsersService {
         });
     }
     
+    /**
+     * Read Teardown Job
+     * Get the progress of a deleted user's Letta teardown.
+     * @param data The data for the request.
+     * @param data.jobId
+     * @returns UserTeardownJobPublic Successful Response
+     * @throws ApiError
+     */
+    public static readTeardownJob(data: UsersReadTeardownJobData): CancelablePromise<UsersReadTeardownJobResponse> {
+        return __request(OpenAPI, {
+            method: 'GET',
+            url: '/api/v1/users/teardown-jobs/{job_id}',
+            path: {
+                job_id: data.jobId
+            },
+            errors: {
+                422: 'Validation Error'
+            }
+        });
+    }
+    
     /**
      * Create Private User
      * Create a user for private use.
@@ -418,19 +449,34 @@ export class UsersService {
 export class UsersChatService {
     /**
      * Get Chats
+     * @param data The data for the request.
+     * @param data.limit
+     * @param data.after
+     * @param data.xRequestTimeout
      * @returns UsersChatsResponse Successful Response
      * @throws ApiError
      */
-    public static getChats(): CancelablePromise<UsersChatGetChatsResponse> {
+    public static getChats(data: UsersChatGetChatsData = {}): CancelablePromise<UsersChatGetChatsResponse> {
         return __request(OpenAPI, {
             method: 'GET',
-            url: '/api/v1/users-chat'
+            url: '/api/v1/users-chat',
+            headers: {
+                'X-Request-Timeout': data.xRequestTimeout
+            },
+            query: {
+                limit: data.limit,
+                after: data.after
+            },
+            errors: {
+                422: 'Validation Error'
+            }
         });
     }
     
     /**
      * Create Chat
      * @param data The data for the request.
+     * @param data.xRequestTimeout
      * @param data.requestBody
      * @returns UsersChatCreationResponse Successful Response
      * @throws ApiError
@@ -439,6 +485,9 @@ export class UsersChatService {
         return __request(OpenAPI, {
             method: 'POST',
             url: '/api/v1/users-chat',
+            headers: {
+                'X-Request-Timeout': data.xRequestTimeout
+            },
             body: data.requestBody,
             mediaType: 'application/json',
             errors: {
@@ -451,6 +500,8 @@ export class UsersChatService {
      * Chat With Memory
      * @param data The data for the request.
      * @param data.chatConversationId
+     * @param data.idempotencyKey
+     * @param data.xRequestTimeout
      * @param data.requestBody
      * @returns UsersMessageResponse Successful Response
      * @throws ApiError
@@ -462,6 +513,10 @@ export class UsersChatService {
             path: {
                 chat_conversation_id: data.chatConversationId
             },
+            headers: {
+                'Idempotency-Key': data.idempotencyKey,
+                'X-Request-Timeout': data.xRequestTimeout
+            },
             body: data.requestBody,
             mediaType: 'application/json',
             errors: {
@@ -476,6 +531,7 @@ export class UsersChatService {
      * @param data.chatConversationId
      * @param data.limit
      * @param data.lastMessageId
+     * @param data.xRequestTimeout
      * @returns UsersChatHistoryResponse Successful Response
      * @throws ApiError
      */
@@ -486,6 +542,9 @@ export class UsersChatService {
             path: {
                 chat_conversation_id: data.chatConversationId
             },
+            headers: {
+                'X-Request-Timeout': data.xRequestTimeout
+            },
             query: {
                 limit: data.limit,
                 last_message_id: data.lastMessageId
@@ -516,25 +575,47 @@ export class UtilsService {
 export class YentaChatService {
     /**
      * Get Chats
+     * @param data The data for the request.
+     * @param data.limit
+     * @param data.after
+     * @param data.xRequestTimeout
      * @returns YentaChatsResponse Successful Response
      * @throws ApiError
      */
-    public static getChats(): CancelablePromise<YentaChatGetChatsResponse> {
+    public static getChats(data: YentaChatGetChatsData = {}): CancelablePromise<YentaChatGetChatsResponse> {
         return __request(OpenAPI, {
             method: 'GET',
-            url: '/api/v1/yenta-chat'
+            url: '/api/v1/yenta-chat',
+            headers: {
+                'X-Request-Timeout': data.xRequestTimeout
+            },
+            query: {
+                limit: data.limit,
+                after: data.after
+            },
+            errors: {
+                422: 'Validation Error'
+            }
         });
     }
     
     /**
      * Create Chat
+     * @param data The data for the request.
+     * @param data.xRequestTimeout
      * @returns YentaChatCreationResponse Successful Response
      * @throws ApiError
      */
-    public static createChat(): CancelablePromise<YentaChatCreateChatResponse> {
+    public static createChat(data: YentaChatCreateChatData = {}): CancelablePromise<YentaChatCreateChatResponse> {
         return __request(OpenAPI, {
             method: 'POST',
-            url: '/api/v1/yenta-chat'
+            url: '/api/v1/yenta-chat',
+            headers: {
+                'X-Request-Timeout': data.xRequestTimeout
+            },
+            errors: {
+                422: 'Validation Error'
+            }
         });
     }
     
@@ -542,6 +623,8 @@ export class YentaChatService {
      * Chat With Memory
      * @param data The data for the request.
      * @param data.chatConversationId
+     * @param data.idempotencyKey
+     * @param data.xRequestTimeout
      * @param data.requestBody
      * @returns YentaMessageResponse Successful Response
      * @throws ApiError
@@ -553,6 +636,10 @@ export class YentaChatService {
             path: {
                 chat_conversation_id: data.chatConversationId
             },
+            headers: {
+                'Idempotency-Key': data.idempotencyKey,
+                'X-Request-Timeout': data.xRequestTimeout
+            },
             body: data.requestBody,
             mediaType: 'application/json',
             errors: {
@@ -567,6 +654,7 @@ export class YentaChatService {
      * @param data.chatConversationId
      * @param data.limit
      * @param data.lastMessageId
+     * @param data.xRequestTimeout
      * @returns YentaChatHistoryResponse Successful Response
      * @throws ApiError
      */
@@ -577,6 +665,9 @@ export class YentaChatService {
             path: {
                 chat_conversation_id: data.chatConversationId
             },
+            headers: {
+                'X-Request-Timeout': data.xRequestTimeout
+            },
             query: {
                 limit: data.limit,
                 last_message_id: data.lastMessageId
@@ -587,4 +678,57 @@ export class YentaChatService {
         });
     }
     
-}
\ No newline at end of file
+    /**
+     * Prepare Chat Message
+     * Get a send mentioning these users ready while the message is being typed
+     * @param data The data for the request.
+     * @param data.chatConversationId
+     * @param data.xRequestTimeout
+     * @param data.requestBody
+     * @returns Message Successful Response
+     * @throws ApiError
+     */
+    public static prepareChatMessage(data: YentaChatPrepareChatMessageData): CancelablePromise<YentaChatPrepareChatMessageResponse> {
+        return __request(OpenAPI, {
+            method: 'POST',
+            url: '/api/v1/yenta-chat/{chat_conversation_id}/prepare',
+            path: {
+                chat_conversation_id: data.chatConversationId
+            },
+            headers: {
+                'X-Request-Timeout': data.xRequestTimeout
+            },
+            body: data.requestBody,
+            mediaType: 'application/json',
+            errors: {
+                422: 'Validation Error'
+            }
+        });
+    }
+    
+    /**
+     * Get User Profile Block
+     * Get a user's profile block value
+     * @param data The data for the request.
+     * @param data.userId
+     * @param data.xRequestTimeout
+     * @returns unknown Successful Response
+     * @throws ApiError
+     */
+    public static getUserProfileBlock(data: YentaChatGetUserProfileBlockData): CancelablePromise<YentaChatGetUserProfileBlockResponse> {
+        return __request(OpenAPI, {
+            method: 'GET',
+            url: '/api/v1/yenta-chat/profile-block/{user_id}',
+            path: {
+                user_id: data.userId
+            },
+            headers: {
+                'X-Request-Timeout': data.xRequestTimeout
+            },
+            errors: {
+                422: 'Validation Error'
+            }
+        });
+    }
+    
+}
@@ -14,6 +14,8 @@ export type ConnectionCreate = {
     target_user_id: string;
 };
 
+export type ConnectionDirection = 'incoming' | 'outgoing';
+
 export type ConnectionPublic = {
     status?: ConnectionStatus;
     id: string;
@@ -25,7 +27,8 @@ export type ConnectionPublic = {
 
 export type ConnectionsPublic = {
     data: Array<ConnectionPublic>;
-    count: number;
+    count?: (number | null);
+    next_cursor?: (string | null);
 };
 
 export type ConnectionStatus = 'pending' | 'accepted' | 'rejected';
@@ -54,6 +57,8 @@ export type PrivateUserCreate = {
     is_verified?: boolean;
 };
 
+export type TeardownJobStatus = 'pending' | 'running' | 'completed' | 'failed';
+
 export type Token = {
     access_token: string;
     token_type: string;
@@ -67,6 +72,11 @@ export type UserCreate = {
     password: string;
 };
 
+export type UserDeleted = {
+    message: string;
+    teardown_job_id: string;
+};
+
 export type UserPublic = {
     email: string;
     full_name: string;
@@ -97,6 +107,9 @@ export type UsersChatInfo = {
     conversation_id: string;
     name: string;
     participant_ids: Array<(string)>;
+    last_message?: (string | null);
+    last_message_at?: (string | null);
+    unread_count?: number;
 };
 
 export type UsersChatMessage = {
@@ -107,6 +120,7 @@ export type UsersChatMessage = {
 
 export type UsersChatsResponse = {
     chats_info: Array<UsersChatInfo>;
+    next_cursor?: (string | null);
 };
 
 export type UsersMessageRequest = {
@@ -119,7 +133,19 @@ export type UsersMessageResponse = {
 
 export type UsersPublic = {
     data: Array<UserPublic>;
-    count: number;
+    count?: (number | null);
+    next_cursor?: (string | null);
+};
+
+export type UserTeardownJobPublic = {
+    id: string;
+    user_id: string;
+    status: TeardownJobStatus;
+    total: number;
+    completed: number;
+    failed: number;
+    created_at: string;
+    updated_at: string;
 };
 
 export type UserUpdate = {
@@ -152,6 +178,9 @@ export type YentaChatHistoryResponse = {
 export type YentaChatInfo = {
     conversation_id: string;
     name: string;
+    last_message?: (string | null);
+    last_message_at?: (string | null);
+    unread_count?: number;
 };
 
 export type YentaChatMessage = {
@@ -164,6 +193,7 @@ export type role = 'user' | 'yenta';
 
 export type YentaChatsResponse = {
     chats_info: Array<YentaChatInfo>;
+    next_cursor?: (string | null);
 };
 
 export type YentaMessageRequest = {
@@ -174,6 +204,10 @@ export type YentaMessageResponse = {
     messages: Array<YentaChatMessage>;
 };
 
+export type YentaPrepareRequest = {
+    mentioned_user_ids: Array<(string)>;
+};
+
 export type ConnectionsCreateConnectionData = {
     requestBody: ConnectionCreate;
 };
@@ -181,8 +215,10 @@ export type ConnectionsCreateConnectionData = {
 export type ConnectionsCreateConnectionResponse = (ConnectionPublic);
 
 export type ConnectionsReadConnectionsData = {
+    cursor?: (string | null);
+    direction?: (ConnectionDirection | null);
+    includeCount?: boolean;
     limit?: number;
-    skip?: number;
     status?: (ConnectionStatus | null);
 };
 
@@ -234,8 +270,11 @@ export type LoginRecoverPasswordHtmlContentData = {
 export type LoginRecoverPasswordHtmlContentResponse = (string);
 
 export type UsersReadUsersData = {
+    count?: 'exact' | 'estimated' | 'none';
+    cursor?: (string | null);
+    isActive?: (boolean | null);
+    isSuperuser?: (boolean | null);
     limit?: number;
-    skip?: number;
 };
 
 export type UsersReadUsersResponse = (UsersPublic);
@@ -248,7 +287,7 @@ export type UsersCreateUserResponse = (UserPublic);
 
 export type UsersReadUserMeResponse = (UserPublic);
 
-export type UsersDeleteUserMeResponse = (Message);
+export type UsersDeleteUserMeResponse = (UserDeleted);
 
 export type UsersUpdateUserMeData = {
     requestBody: UserUpdateMe;
@@ -279,7 +318,13 @@ export type UsersDeleteUserData = {
     userId: string;
 };
 
-export type UsersDeleteUserResponse = (Message);
+export type UsersDeleteUserResponse = (UserDeleted);
+
+export type UsersReadTeardownJobData = {
+    jobId: string;
+};
+
+export type UsersReadTeardownJobResponse = (UserTeardownJobPublic);
 
 export type UsersCreatePrivateUserData = {
     requestBody: PrivateUserCreate;
@@ -287,17 +332,26 @@ export type UsersCreatePrivateUserData = {
 
 export type UsersCreatePrivateUserResponse = (UserPublic);
 
+export type UsersChatGetChatsData = {
+    after?: (string | null);
+    limit?: number;
+    xRequestTimeout?: (number | null);
+};
+
 export type UsersChatGetChatsResponse = (UsersChatsResponse);
 
 export type UsersChatCreateChatData = {
     requestBody: UsersChatCreationRequest;
+    xRequestTimeout?: (number | null);
 };
 
 export type UsersChatCreateChatResponse = (UsersChatCreationResponse);
 
 export type UsersChatChatWithMemoryData = {
     chatConversationId: string;
+    idempotencyKey?: (string | null);
     requestBody: UsersMessageRequest;
+    xRequestTimeout?: (number | null);
 };
 
 export type UsersChatChatWithMemoryResponse = (UsersMessageResponse);
@@ -306,19 +360,32 @@ export type UsersChatGetChatHistoryData = {
     chatConversationId: string;
     lastMessageId?: (string | null);
     limit?: number;
+    xRequestTimeout?: (number | null);
 };
 
 export type UsersChatGetChatHistoryResponse = (UsersChatHistoryResponse);
 
 export type UtilsHealthCheckResponse = (boolean);
 
+export type YentaChatGetChatsData = {
+    after?: (string | null);
+    limit?: number;
+    xRequestTimeout?: (number | null);
+};
+
 export type YentaChatGetChatsResponse = (YentaChatsResponse);
 
+export type YentaChatCreateChatData = {
+    xRequestTimeout?: (number | null);
+};
+
 export type YentaChatCreateChatResponse = (YentaChatCreationResponse);
 
 export type YentaChatChatWithMemoryData = {
     chatConversationId: string;
+    idempotencyKey?: (string | null);
     requestBody: YentaMessageRequest;
+    xRequestTimeout?: (number | null);
 };
 
 export type YentaChatChatWithMemoryResponse = (YentaMessageResponse);
@@ -327,6 +394,24 @@ export type YentaChatGetChatHistoryData = {
     chatConversationId: string;
     lastMessageId?: (string | null);
     limit?: number;
+    xRequestTimeout?: (number | null);
+};
+
+export type YentaChatGetChatHistoryResponse = (YentaChatHistoryResponse);
+
+export type YentaChatPrepareChatMessageData = {
+    chatConversationId: string;
+    requestBody: YentaPrepareRequest;
+    xRequestTimeout?: (number | null);
+};
+
+export type YentaChatPrepareChatMessageResponse = (Message);
+
+export type YentaChatGetUserProfileBlockData = {
+    userId: string;
+    xRequestTimeout?: (number | null);
 };
 
-export type YentaChatGetChatHistoryResponse = (YentaChatHistoryResponse);
\ No newline at end of file
+export type YentaChatGetUserProfileBlockResponse = ({
+    [key: string]: unknown;
+});
\ No newline at end of file
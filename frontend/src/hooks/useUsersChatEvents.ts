@@ -0,0 +1,53 @@
+import { useEffect, useRef } from "react"
+
+import { OpenAPI } from "@/client"
+import type { UsersChatMessage } from "@/client/types.gen"
+
+// Not part of the OpenAPI schema, WebSocket messages aren't described there
+export type UsersChatEvent = {
+  conversation_id: string
+  message: UsersChatMessage | null
+}
+
+const RECONNECT_DELAY_MS = 5000
+
+const eventsUrl = () => {
+  const url = new URL("/api/v1/users-chat/ws", OpenAPI.BASE || window.location.origin)
+  url.protocol = url.protocol === "https:" ? "wss:" : "ws:"
+  url.searchParams.set("token", localStorage.getItem("access_token") || "")
+  return url.toString()
+}
+
+/**
+ * Calls onEvent with each new message of the current user's conversations,
+ * reconnecting whenever the socket closes.
+ */
+const useUsersChatEvents = (onEvent: (event: UsersChatEvent) => void) => {
+  const onEventRef = useRef(onEvent)
+  onEventRef.current = onEvent
+
+  useEffect(() => {
+    let socket: WebSocket | undefined
+    let reconnect: ReturnType<typeof setTimeout> | undefined
+    let closed = false
+
+    const connect = () => {
+      socket = new WebSocket(eventsUrl())
+      socket.onmessage = (message) => {
+        onEventRef.current(JSON.parse(message.data) as UsersChatEvent)
+      }
+      socket.onclose = () => {
+        if (!closed) reconnect = setTimeout(connect, RECONNECT_DELAY_MS)
+      }
+    }
+
+    connect()
+    return () => {
+      closed = true
+      clearTimeout(reconnect)
+      socket?.close()
+    }
+  }, [])
+}
+
+export default useUsersChatEvents
@@ -1,4 +1,4 @@
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query"
+import { useInfiniteQuery, useQuery, useMutation, useQueryClient } from "@tanstack/react-query"
 import { Box, VStack, Text, Button } from "@chakra-ui/react"
 import { YentaChatService } from "@/client"
 import { useMemo } from "react"
@@ -14,11 +14,22 @@ function ChatPage() {
   const queryClient = useQueryClient()
   const chatId = new URLSearchParams(window.location.search).get('chatId') ?? undefined;
 
-  // Get all chats for sidebar
-  const { data: chats } = useQuery({
+  // Get the chats for the sidebar, newest first, a page at a time
+  const {
+    data: chatPages,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ["chats"],
-    queryFn: YentaChatService.getChats,
+    queryFn: ({ pageParam }) => YentaChatService.getChats({ after: pageParam }),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
   })
+  const chats = useMemo(
+    () => chatPages?.pages.flatMap((page) => page.chats_info) ?? [],
+    [chatPages]
+  )
 
   // Create new chat
   const createChatMutation = useMutation({
@@ -30,7 +41,7 @@ function ChatPage() {
 
   // Find selected chat info
   const selectedChat = useMemo(() =>
-    chats?.chats_info.find((c) => c.conversation_id === chatId),
+    chats.find((c) => c.conversation_id === chatId),
     [chats, chatId]
   )
 
@@ -80,7 +91,7 @@ function ChatPage() {
         New Chat
       </Button>
       <VStack align="stretch" gap={1}>
-        {chats?.chats_info.map((chat) => (
+        {chats.map((chat) => (
           <Box
             key={chat.conversation_id}
             px={3}
@@ -96,6 +107,16 @@ function ChatPage() {
             {chat.name || chat.conversation_id}
           </Box>
         ))}
+        {hasNextPage && (
+          <Button
+            variant="ghost"
+            size="sm"
+            onClick={() => fetchNextPage()}
+            loading={isFetchingNextPage}
+          >
+            Load more
+          </Button>
+        )}
       </VStack>
     </>
   )
@@ -1,11 +1,12 @@
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query"
-import { Box, VStack, Text } from "@chakra-ui/react"
+import { useInfiniteQuery, useQuery, useMutation, useQueryClient } from "@tanstack/react-query"
+import { Box, VStack, Text, Button } from "@chakra-ui/react"
 import { UsersChatService, UsersService } from "../client"
 import { useMemo } from "react"
 import { createFileRoute } from "@tanstack/react-router"
 import { useColorModeValue } from "@/components/ui/color-mode"
 import type { UsersChatInfo, UsersChatMessage } from "../client/types.gen"
 import { ChatInterface } from "../components/Chat/ChatInterface"
+import useUsersChatEvents from "@/hooks/useUsersChatEvents"
 
 export const Route = createFileRoute('/user-chat')({
   component: UserChatPage,
@@ -21,15 +22,34 @@ function UserChatPage() {
     queryFn: UsersService.readUserMe,
   })
 
-  // Get all chats for sidebar
-  const { data: chats } = useQuery({
+  // Get the chats for the sidebar, newest first, a page at a time
+  const {
+    data: chatPages,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ["userChats"],
-    queryFn: UsersChatService.getChats,
+    queryFn: ({ pageParam }) => UsersChatService.getChats({ after: pageParam }),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+  })
+  const chats = useMemo(
+    () => chatPages?.pages.flatMap((page) => page.chats_info) ?? [],
+    [chatPages]
+  )
+
+  // Refresh the sidebar and the open conversation as messages arrive
+  useUsersChatEvents((event) => {
+    queryClient.invalidateQueries({ queryKey: ["userChats"] })
+    if (event.conversation_id === chatId) {
+      queryClient.invalidateQueries({ queryKey: ["userChatHistory", chatId] })
+    }
   })
 
   // Find selected chat info
   const selectedChat = useMemo(() =>
-    chats?.chats_info.find((c) => c.conversation_id === chatId),
+    chats.find((c) => c.conversation_id === chatId),
     [chats, chatId]
   )
 
@@ -86,7 +106,7 @@ function UserChatPage() {
         Conversations
       </Text>
       <VStack align="stretch" gap={1}>
-        {chats?.chats_info.map((chat) => {
+        {chats.map((chat) => {
           const otherParticipantId = chat.participant_ids.find(id => id !== currentUser?.id)
           const otherParticipant = participantMap[otherParticipantId || '']
           return (
@@ -106,6 +126,16 @@ function UserChatPage() {
             </Box>
           )
         })}
+        {hasNextPage && (
+          <Button
+            variant="ghost"
+            size="sm"
+            onClick={() => fetchNextPage()}
+            loading={isFetchingNextPage}
+          >
+            Load more
+          </Button>
+        )}
       </VStack>
     </>
   )